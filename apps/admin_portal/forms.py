@@ -0,0 +1,87 @@
+from django import forms
+
+from apps.athlete_portal.models import AthleteScore
+
+
+class EventResultsImportForm(forms.Form):
+    results_file = forms.FileField(
+        help_text="CSV with athlete_id, bib_number or first_name/last_name/date_of_birth, "
+                  "plus score and optional score_type and notes columns",
+        widget=forms.ClearableFileInput(attrs={'class': 'form-control', 'accept': '.csv'})
+    )
+    score_type = forms.ChoiceField(
+        choices=AthleteScore._meta.get_field('score_type').choices,
+        initial='points',
+        help_text="Used for rows without a score_type",
+        widget=forms.Select(attrs={'class': 'form-select'})
+    )
+
+
+class EventCertificatesIssueForm(forms.Form):
+    gold_max_rank = forms.IntegerField(
+        min_value=0, initial=1, label="Gold Medal up to rank",
+        help_text="0 skips the award",
+        widget=forms.NumberInput(attrs={'class': 'form-control'})
+    )
+    silver_max_rank = forms.IntegerField(
+        min_value=0, initial=2, label="Silver Medal up to rank",
+        widget=forms.NumberInput(attrs={'class': 'form-control'})
+    )
+    bronze_max_rank = forms.IntegerField(
+        min_value=0, initial=3, label="Bronze Medal up to rank",
+        widget=forms.NumberInput(attrs={'class': 'form-control'})
+    )
+    participation = forms.BooleanField(
+        required=False, initial=True, label="Participation certificates for everyone else",
+        widget=forms.CheckboxInput(attrs={'class': 'form-check-input'})
+    )
+    notify_parents = forms.BooleanField(
+        required=False, initial=True, label="Email parents",
+        widget=forms.CheckboxInput(attrs={'class': 'form-check-input'})
+    )
+
+    def clean(self):
+        cleaned_data = super().clean()
+        thresholds = [
+            cleaned_data.get(name) for name in ('gold_max_rank', 'silver_max_rank', 'bronze_max_rank')
+        ]
+        used = [value for value in thresholds if value]
+        if used != sorted(set(used)):
+            raise forms.ValidationError("Each award must reach further down the ranks than the one before.")
+        return cleaned_data
+
+    def awards(self):
+        """Award thresholds as (max rank, title) pairs for CertificateIssuanceService."""
+        return [
+            (self.cleaned_data[name], title)
+            for name, title in (
+                ('gold_max_rank', 'Gold Medal'),
+                ('silver_max_rank', 'Silver Medal'),
+                ('bronze_max_rank', 'Bronze Medal'),
+            )
+            if self.cleaned_data[name]
+        ]
+
+
+class AthleteRosterImportForm(forms.Form):
+    roster_file = forms.FileField(
+        help_text="CSV with first_name, last_name, date_of_birth and gender, plus optional contact, "
+                  "user_email and guardian_email columns",
+        widget=forms.ClearableFileInput(attrs={'class': 'form-control', 'accept': '.csv'})
+    )
+
+
+class EventBibRangeForm(forms.Form):
+    category = forms.CharField(
+        max_length=100, required=False,
+        help_text="Registration category, e.g. U-14; leave blank for every category without its own range",
+        widget=forms.TextInput(attrs={'class': 'form-control'})
+    )
+    first_number = forms.IntegerField(
+        min_value=1,
+        widget=forms.NumberInput(attrs={'class': 'form-control'})
+    )
+    last_number = forms.IntegerField(
+        min_value=1,
+        widget=forms.NumberInput(attrs={'class': 'form-control'})
+    )
@@ -1,5 +1,6 @@
 from django.test import TestCase, RequestFactory
 from django.contrib.auth import get_user_model
+from django.urls import reverse
 from apps.admin_portal.views import admin_dashboard
 from apps.core.models import Role, UserRole
 
@@ -26,3 +27,132 @@ class AdminDashboardViewTest(TestCase):
         
         response = admin_dashboard(request)
         self.assertEqual(response.status_code, 200)
+
+
+class AdminListDashboardsTest(TestCase):
+    def setUp(self):
+        from datetime import timedelta
+        from django.utils import timezone
+        from apps.centers.models import Center, CenterFacility
+        from apps.events.models import Event, EventRegistration
+
+        self.user = User.objects.create_user(email='admin@test.com', password='password', is_active=True)
+        role = Role.objects.create(code='admin', name='Admin', dashboard_url='admin_portal:dashboard')
+        UserRole.objects.create(user=self.user, role=role)
+        self.client.force_login(self.user)
+
+        self.center = Center.objects.create(
+            name='Main Center', address='1 Track Rd', city='Pune', phone='123', email='center@test.com'
+        )
+        for facility_type in ('gym', 'pool'):
+            CenterFacility.objects.create(center=self.center, facility_type=facility_type, capacity=10)
+        now = timezone.now()
+        self.events = [
+            Event.objects.create(
+                name=f'Meet {i}', description='-', center=self.center, status=status,
+                start_date=now, end_date=now, registration_start=now, registration_end=now, max_participants=10,
+            )
+            for i, status in enumerate(['draft', 'published', 'published'])
+        ]
+        for i in range(4):
+            EventRegistration.objects.create(
+                event=self.events[1], participant=User.objects.create_user(email=f'r{i}@test.com', password='p')
+            )
+
+    def test_centers_dashboard_counts_are_not_multiplied(self):
+        response = self.client.get(reverse('admin_portal:centers'))
+        center = response.context['centers'][0]
+        self.assertEqual((center.facility_count, center.event_count, center.athlete_count), (2, 3, 0))
+        self.assertEqual((response.context['total_centers'], response.context['active_centers']), (1, 1))
+
+    def test_events_dashboard_tallies_and_pages(self):
+        url = reverse('admin_portal:events')
+        with self.assertNumQueries(7):
+            response = self.client.get(url)
+        counts = {event.name: event.registration_count for event in response.context['events']}
+        self.assertEqual(counts, {'Meet 0': 0, 'Meet 1': 4, 'Meet 2': 0})
+        self.assertEqual(response.context['status_counts']['published'], 2)
+        self.assertEqual(response.context['total_events'], 3)
+
+        response = self.client.get(url, {'status': 'published', 'page': 9})
+        self.assertEqual([event.name for event in response.context['events']], ['Meet 2', 'Meet 1'])
+
+        # More events do not mean more queries
+        from apps.events.models import Event
+        Event.objects.bulk_create([
+            Event(
+                name=f'Extra {i}', description='-', center=self.center, start_date=self.events[0].start_date,
+                end_date=self.events[0].end_date, registration_start=self.events[0].start_date,
+                registration_end=self.events[0].start_date, max_participants=5,
+            )
+            for i in range(60)
+        ])
+        with self.assertNumQueries(7):
+            response = self.client.get(url)
+        self.assertEqual(response.context['events'].paginator.num_pages, 2)
+
+
+class UserDirectoryTest(TestCase):
+    def setUp(self):
+        from datetime import timedelta
+        from django.utils import timezone
+        from apps.core.models import RoleTag, UserRoleTag
+
+        self.admin = User.objects.create_user(email='admin@test.com', password='password', is_active=True)
+        self.roles = {
+            code: Role.objects.create(code=code, name=code.title(), dashboard_url='admin_portal:dashboard')
+            for code in ('admin', 'coach', 'athlete')
+        }
+        UserRole.objects.create(user=self.admin, role=self.roles['admin'])
+        head_coach = RoleTag.objects.create(code='head_coach', name='Head Coach', applicable_to_role=self.roles['coach'])
+        self.client.force_login(self.admin)
+
+        now = timezone.now()
+        self.coaches = []
+        for i, (first, last) in enumerate([('Ana', 'Kulkarni'), ('Anil', 'Rao'), ('Ravi', 'Anand')]):
+            coach = User.objects.create_user(
+                email=f'coach{i}@test.com', password='p', first_name=first, last_name=last,
+                date_joined=now - timedelta(days=i + 1),
+            )
+            UserRole.objects.create(user=coach, role=self.roles['coach'])
+            self.coaches.append(coach)
+        UserRoleTag.objects.create(user=self.coaches[0], role_tag=head_coach)
+        # Two roles, listed once
+        UserRole.objects.create(user=self.coaches[2], role=self.roles['athlete'])
+
+    def directory(self, **params):
+        response = self.client.get(reverse('admin_portal:users'), params)
+        return [user.email for user in response.context['users']], response
+
+    def test_filters_and_prefix_search(self):
+        emails, _ = self.directory(role='coach')
+        self.assertEqual(emails, ['coach0@test.com', 'coach1@test.com', 'coach2@test.com'])
+        self.assertEqual(self.directory(tag='head_coach')[0], ['coach0@test.com'])
+        self.assertEqual(self.directory(q='ana')[0], ['coach0@test.com', 'coach2@test.com'])
+        self.assertEqual(self.directory(q='an ku')[0], ['coach0@test.com'])
+        self.assertEqual(self.directory(q='coach1')[0], ['coach1@test.com'])
+        self.assertEqual(self.directory(role='coach', active='yes')[0], [])
+        # Unknown values are ignored rather than matching nothing
+        self.assertEqual(len(self.directory(role='pilot', confirmed='maybe')[0]), 4)
+
+    def test_keyset_pages_with_prefetched_badges(self):
+        from apps.core.services import KpiService, UserDirectoryService
+
+        first = UserDirectoryService.page({'role': 'coach'}, limit=2)
+        second = UserDirectoryService.page({'role': 'coach'}, first['next'], limit=2)
+        self.assertEqual([user.email for user in second['users']], ['coach2@test.com'])
+        self.assertIsNone(second['next'])
+
+        # Totals come from the cached KPI counters once they are loaded
+        KpiService.clear_cache()
+        self.directory()
+        with self.assertNumQueries(8):
+            _, response = self.directory()
+        self.assertContains(response, 'Head Coach')
+
+        # More users, and more roles per user, do not mean more queries
+        for i in range(40):
+            user = User.objects.create_user(email=f'extra{i}@test.com', password='p')
+            UserRole.objects.create(user=user, role=self.roles['athlete'])
+        with self.assertNumQueries(8):
+            self.directory()
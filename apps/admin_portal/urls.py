@@ -7,6 +7,15 @@ app_name = 'admin_portal'
 urlpatterns = [
     path('dashboard/', views.admin_dashboard, name='dashboard'),
     path('centers/', views.centers_dashboard, name='centers'),
+    path('centers/<int:center_id>/athletes/import/', views.center_athletes_import, name='center_athletes_import'),
     path('events/', views.events_dashboard, name='events'),
+    path('events/<int:event_id>/results/import/', views.event_results_import, name='event_results_import'),
+    path(
+        'events/<int:event_id>/certificates/issue/',
+        views.event_certificates_issue,
+        name='event_certificates_issue'
+    ),
+    path('events/<int:event_id>/bibs/', views.event_bibs, name='event_bibs'),
+    path('events/<int:event_id>/start-list.csv', views.event_start_list, name='event_start_list'),
     path('users/', views.users_dashboard, name='users'),
 ]
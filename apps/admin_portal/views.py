@@ -1,37 +1,63 @@
-from django.shortcuts import render
+from django.shortcuts import redirect, render, get_object_or_404
+from django.contrib import messages
 from django.contrib.auth.decorators import login_required
-from django.db.models import Count, Q
+from django.core.exceptions import ValidationError
+from django.http import StreamingHttpResponse
+from django.core.paginator import Paginator
+from django.db.models import (
+    Count, DecimalField, ExpressionWrapper, F, IntegerField, OuterRef, Q, Subquery
+)
+from django.db.models.functions import Coalesce
 from django.utils import timezone
 from datetime import timedelta
+from urllib.parse import urlencode
 
+from apps.core.services import ActivityService, KpiService, UserDirectoryService
+from apps.core.models import Role, RoleTag
 from apps.core.services.permission_service import PermissionService
 from apps.core.decorators.permissions import require_roles
-from apps.centers.models import Center
+from apps.centers.models import Center, CenterFacility
 from apps.events.models import Event, EventRegistration
+from apps.events.services import BibService
 from apps.athlete_portal.models import AthletePerson, AthleteRanking
-from apps.coach_portal.models import CoachProfile, TrainingSession
-from apps.parent_portal.models import Parent
+from apps.athlete_portal.services import AthleteImportService, CertificateIssuanceService, ResultsImportService
+from apps.coach_portal.models import TrainingSession
 from apps.volunteering.models import VolunteeringOpportunity, VolunteerApplication
 from apps.finance_portal.models import FinancialTransaction
 
 
+DASHBOARD_PAGE_SIZE = 50
+
+
+def _related_count(model, field):
+    """
+    Count of a model's rows pointing at the outer row through `field`, as a correlated subquery.
+    Unlike Count() over joins, several of these on one queryset do not multiply each other.
+    """
+    counts = model.objects.filter(**{field: OuterRef('pk')}).order_by().values(field).annotate(
+        total=Count('id')
+    ).values('total')
+    return Coalesce(Subquery(counts, output_field=IntegerField()), 0)
+
+
 @login_required
 @require_roles(['admin'])
 def admin_dashboard(request):
     """Admin dashboard with overall statistics and recent activity."""
     user = request.user
     
-    # Statistics
+    # Statistics, from the KPI counters
+    kpis = KpiService.get_all()
     stats = {
-        'total_centers': Center.objects.count(),
-        'active_centers': Center.objects.filter(is_active=True).count(),
-        'total_events': Event.objects.count(),
-        'ongoing_events': Event.objects.filter(status='ongoing').count(),
-        'total_athletes': AthletePerson.objects.count(),
-        'active_athletes': AthletePerson.objects.filter(is_active=True).count(),
-        'total_coaches': CoachProfile.objects.count(),
-        'total_parents': Parent.objects.count(),
-        'pending_volunteers': VolunteerApplication.objects.filter(status='pending').count(),
+        'total_centers': kpis.get('centers', 0),
+        'active_centers': kpis.get(KpiService.key('centers', 'is_active', True), 0),
+        'total_events': kpis.get('events', 0),
+        'ongoing_events': kpis.get(KpiService.key('events', 'status', 'ongoing'), 0),
+        'total_athletes': kpis.get('athletes', 0),
+        'active_athletes': kpis.get(KpiService.key('athletes', 'is_active', True), 0),
+        'total_coaches': kpis.get('coaches', 0),
+        'total_parents': kpis.get('parents', 0),
+        'pending_volunteers': kpis.get(KpiService.key('volunteer_applications', 'status', 'pending'), 0),
     }
     
     # Recent Events
@@ -45,6 +71,9 @@ def admin_dashboard(request):
     # Recent Financial Transactions
     recent_transactions = FinancialTransaction.objects.order_by('-transaction_date')[:5]
     
+    # Activity across every center
+    activity = ActivityService.feed(user, limit=10)['entries']
+    
     # Upcoming Events (next 7 days)
     today = timezone.now().date()
     upcoming_events = Event.objects.filter(
@@ -64,6 +93,7 @@ def admin_dashboard(request):
         'recent_transactions': recent_transactions,
         'upcoming_events': upcoming_events,
         'pending_volunteers': pending_volunteers,
+        'activity': activity,
     }
     
     return render(request, 'admin_portal/dashboard.html', context)
@@ -73,62 +103,231 @@ def admin_dashboard(request):
 @require_roles(['admin'])
 def centers_dashboard(request):
     """Centers management dashboard."""
-    centers = Center.objects.annotate(
-        facility_count=Count('centerfacility'),
-        event_count=Count('event')
-    ).order_by('-created_at')
+    centers = Center.objects.select_related('center_head').annotate(
+        facility_count=_related_count(CenterFacility, 'center'),
+        event_count=_related_count(Event, 'center'),
+        athlete_count=_related_count(AthletePerson, 'center'),
+    ).order_by('-created_at', '-id')
+    tallies = Center.objects.aggregate(total=Count('id'), active=Count('id', filter=Q(is_active=True)))
     
     context = {
-        'centers': centers,
-        'total_centers': centers.count(),
-        'active_centers': centers.filter(is_active=True).count(),
+        'centers': Paginator(centers, DASHBOARD_PAGE_SIZE).get_page(request.GET.get('page')),
+        'total_centers': tallies['total'],
+        'active_centers': tallies['active'],
     }
     
     return render(request, 'admin_portal/centers_dashboard.html', context)
 
 
+@login_required
+@require_roles(['admin'])
+def center_athletes_import(request, center_id):
+    """Upload a roster CSV and create the center's athletes."""
+    from .forms import AthleteRosterImportForm
+    
+    center = get_object_or_404(Center, id=center_id)
+    result = None
+    
+    if request.method == 'POST':
+        form = AthleteRosterImportForm(request.POST, request.FILES)
+        if form.is_valid():
+            try:
+                result = AthleteImportService.import_csv(form.cleaned_data['roster_file'], center)
+            except ValueError as exc:
+                form.add_error('roster_file', str(exc))
+    else:
+        form = AthleteRosterImportForm()
+    
+    context = {
+        'center': center,
+        'form': form,
+        'result': result,
+        'columns': AthleteImportService.COLUMNS,
+    }
+    
+    return render(request, 'admin_portal/center_athletes_import.html', context)
+
+
 @login_required
 @require_roles(['admin'])
 def events_dashboard(request):
     """Events management dashboard."""
-    events = Event.objects.select_related('center').annotate(
-        registration_count=Count('eventregistration')
-    ).order_by('-created_at')
+    events = Event.objects.select_related('center', 'revenue').annotate(
+        registration_count=_related_count(EventRegistration, 'event'),
+        # Every active registration owes the entry fee
+        expected_revenue=ExpressionWrapper(
+            F('entry_fee') * F('current_participants'), output_field=DecimalField(max_digits=12, decimal_places=2)
+        ),
+    ).order_by('-created_at', '-id')
     
     status_filter = request.GET.get('status')
+    if status_filter not in dict(Event.STATUS_CHOICES):
+        status_filter = None
     if status_filter:
         events = events.filter(status=status_filter)
     
+    # One grouped query for every status tally
+    status_counts = {status: 0 for status, _ in Event.STATUS_CHOICES}
+    status_counts.update(Event.objects.order_by().values_list('status').annotate(count=Count('id')))
+    
     context = {
-        'events': events,
-        'total_events': Event.objects.count(),
-        'status_counts': {
-            'draft': Event.objects.filter(status='draft').count(),
-            'published': Event.objects.filter(status='published').count(),
-            'ongoing': Event.objects.filter(status='ongoing').count(),
-            'completed': Event.objects.filter(status='completed').count(),
-        },
+        'events': Paginator(events, DASHBOARD_PAGE_SIZE).get_page(request.GET.get('page')),
+        'total_events': sum(status_counts.values()),
+        'status_counts': status_counts,
         'selected_status': status_filter,
+        'page_query': f'status={status_filter}&' if status_filter else '',
     }
     
     return render(request, 'admin_portal/events_dashboard.html', context)
 
 
+@login_required
+@require_roles(['admin'])
+def event_results_import(request, event_id):
+    """Upload a results CSV and upsert the event's athlete scores."""
+    from .forms import EventResultsImportForm
+    
+    event = get_object_or_404(Event.objects.select_related('center'), id=event_id)
+    result = None
+    
+    if request.method == 'POST':
+        form = EventResultsImportForm(request.POST, request.FILES)
+        if form.is_valid():
+            try:
+                result = ResultsImportService.import_csv(
+                    event, form.cleaned_data['results_file'], form.cleaned_data['score_type']
+                )
+            except ValueError as exc:
+                form.add_error('results_file', str(exc))
+    else:
+        form = EventResultsImportForm()
+    
+    context = {
+        'event': event,
+        'form': form,
+        'result': result,
+        'columns': ResultsImportService.COLUMNS,
+    }
+    
+    return render(request, 'admin_portal/event_results_import.html', context)
+
+
+@login_required
+@require_roles(['admin'])
+def event_certificates_issue(request, event_id):
+    """Issue an event's award and participation certificates in bulk."""
+    from .forms import EventCertificatesIssueForm
+    
+    event = get_object_or_404(Event.objects.select_related('center'), id=event_id)
+    result = None
+    
+    if request.method == 'POST':
+        form = EventCertificatesIssueForm(request.POST)
+        if form.is_valid():
+            result = CertificateIssuanceService.issue(
+                event,
+                issued_by=request.user,
+                awards=form.awards(),
+                participation=form.cleaned_data['participation'],
+                notify=form.cleaned_data['notify_parents'],
+            )
+    else:
+        form = EventCertificatesIssueForm()
+    
+    # Preview with the submitted thresholds when they are valid
+    awards = form.awards() if form.is_bound and form.is_valid() else None
+    participation = form.cleaned_data['participation'] if awards is not None else True
+    preview = {}
+    for _, title, _ in CertificateIssuanceService.recipients(event, awards, participation):
+        preview[title] = preview.get(title, 0) + 1
+    
+    context = {
+        'event': event,
+        'form': form,
+        'result': result,
+        'preview': preview,
+        'issued_count': event.certificates.count(),
+    }
+    
+    return render(request, 'admin_portal/event_certificates_issue.html', context)
+
+
+@login_required
+@require_roles(['admin'])
+def event_bibs(request, event_id):
+    """Set up an event's bib ranges and allocate bibs to confirmed registrations."""
+    from .forms import EventBibRangeForm
+    
+    event = get_object_or_404(Event.objects.select_related('center'), id=event_id)
+    form = EventBibRangeForm()
+    
+    if request.method == 'POST':
+        try:
+            if request.POST.get('action') == 'allocate':
+                allocated = BibService.allocate_event(event)
+                total = sum(allocated.values())
+                messages.success(request, f'Allocated {total} bib{"s" if total != 1 else ""}.')
+                return redirect('admin_portal:event_bibs', event_id=event.id)
+            form = EventBibRangeForm(request.POST)
+            if form.is_valid():
+                BibService.configure_range(
+                    event,
+                    form.cleaned_data['first_number'],
+                    form.cleaned_data['last_number'],
+                    form.cleaned_data['category'],
+                )
+                messages.success(request, 'Bib range saved.')
+                return redirect('admin_portal:event_bibs', event_id=event.id)
+        except ValidationError as e:
+            messages.error(request, e.messages[0])
+    
+    registrations = EventRegistration.objects.filter(event=event, status__in=BibService.ALLOCATED_STATUSES)
+    context = {
+        'event': event,
+        'form': form,
+        'ranges': event.bib_ranges.all(),
+        'counts': registrations.aggregate(
+            confirmed=Count('id'),
+            without_bib=Count('id', filter=Q(bib_number='')),
+        ),
+    }
+    
+    return render(request, 'admin_portal/event_bibs.html', context)
+
+
+@login_required
+@require_roles(['admin'])
+def event_start_list(request, event_id):
+    """Stream an event's start list as CSV, by category then bib."""
+    event = get_object_or_404(Event, id=event_id)
+    response = StreamingHttpResponse(BibService.start_list_csv(event), content_type='text/csv')
+    response['Content-Disposition'] = f'attachment; filename="start-list-event-{event.id}.csv"'
+    return response
+
+
 @login_required
 @require_roles(['admin'])
 def users_dashboard(request):
-    """User management dashboard."""
-    athletes = AthletePerson.objects.select_related('user').order_by('-user__date_joined')
-    coaches = CoachProfile.objects.select_related('user').order_by('-user__date_joined')
-    parents = Parent.objects.select_related('user').order_by('-user__date_joined')
+    """User directory with role, tag, center and status filters and prefix search."""
+    filters = UserDirectoryService.clean_filters(request.GET)
+    page = UserDirectoryService.page(filters, request.GET.get('after') or None)
+    
+    # Totals come from the KPI counters, not from counting users
+    kpis = KpiService.get_all()
     
+    query = urlencode(filters)
     context = {
-        'athletes': athletes[:10],
-        'coaches': coaches[:10],
-        'parents': parents[:10],
-        'total_athletes': athletes.count(),
-        'total_coaches': coaches.count(),
-        'total_parents': parents.count(),
+        'users': page['users'],
+        'next_cursor': page['next'],
+        'paged': bool(request.GET.get('after')),
+        'filters': filters,
+        'query': query,
+        'roles': Role.ROLE_CHOICES,
+        'tags': RoleTag.TAG_CHOICES,
+        'centers': Center.objects.order_by('name').values('id', 'name'),
+        'total_athletes': kpis.get('athletes', 0),
+        'total_coaches': kpis.get('coaches', 0),
+        'total_parents': kpis.get('parents', 0),
     }
     
     return render(request, 'admin_portal/users_dashboard.html', context)
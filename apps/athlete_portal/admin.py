@@ -27,6 +27,7 @@ class AthletePersonAdmin(admin.ModelAdmin):
     list_display = ('get_full_name', 'email', 'date_of_birth', 'blood_type', 'is_active')
     list_filter = ('is_active', 'date_of_birth', 'blood_type', 'center')
     search_fields = ('first_name', 'last_name', 'email')
+    show_full_result_count = False
     inlines = [AthleteScoreInline, AthleteRankingInline, EvaluationCertificateInline]
     fieldsets = (
         ('User Information', {
@@ -58,6 +59,8 @@ class AthletePersonAdmin(admin.ModelAdmin):
 @admin.register(AthleteScore)
 class AthleteScoreAdmin(admin.ModelAdmin):
     list_display = ('athlete', 'event', 'score', 'rank', 'recorded_at')
+    list_select_related = ('athlete', 'event')
+    show_full_result_count = False
     list_filter = ('event', 'recorded_at', 'score_type')
     search_fields = ('athlete__first_name', 'event__name')
     readonly_fields = ('recorded_at', 'updated_at')
@@ -78,6 +81,8 @@ class AthleteScoreAdmin(admin.ModelAdmin):
 @admin.register(AthleteRanking)
 class AthleteRankingAdmin(admin.ModelAdmin):
     list_display = ('athlete', 'category', 'total_score', 'rank')
+    list_select_related = ('athlete',)
+    show_full_result_count = False
     list_filter = ('category', 'last_updated')
     search_fields = ('athlete__first_name', 'category')
     readonly_fields = ('last_updated',)
@@ -95,6 +100,7 @@ class AthleteRankingAdmin(admin.ModelAdmin):
 @admin.register(EvaluationCertificate)
 class EvaluationCertificateAdmin(admin.ModelAdmin):
     list_display = ('title', 'athlete', 'issued_by', 'issued_date', 'is_viewable_by_parents')
+    list_select_related = ('athlete', 'issued_by')
     list_filter = ('is_viewable_by_parents', 'issued_date', 'valid_until', 'event')
     search_fields = ('title', 'athlete__first_name', 'issued_by__first_name')
     readonly_fields = ('issued_date', 'valid_from', 'created_at')
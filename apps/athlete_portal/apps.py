@@ -5,3 +5,6 @@ class AthletePortalConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "apps.athlete_portal"
     verbose_name = "Athlete Portal"
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1 @@
+# Management package for athlete portal app
@@ -0,0 +1,55 @@
+"""
+Management command to import a center's athlete roster from a CSV file.
+Usage: python manage.py import_athletes <roster.csv> [--center 3] [--report errors.csv]
+"""
+import csv
+
+from django.core.management.base import BaseCommand, CommandError
+from apps.athlete_portal.services import AthleteImportService
+from apps.centers.models import Center
+
+
+class Command(BaseCommand):
+    help = 'Create AthletePerson rows, account links and guardian links from a roster CSV'
+
+    def add_arguments(self, parser):
+        parser.add_argument('csv_path', help='Path to the roster CSV file')
+        parser.add_argument(
+            '--center',
+            type=int,
+            help='Center for rows without a center_id column'
+        )
+        parser.add_argument(
+            '--report',
+            help='Write skipped rows and warnings to this CSV file instead of the console'
+        )
+
+    def handle(self, *args, **options):
+        center = None
+        if options['center'] is not None:
+            try:
+                center = Center.objects.get(pk=options['center'])
+            except Center.DoesNotExist:
+                raise CommandError(f"Center {options['center']} does not exist")
+
+        self.stdout.write('Importing athletes...')
+        with open(options['csv_path'], 'rb') as roster_file:
+            try:
+                result = AthleteImportService.import_csv(roster_file, center)
+            except ValueError as exc:
+                raise CommandError(str(exc))
+
+        if options['report']:
+            with open(options['report'], 'w', newline='') as report_file:
+                writer = csv.writer(report_file)
+                writer.writerow(['row', 'message'])
+                writer.writerows(result['errors'])
+            self.stdout.write(f"  {len(result['errors'])} problems written to {options['report']}")
+        else:
+            for row_number, message in result['errors']:
+                self.stdout.write(self.style.WARNING(f'  Row {row_number}: {message}'))
+
+        self.stdout.write(self.style.SUCCESS(
+            f"✓ Imported {result['created']} athletes ({result['users_linked']} accounts linked, "
+            f"{result['guardians_linked']} guardians linked), {len(result['errors'])} problems reported"
+        ))
@@ -0,0 +1,43 @@
+"""
+Management command to import event results from a CSV file.
+Usage: python manage.py import_event_results <event_id> <results.csv> [--score-type time]
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+from apps.athlete_portal.services import ResultsImportService
+from apps.events.models import Event
+
+
+class Command(BaseCommand):
+    help = 'Import AthleteScore results for an event from a CSV file'
+
+    def add_arguments(self, parser):
+        parser.add_argument('event_id', type=int, help='Event the results belong to')
+        parser.add_argument('csv_path', help='Path to the results CSV file')
+        parser.add_argument(
+            '--score-type',
+            default='points',
+            choices=ResultsImportService.SCORE_TYPES,
+            help='Score type for rows without a score_type column (default: points)'
+        )
+
+    def handle(self, *args, **options):
+        try:
+            event = Event.objects.get(pk=options['event_id'])
+        except Event.DoesNotExist:
+            raise CommandError(f"Event {options['event_id']} does not exist")
+
+        self.stdout.write(f'Importing results for {event.name}...')
+        with open(options['csv_path'], 'rb') as results_file:
+            try:
+                result = ResultsImportService.import_csv(event, results_file, options['score_type'])
+            except ValueError as exc:
+                raise CommandError(str(exc))
+
+        for row_number, message in result['errors']:
+            self.stdout.write(self.style.WARNING(f'  Row {row_number}: {message}'))
+
+        self.stdout.write(self.style.SUCCESS(
+            f"✓ Imported results: {result['created']} created, {result['updated']} updated, "
+            f"{len(result['errors'])} skipped"
+        ))
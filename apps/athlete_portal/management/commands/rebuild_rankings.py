@@ -0,0 +1,28 @@
+"""
+Management command to rebuild athlete ranking totals and ranks from scores.
+Usage: python manage.py rebuild_rankings [--category U-14 ...]
+"""
+
+from django.core.management.base import BaseCommand
+from apps.athlete_portal.services import RankingService
+
+
+class Command(BaseCommand):
+    help = 'Rebuild AthleteRanking totals and ranks from AthleteScore rows'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--category',
+            action='append',
+            dest='categories',
+            help='Only rebuild this category (can be repeated)'
+        )
+
+    def handle(self, *args, **options):
+        categories = options['categories']
+        scope = ', '.join(categories) if categories else 'all categories'
+        self.stdout.write(f'Rebuilding rankings for {scope}...')
+
+        count = RankingService.rebuild(categories)
+
+        self.stdout.write(self.style.SUCCESS(f'✓ Rebuilt {count} rankings'))
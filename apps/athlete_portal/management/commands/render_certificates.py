@@ -0,0 +1,35 @@
+"""
+Management command to render certificate PDFs for an event.
+Usage: python manage.py render_certificates <event_id> [--workers 4]
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+from apps.athlete_portal.services import CertificatePdfService
+from apps.events.models import Event
+
+
+class Command(BaseCommand):
+    help = 'Render PDFs for all certificates issued for an event'
+
+    def add_arguments(self, parser):
+        parser.add_argument('event_id', type=int, help='Event whose certificates to render')
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=None,
+            help='Number of rendering processes (default: CPU count)'
+        )
+
+    def handle(self, *args, **options):
+        try:
+            event = Event.objects.get(pk=options['event_id'])
+        except Event.DoesNotExist:
+            raise CommandError(f"Event {options['event_id']} does not exist")
+
+        self.stdout.write(f'Rendering certificates for {event.name}...')
+
+        result = CertificatePdfService.render_event(event, workers=options['workers'])
+
+        self.stdout.write(self.style.SUCCESS(
+            f"✓ Rendered {result['rendered']} certificates ({result['cached']} already up to date)"
+        ))
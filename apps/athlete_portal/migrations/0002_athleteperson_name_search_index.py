@@ -0,0 +1,23 @@
+# Generated by Django 5.2.11 on 2026-10-18 23:35
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("athlete_portal", "0001_initial"),
+        ("centers", "0001_initial"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="athleteperson",
+            index=models.Index(
+                fields=["center", "is_active", "last_name", "first_name"],
+                name="athlete_per_center__be2176_idx",
+            ),
+        ),
+    ]
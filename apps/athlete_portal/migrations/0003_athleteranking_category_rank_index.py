@@ -0,0 +1,19 @@
+# Generated by Django 5.2.11 on 2026-10-18 23:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("athlete_portal", "0002_athleteperson_name_search_index"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="athleteranking",
+            index=models.Index(
+                fields=["category", "rank"], name="athlete_ran_categor_8fb2a5_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.11 on 2026-10-18 23:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("athlete_portal", "0003_athleteranking_category_rank_index"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CertificateSequence",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("prefix", models.CharField(max_length=50, unique=True)),
+                ("last_value", models.PositiveIntegerField(default=0)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "verbose_name": "Certificate Sequence",
+                "verbose_name_plural": "Certificate Sequences",
+                "db_table": "certificate_sequences",
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.11 on 2026-10-19 01:35
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("athlete_portal", "0004_certificatesequence"),
+        ("events", "0003_eventbibrange"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name="evaluationcertificate",
+            constraint=models.UniqueConstraint(
+                fields=("athlete", "event", "title"),
+                name="unique_certificate_per_event_title",
+            ),
+        ),
+    ]
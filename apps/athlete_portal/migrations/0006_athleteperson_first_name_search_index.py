@@ -0,0 +1,23 @@
+# Generated by Django 5.2.11 on 2026-10-19 01:41
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("athlete_portal", "0005_evaluationcertificate_unique_title"),
+        ("centers", "0001_initial"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="athleteperson",
+            index=models.Index(
+                fields=["center", "is_active", "first_name", "last_name"],
+                name="athlete_per_center__8fc0ac_idx",
+            ),
+        ),
+    ]
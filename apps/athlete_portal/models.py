@@ -3,6 +3,8 @@ Athlete models for MFU Web Portal.
 Manages athlete data, rankings, and evaluation certificates.
 """
 from django.db import models
+from django.db.models import Case, IntegerField, Q, Value, When
+from django.db.models.functions import ExtractYear
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.utils import timezone
 from apps.core.models import User
@@ -10,6 +12,71 @@ from apps.centers.models import Center
 from apps.events.models import Event
 
 
+# Upper bounds of the U-NN age bands; older athletes fall in OPEN_AGE_BAND
+AGE_BANDS = [10, 12, 14, 18]
+OPEN_AGE_BAND = 'Open'
+
+
+def birth_date_cutoff(age, on=None):
+    """
+    Latest date of birth of someone at least `age` years old on a date.
+
+    Filtering date_of_birth against this keeps age checks index-friendly.
+    """
+    on = on or timezone.now().date()
+    try:
+        return on.replace(year=on.year - age)
+    except ValueError:
+        # 29 February in a non-leap year
+        return on.replace(year=on.year - age, day=28)
+
+
+def age_expression(field='date_of_birth', on=None):
+    """SQL expression for age in whole years on a date, from a date of birth field."""
+    on = on or timezone.now().date()
+    before_birthday = Q(**{f'{field}__month__gt': on.month}) | Q(
+        **{f'{field}__month': on.month, f'{field}__day__gt': on.day}
+    )
+    return Value(on.year) - ExtractYear(field) - Case(
+        When(before_birthday, then=Value(1)),
+        default=Value(0),
+        output_field=IntegerField()
+    )
+
+
+def age_band_expression(field='date_of_birth', on=None):
+    """SQL expression for the age band (e.g. U-14) on a date, from a date of birth field."""
+    return Case(
+        *[
+            When(**{f'{field}__gt': birth_date_cutoff(band, on)}, then=Value(f'U-{band}'))
+            for band in AGE_BANDS
+        ],
+        default=Value(OPEN_AGE_BAND),
+        output_field=models.CharField()
+    )
+
+
+class AthletePersonQuerySet(models.QuerySet):
+    """Age annotations and filters computed in SQL from date_of_birth."""
+
+    def with_age(self, on=None):
+        """Annotate `age` in whole years, e.g. with_age().filter(age__gte=12)."""
+        return self.annotate(age=age_expression('date_of_birth', on))
+
+    def with_age_band(self, on=None):
+        """Annotate `age_band` as U-10, U-12, U-14, U-18 or Open."""
+        return self.annotate(age_band=age_band_expression('date_of_birth', on))
+
+    def aged(self, min_age=None, max_age=None, on=None):
+        """Filter to an inclusive age range using date_of_birth comparisons."""
+        queryset = self
+        if min_age is not None:
+            queryset = queryset.filter(date_of_birth__lte=birth_date_cutoff(min_age, on))
+        if max_age is not None:
+            queryset = queryset.filter(date_of_birth__gt=birth_date_cutoff(max_age + 1, on))
+        return queryset
+
+
 class AthletePerson(models.Model):
     """
     An athlete registered in the system.
@@ -70,6 +137,11 @@ class AthletePerson(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    objects = AthletePersonQuerySet.as_manager()
+    
+    # Set by AthletePersonQuerySet.with_age()
+    _annotated_age = None
+    
     class Meta:
         db_table = 'athlete_persons'
         ordering = ['last_name', 'first_name']
@@ -77,6 +149,10 @@ class AthletePerson(models.Model):
         verbose_name_plural = 'Athletes'
         indexes = [
             models.Index(fields=['center', 'is_active']),
+            # Serve the coach portal athlete picker's prefix search, one per
+            # name column so each side of its last/first name OR has a range
+            models.Index(fields=['center', 'is_active', 'last_name', 'first_name']),
+            models.Index(fields=['center', 'is_active', 'first_name', 'last_name']),
         ]
     
     def __str__(self):
@@ -87,11 +163,17 @@ class AthletePerson(models.Model):
     
     @property
     def age(self):
-        """Calculate age from date of birth."""
+        """Calculate age from date of birth, or use the with_age() annotation."""
+        if self._annotated_age is not None:
+            return self._annotated_age
         today = timezone.now().date()
         return today.year - self.date_of_birth.year - (
             (today.month, today.day) < (self.date_of_birth.month, self.date_of_birth.day)
         )
+    
+    @age.setter
+    def age(self, value):
+        self._annotated_age = value
 
 
 class AthleteScore(models.Model):
@@ -178,6 +260,9 @@ class AthleteRanking(models.Model):
         db_table = 'athlete_rankings'
         verbose_name = 'Athlete Ranking'
         verbose_name_plural = 'Athlete Rankings'
+        indexes = [
+            models.Index(fields=['category', 'rank']),
+        ]
     
     def __str__(self):
         return f"{self.athlete.get_full_name()} - Rank #{self.rank} ({self.category})"
@@ -225,6 +310,12 @@ class EvaluationCertificate(models.Model):
     class Meta:
         db_table = 'evaluation_certificates'
         ordering = ['-issued_date']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['athlete', 'event', 'title'],
+                name='unique_certificate_per_event_title',
+            ),
+        ]
         verbose_name = 'Evaluation Certificate'
         verbose_name_plural = 'Evaluation Certificates'
     
@@ -237,3 +328,21 @@ class EvaluationCertificate(models.Model):
         if self.valid_until and today > self.valid_until:
             return False
         return today >= self.valid_from
+
+
+class CertificateSequence(models.Model):
+    """
+    Counter for generated certificate numbers, one row per prefix.
+    Numbers are handed out in blocks under a row lock, so they never collide.
+    """
+    prefix = models.CharField(max_length=50, unique=True)
+    last_value = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        db_table = 'certificate_sequences'
+        verbose_name = 'Certificate Sequence'
+        verbose_name_plural = 'Certificate Sequences'
+    
+    def __str__(self):
+        return f"{self.prefix} (last {self.last_value})"
@@ -0,0 +1,22 @@
+"""Services package for athlete portal app."""
+from .athlete_import_service import AthleteImportService
+from .certificate_issuance_service import CertificateIssuanceService
+from .certificate_pdf_service import CertificatePdfService
+from .certificate_verification_service import CertificateVerificationService
+from .leaderboard_service import LeaderboardService
+from .performance_service import PerformanceService
+from .profile_loader import AthleteProfileLoader
+from .ranking_service import RankingService
+from .results_import_service import ResultsImportService
+
+__all__ = [
+    'AthleteImportService',
+    'AthleteProfileLoader',
+    'CertificateIssuanceService',
+    'CertificatePdfService',
+    'CertificateVerificationService',
+    'LeaderboardService',
+    'PerformanceService',
+    'RankingService',
+    'ResultsImportService',
+]
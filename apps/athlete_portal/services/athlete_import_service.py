@@ -0,0 +1,373 @@
+"""
+Athlete roster import for the athlete portal.
+Creates a center's athletes, account links and guardian links from a CSV roster.
+"""
+import codecs
+import csv
+import io
+import re
+from datetime import datetime
+
+from django.db import transaction
+
+from apps.athlete_portal.models import AthletePerson
+from apps.centers.models import Center
+from apps.core.services import KpiService
+from apps.core.models import Role, User, UserRole
+from apps.parent_portal.models import Parent, ParentChildRelation
+
+
+class AthleteImportService:
+    """
+    Service class for bulk athlete roster imports.
+
+    The file is read as a stream and handled BATCH_SIZE rows at a time.
+    Duplicates are found with a blocking key of normalized first name, last
+    name, date of birth and center, looked up in an in-memory index: the
+    index holds each center's existing athletes (one query the first time a
+    center appears) and grows with every row accepted from the file.
+    Accounts named by user_email and guardian_email are loaded with one query
+    per batch, and each batch is written with one bulk_create per model.
+
+    Linked accounts get the athlete role and guardians the parent role (with
+    a Parent profile if they have none), so they can use their portals.
+
+    A row that fails validation or duplicates an athlete is skipped and
+    reported; a guardian problem is reported without skipping the athlete.
+    """
+
+    COLUMNS = [
+        'first_name', 'last_name', 'date_of_birth', 'gender', 'email', 'phone', 'center_id',
+        'blood_type', 'emergency_contact_name', 'emergency_contact_phone', 'user_email',
+        'guardian_email', 'guardian_relationship',
+    ]
+    REQUIRED = ['first_name', 'last_name', 'date_of_birth', 'gender']
+    GENDERS = [choice for choice, _ in AthletePerson._meta.get_field('gender').choices]
+    BLOOD_TYPES = [choice for choice, _ in AthletePerson._meta.get_field('blood_type').choices]
+    RELATIONSHIPS = [choice for choice, _ in ParentChildRelation.RELATIONSHIP_CHOICES]
+    DATE_FORMATS = ['%Y-%m-%d', '%d/%m/%Y']
+    BATCH_SIZE = 1000
+    CHUNK_SIZE = 64 * 1024
+
+    @staticmethod
+    def blocking_key(first_name, last_name, date_of_birth, center_id):
+        """Duplicate-detection key, ignoring case, spacing and punctuation in names."""
+        return (
+            AthleteImportService._normalize(first_name),
+            AthleteImportService._normalize(last_name),
+            date_of_birth,
+            center_id,
+        )
+
+    @staticmethod
+    def read_rows(file):
+        """
+        Stream roster rows from an uploaded or opened CSV file.
+
+        Header names are matched case-insensitively, with spaces treated as underscores.
+
+        Yields:
+            dict: Row keyed by normalized column name
+        """
+        if isinstance(file, io.TextIOBase):
+            text = file
+        else:
+            text = io.TextIOWrapper(file, encoding='utf-8-sig', newline='')
+        reader = csv.DictReader(text)
+        if reader.fieldnames:
+            reader.fieldnames = [
+                (name or '').strip().lower().replace(' ', '_') for name in reader.fieldnames
+            ]
+        yield from reader
+
+    @staticmethod
+    def check_encoding(file):
+        """
+        Make sure a binary file is UTF-8 before any of it is imported.
+
+        Batches commit as they are read, so a bad byte deep in the file would
+        otherwise stop the import halfway. The file is decoded a chunk at a
+        time and rewound; text files were decoded by whoever opened them.
+
+        Raises:
+            ValueError: The file is not UTF-8
+        """
+        if isinstance(file, io.TextIOBase):
+            return
+        decoder = codecs.getincrementaldecoder('utf-8-sig')()
+        try:
+            for chunk in iter(lambda: file.read(AthleteImportService.CHUNK_SIZE), b''):
+                decoder.decode(chunk)
+            decoder.decode(b'', final=True)
+        except UnicodeDecodeError:
+            raise ValueError('The file must be a UTF-8 CSV. Save it as "CSV UTF-8" and upload it again.')
+        finally:
+            file.seek(0)
+
+    @staticmethod
+    def import_csv(file, center=None):
+        """
+        Import a roster CSV. See import_rows.
+
+        Raises:
+            ValueError: A binary file is not UTF-8; nothing was imported
+        """
+        AthleteImportService.check_encoding(file)
+        return AthleteImportService.import_rows(AthleteImportService.read_rows(file), center)
+
+    @staticmethod
+    def import_rows(rows, center=None):
+        """
+        Import roster rows.
+
+        Args:
+            rows: Iterable of row dicts (see COLUMNS); read lazily, one batch at a time
+            center: Center for rows without a center_id column
+
+        Returns:
+            dict: {'created', 'users_linked', 'guardians_linked', 'errors'} where
+                errors is a list of (row number, message) tuples, counting the
+                header as row 1
+        """
+        state = {
+            'index': {},
+            'loaded_centers': set(),
+            'centers': {center.id} if center else set(),
+            'default_center_id': center.id if center else None,
+            'claimed_users': set(),
+            'roles': dict(Role.objects.filter(code__in=[Role.ATHLETE, Role.PARENT]).values_list('code', 'id')),
+        }
+        result = {'created': 0, 'users_linked': 0, 'guardians_linked': 0, 'errors': []}
+
+        batch = []
+        for row_number, row in enumerate(rows, start=2):
+            batch.append((row_number, row))
+            if len(batch) >= AthleteImportService.BATCH_SIZE:
+                AthleteImportService._import_batch(batch, state, result)
+                batch = []
+        if batch:
+            AthleteImportService._import_batch(batch, state, result)
+
+        result['errors'].sort()
+        return result
+
+    @staticmethod
+    def _import_batch(batch, state, result):
+        errors = result['errors']
+        parsed = []
+        for row_number, row in batch:
+            try:
+                parsed.append((row_number, AthleteImportService._parse_row(row, state)))
+            except ValueError as exc:
+                errors.append((row_number, str(exc)))
+
+        # Load each new center's existing athletes into the duplicate index once
+        AthleteImportService._index_centers({values['center_id'] for _, values in parsed}, state)
+
+        emails = set()
+        for _, values in parsed:
+            emails.update(email for email in (values['user_email'], values['guardian_email']) if email)
+        users = {}
+        if emails:
+            for user_id, email, athlete_id in User.objects.filter(email__in=emails).values_list(
+                'id', 'email', 'athlete_profile__id'
+            ):
+                users[email.lower()] = user_id
+                if athlete_id:
+                    state['claimed_users'].add(user_id)
+
+        athletes = []
+        guardians = []
+        for row_number, values in parsed:
+            key = AthleteImportService.blocking_key(
+                values['first_name'], values['last_name'], values['date_of_birth'], values['center_id']
+            )
+            duplicate = state['index'].get(key)
+            if duplicate is not None:
+                kind, ref = duplicate
+                errors.append((row_number, (
+                    f'Duplicate of athlete {ref} already on record.' if kind == 'athlete'
+                    else f'Duplicate of row {ref}.'
+                )))
+                continue
+
+            user_id = None
+            if values['user_email']:
+                user_id = users.get(values['user_email'])
+                if user_id is None:
+                    errors.append((row_number, f'No account with email {values["user_email"]}.'))
+                    continue
+                if user_id in state['claimed_users']:
+                    errors.append((row_number, f'Account {values["user_email"]} is already linked to an athlete.'))
+                    continue
+                state['claimed_users'].add(user_id)
+
+            state['index'][key] = ('row', row_number)
+            athletes.append(AthletePerson(
+                user_id=user_id,
+                first_name=values['first_name'],
+                last_name=values['last_name'],
+                date_of_birth=values['date_of_birth'],
+                gender=values['gender'],
+                email=values['email'],
+                phone=values['phone'],
+                center_id=values['center_id'],
+                blood_type=values['blood_type'],
+                emergency_contact_name=values['emergency_contact_name'],
+                emergency_contact_phone=values['emergency_contact_phone'],
+            ))
+
+            if values['guardian_email']:
+                guardian_user_id = users.get(values['guardian_email'])
+                if guardian_user_id is None:
+                    errors.append((
+                        row_number,
+                        f'Athlete imported, but no account with guardian email {values["guardian_email"]}.'
+                    ))
+                else:
+                    guardians.append((len(athletes) - 1, guardian_user_id, values['guardian_relationship']))
+
+        if not athletes:
+            return
+
+        with transaction.atomic():
+            created = AthletePerson.objects.bulk_create(athletes, batch_size=AthleteImportService.BATCH_SIZE)
+            AthleteImportService._fill_ids(created)
+            AthleteImportService._grant_role(
+                state, Role.ATHLETE, {athlete.user_id for athlete in created if athlete.user_id}
+            )
+
+            new_parents = []
+            if guardians:
+                guardian_user_ids = {user_id for _, user_id, _ in guardians}
+                parents = dict(Parent.objects.filter(user_id__in=guardian_user_ids).values_list('user_id', 'id'))
+                missing = guardian_user_ids - parents.keys()
+                if missing:
+                    new_parents = Parent.objects.bulk_create([Parent(user_id=user_id) for user_id in missing])
+                    parents.update(Parent.objects.filter(user_id__in=missing).values_list('user_id', 'id'))
+                ParentChildRelation.objects.bulk_create(
+                    [
+                        ParentChildRelation(
+                            parent_id=parents[user_id], child_id=created[position].id, relationship=relationship
+                        )
+                        for position, user_id, relationship in guardians
+                    ],
+                    batch_size=AthleteImportService.BATCH_SIZE,
+                    ignore_conflicts=True,
+                )
+                AthleteImportService._grant_role(state, Role.PARENT, guardian_user_ids)
+
+            # bulk_create skips the KPI counter signals
+            KpiService.record_created(created + new_parents)
+
+        result['created'] += len(created)
+        result['users_linked'] += sum(1 for athlete in created if athlete.user_id)
+        result['guardians_linked'] += len(guardians)
+
+    @staticmethod
+    def _grant_role(state, role_code, user_ids):
+        role_id = state['roles'].get(role_code)
+        if role_id and user_ids:
+            UserRole.objects.bulk_create(
+                [UserRole(user_id=user_id, role_id=role_id) for user_id in user_ids],
+                ignore_conflicts=True,
+            )
+
+    @staticmethod
+    def _parse_row(row, state):
+        """
+        Validate one row.
+
+        Returns:
+            dict: Cleaned field values
+
+        Raises:
+            ValueError: With a message for the error report
+        """
+        values = {
+            column: re.sub(r'\s+', ' ', (row.get(column) or '').strip())
+            for column in AthleteImportService.COLUMNS
+        }
+        missing = [column for column in AthleteImportService.REQUIRED if not values[column]]
+        if missing:
+            raise ValueError(f'Missing {", ".join(missing)}.')
+
+        for column in ('first_name', 'last_name'):
+            if len(values[column]) > AthletePerson._meta.get_field(column).max_length:
+                raise ValueError(f'{column} is too long.')
+
+        values['date_of_birth'] = AthleteImportService._parse_date(values['date_of_birth'])
+
+        values['gender'] = values['gender'].lower()
+        if values['gender'] not in AthleteImportService.GENDERS:
+            raise ValueError(f'Unknown gender "{values["gender"]}".')
+
+        values['blood_type'] = values['blood_type'].upper()
+        if values['blood_type'] and values['blood_type'] not in AthleteImportService.BLOOD_TYPES:
+            raise ValueError(f'Unknown blood type "{values["blood_type"]}".')
+
+        values['guardian_relationship'] = values['guardian_relationship'].lower() or 'guardian'
+        if values['guardian_relationship'] not in AthleteImportService.RELATIONSHIPS:
+            raise ValueError(f'Unknown guardian relationship "{values["guardian_relationship"]}".')
+
+        for column in ('email', 'user_email', 'guardian_email'):
+            values[column] = values[column].lower()
+
+        if values['center_id']:
+            if not values['center_id'].isdigit():
+                raise ValueError(f'Center {values["center_id"]} does not exist.')
+            values['center_id'] = AthleteImportService._check_center(int(values['center_id']), state)
+        elif state['default_center_id']:
+            values['center_id'] = state['default_center_id']
+        else:
+            raise ValueError('Row needs a center_id.')
+        return values
+
+    @staticmethod
+    def _check_center(center_id, state):
+        if center_id not in state['centers']:
+            if not Center.objects.filter(id=center_id).exists():
+                raise ValueError(f'Center {center_id} does not exist.')
+            state['centers'].add(center_id)
+        return center_id
+
+    @staticmethod
+    def _index_centers(center_ids, state):
+        new_centers = center_ids - state['loaded_centers']
+        if not new_centers:
+            return
+        for athlete_id, first_name, last_name, date_of_birth, center_id in AthletePerson.objects.filter(
+            center_id__in=new_centers
+        ).values_list('id', 'first_name', 'last_name', 'date_of_birth', 'center_id').iterator():
+            key = AthleteImportService.blocking_key(first_name, last_name, date_of_birth, center_id)
+            state['index'].setdefault(key, ('athlete', athlete_id))
+        state['loaded_centers'] |= new_centers
+
+    @staticmethod
+    def _fill_ids(athletes):
+        """Set ids on bulk-created athletes on backends that do not return them (MySQL)."""
+        if not athletes or athletes[0].id is not None:
+            return
+        ids = {}
+        for athlete_id, first_name, last_name, date_of_birth, center_id in AthletePerson.objects.filter(
+            center_id__in={athlete.center_id for athlete in athletes},
+            date_of_birth__in={athlete.date_of_birth for athlete in athletes},
+        ).order_by('id').values_list('id', 'first_name', 'last_name', 'date_of_birth', 'center_id'):
+            ids[AthleteImportService.blocking_key(first_name, last_name, date_of_birth, center_id)] = athlete_id
+        for athlete in athletes:
+            athlete.id = ids[AthleteImportService.blocking_key(
+                athlete.first_name, athlete.last_name, athlete.date_of_birth, athlete.center_id
+            )]
+
+    @staticmethod
+    def _parse_date(value):
+        for date_format in AthleteImportService.DATE_FORMATS:
+            try:
+                return datetime.strptime(value, date_format).date()
+            except ValueError:
+                continue
+        raise ValueError(f'Date of birth "{value}" is not YYYY-MM-DD or DD/MM/YYYY.')
+
+    @staticmethod
+    def _normalize(name):
+        return re.sub(r'[^\w]+', '', name.casefold())
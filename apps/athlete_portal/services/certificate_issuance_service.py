@@ -0,0 +1,230 @@
+"""
+Bulk certificate issuance for the athlete portal.
+Issues an event's award and participation certificates in one write.
+"""
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.template.loader import render_to_string
+
+from apps.athlete_portal.models import AthleteScore, CertificateSequence, EvaluationCertificate
+from apps.events.models import Event
+from apps.parent_portal.models import ParentChildRelation
+from .certificate_verification_service import CertificateVerificationService
+from .profile_loader import AthleteProfileLoader
+
+
+class CertificateIssuanceService:
+    """
+    Service class for issuing an event's certificates in bulk.
+
+    Recipients come from the event's AthleteScore.rank: each award covers
+    the placings up to its rank threshold, and everyone else with a score can
+    get a participation certificate. Athletes who already hold a certificate
+    with the same title for the event are skipped, so issuing again only
+    fills gaps. That check runs under a lock on the event row, and a unique
+    (athlete, event, title) constraint backs it up.
+
+    Certificate numbers come from a CertificateSequence row per prefix: a
+    whole block is reserved with one locked UPDATE, so numbers never collide
+    and no insert is retried. All certificates are written with one
+    bulk_create, and parent emails are sent together over one connection
+    after the transaction commits.
+    """
+
+    # (highest rank that qualifies, title), checked in order
+    AWARDS = [
+        (1, 'Gold Medal'),
+        (2, 'Silver Medal'),
+        (3, 'Bronze Medal'),
+    ]
+    PARTICIPATION_TITLE = 'Certificate of Participation'
+    NUMBER_DIGITS = 6
+    BATCH_SIZE = 500
+
+    @staticmethod
+    def default_prefix(event):
+        return f'MFU-{event.start_date.year}'
+
+    @staticmethod
+    def recipients(event, awards=None, participation=True):
+        """
+        Pick certificate recipients for an event.
+
+        Args:
+            event: Event to issue for
+            awards: List of (max rank, title) thresholds, defaults to AWARDS
+            participation: Give everyone without an award a participation certificate
+
+        Returns:
+            list: (athlete_id, title, rank) tuples, best placings first
+        """
+        awards = sorted(CertificateIssuanceService.AWARDS if awards is None else awards)
+        recipients = []
+        for athlete_id, rank in AthleteScore.objects.filter(event=event).order_by(
+            F('rank').asc(nulls_last=True), 'athlete_id'
+        ).values_list('athlete_id', 'rank'):
+            title = next((title for max_rank, title in awards if rank and rank <= max_rank), None)
+            if title is None and participation:
+                title = CertificateIssuanceService.PARTICIPATION_TITLE
+            if title:
+                recipients.append((athlete_id, title, rank))
+        return recipients
+
+    @staticmethod
+    def issue(event, issued_by=None, awards=None, participation=True, prefix=None, notify=True):
+        """
+        Issue certificates for an event.
+
+        Args:
+            event: Event to issue for
+            issued_by: User issuing the certificates
+            awards: List of (max rank, title) thresholds, defaults to AWARDS
+            participation: Also issue participation certificates
+            prefix: Certificate number prefix, defaults to MFU-<event year>
+            notify: Email parents who can view certificates
+
+        Returns:
+            dict: {'issued', 'skipped', 'certificates'}
+        """
+        with transaction.atomic():
+            # Lock the event row first so concurrent or repeated issues for
+            # the same event run one after another and each sees what the
+            # previous one wrote.
+            Event.objects.select_for_update().filter(pk=event.pk).first()
+            recipients = CertificateIssuanceService.recipients(event, awards, participation)
+            held = set(
+                EvaluationCertificate.objects.filter(event=event).values_list('athlete_id', 'title')
+            )
+            pending = [
+                (athlete_id, title, rank) for athlete_id, title, rank in recipients
+                if (athlete_id, title) not in held
+            ]
+            if not pending:
+                return {'issued': 0, 'skipped': len(recipients), 'certificates': []}
+
+            numbers = CertificateIssuanceService.allocate_numbers(
+                prefix or CertificateIssuanceService.default_prefix(event), len(pending)
+            )
+            certificates = EvaluationCertificate.objects.bulk_create(
+                [
+                    EvaluationCertificate(
+                        athlete_id=athlete_id,
+                        event=event,
+                        title=title,
+                        description=CertificateIssuanceService._description(event, title, rank),
+                        certificate_number=number,
+                        issued_by=issued_by,
+                    )
+                    for (athlete_id, title, rank), number in zip(pending, numbers)
+                ],
+                batch_size=CertificateIssuanceService.BATCH_SIZE,
+            )
+
+            # bulk_create skips the certificate signals
+            AthleteProfileLoader.invalidate(certificate.athlete_id for certificate in certificates)
+            CertificateVerificationService.invalidate(numbers)
+            if notify:
+                CertificateIssuanceService.queue_notifications(event, certificates)
+
+        return {
+            'issued': len(certificates),
+            'skipped': len(recipients) - len(pending),
+            'certificates': certificates,
+        }
+
+    @staticmethod
+    def allocate_numbers(prefix, count):
+        """
+        Reserve a block of certificate numbers.
+
+        The sequence row is locked for the rest of the caller's transaction,
+        so concurrent issuers get disjoint blocks. A new prefix starts after
+        the highest existing number that uses it.
+
+        Returns:
+            list: `count` numbers formatted as <prefix>-<zero-padded value>
+        """
+        if count <= 0:
+            return []
+        with transaction.atomic():
+            sequence = CertificateSequence.objects.select_for_update().filter(prefix=prefix).first()
+            if sequence is None:
+                try:
+                    with transaction.atomic():
+                        sequence = CertificateSequence.objects.create(
+                            prefix=prefix,
+                            last_value=CertificateIssuanceService._highest_existing(prefix)
+                        )
+                except IntegrityError:
+                    # Another issuer created the row first
+                    sequence = CertificateSequence.objects.select_for_update().get(prefix=prefix)
+
+            start = sequence.last_value + 1
+            CertificateSequence.objects.filter(pk=sequence.pk).update(last_value=F('last_value') + count)
+
+        digits = CertificateIssuanceService.NUMBER_DIGITS
+        return [f'{prefix}-{value:0{digits}d}' for value in range(start, start + count)]
+
+    @staticmethod
+    def queue_notifications(event, certificates):
+        """
+        Email each parent once about their children's new certificates.
+
+        Messages are built now and sent over one connection when the current
+        transaction commits, so a rolled-back issue sends nothing. The send
+        is robust: a mail server failure is logged and never turns an issue
+        that already committed into an error.
+
+        Returns:
+            int: Number of messages queued
+        """
+        by_athlete = {}
+        for certificate in certificates:
+            by_athlete.setdefault(certificate.athlete_id, []).append(certificate)
+
+        by_parent = {}
+        for relation in ParentChildRelation.objects.filter(
+            child_id__in=by_athlete,
+            is_active=True,
+            can_view_certificates=True,
+        ).exclude(parent__user__email='').select_related('parent__user', 'child'):
+            entry = by_parent.setdefault(relation.parent.user.email, {'parent': relation.parent, 'awards': []})
+            entry['awards'].extend(
+                (relation.child, certificate) for certificate in by_athlete[relation.child_id]
+            )
+
+        messages = [
+            EmailMessage(
+                subject=f'New certificates from {event.name} - MFU Web Portal',
+                body=render_to_string('athlete_portal/emails/certificates_issued.txt', {
+                    'parent': entry['parent'],
+                    'event': event,
+                    'awards': entry['awards'],
+                }),
+                from_email=settings.DEFAULT_FROM_EMAIL,
+                to=[email],
+            )
+            for email, entry in by_parent.items()
+        ]
+        if messages:
+            transaction.on_commit(lambda: get_connection().send_messages(messages), robust=True)
+        return len(messages)
+
+    @staticmethod
+    def _description(event, title, rank):
+        if title == CertificateIssuanceService.PARTICIPATION_TITLE or not rank:
+            return f'For taking part in {event.name}.'
+        return f'Awarded for placing #{rank} in {event.name}.'
+
+    @staticmethod
+    def _highest_existing(prefix):
+        highest = 0
+        for number in EvaluationCertificate.objects.filter(
+            certificate_number__startswith=f'{prefix}-'
+        ).values_list('certificate_number', flat=True).iterator():
+            suffix = number[len(prefix) + 1:]
+            if suffix.isdigit():
+                highest = max(highest, int(suffix))
+        return highest
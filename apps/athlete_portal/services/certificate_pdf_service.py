@@ -0,0 +1,260 @@
+"""
+Certificate PDF rendering for the athlete portal.
+Renders EvaluationCertificate PDFs with a small built-in PDF writer and keeps
+them under MEDIA_ROOT, addressed by a hash of what the certificate shows.
+"""
+import hashlib
+import json
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from django.conf import settings
+
+from apps.athlete_portal.models import EvaluationCertificate
+
+
+# Bump when the layout changes so every certificate renders again
+RENDERER_VERSION = 1
+
+# A4 landscape, in points
+PAGE_WIDTH = 842
+PAGE_HEIGHT = 595
+TEXT_WIDTH = 680
+
+# Standard Type 1 font widths (1/1000 em) for characters 32-126
+HELVETICA_WIDTHS = [
+    278, 278, 355, 556, 556, 889, 667, 191, 333, 333, 389, 584, 278, 333, 278, 278,
+    556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 278, 278, 584, 584, 584, 556,
+    1015, 667, 667, 722, 722, 667, 611, 778, 722, 278, 500, 667, 556, 833, 722, 778,
+    667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 278, 278, 278, 469, 556,
+    333, 556, 556, 500, 556, 556, 278, 556, 556, 222, 222, 500, 222, 833, 556, 556,
+    556, 556, 333, 500, 278, 556, 500, 722, 500, 500, 500, 334, 260, 334, 584,
+]
+HELVETICA_BOLD_WIDTHS = [
+    278, 333, 474, 556, 556, 889, 722, 238, 333, 333, 389, 584, 278, 333, 278, 278,
+    556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 333, 333, 584, 584, 584, 611,
+    975, 722, 722, 722, 722, 667, 611, 778, 722, 278, 556, 722, 611, 833, 722, 778,
+    667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 333, 278, 333, 584, 556,
+    333, 556, 611, 556, 611, 556, 333, 611, 611, 278, 278, 556, 278, 889, 611, 611,
+    611, 611, 389, 556, 333, 611, 556, 778, 556, 556, 500, 389, 280, 389, 584,
+]
+FONTS = {
+    'F1': ('Helvetica', HELVETICA_WIDTHS),
+    'F2': ('Helvetica-Bold', HELVETICA_BOLD_WIDTHS),
+}
+
+
+class CertificatePdfService:
+    """
+    Service class for certificate PDFs.
+
+    A certificate's PDF lives at certificates/<hash[:2]>/<hash>.pdf under
+    MEDIA_ROOT, where the hash covers every field printed on it plus the
+    renderer version. A certificate whose content has not changed maps to a
+    file that already exists and is never rendered twice; an edited one maps
+    to a new file. Batches render in a process pool, as rendering needs only
+    the content dict and no database access.
+    """
+
+    MEDIA_DIR = 'certificates'
+    DATE_FORMAT = '%B %d, %Y'
+
+    @staticmethod
+    def content(certificate):
+        """
+        Fields printed on a certificate.
+
+        Expects athlete, event and issued_by to be loaded (select_related).
+        """
+        athlete = certificate.athlete
+        issued_by = certificate.issued_by
+        return {
+            'version': RENDERER_VERSION,
+            'number': certificate.certificate_number,
+            'title': certificate.title,
+            'description': certificate.description,
+            'athlete': athlete.get_full_name(),
+            'event': certificate.event.name if certificate.event else '',
+            'issued': certificate.issued_date.strftime(CertificatePdfService.DATE_FORMAT),
+            'valid_until': (
+                certificate.valid_until.strftime(CertificatePdfService.DATE_FORMAT)
+                if certificate.valid_until else ''
+            ),
+            'issued_by': issued_by.get_full_name() if issued_by else '',
+        }
+
+    @staticmethod
+    def content_hash(content):
+        encoded = json.dumps(content, sort_keys=True, ensure_ascii=False).encode('utf-8')
+        return hashlib.sha256(encoded).hexdigest()
+
+    @staticmethod
+    def path_for(content_hash):
+        return Path(settings.MEDIA_ROOT) / CertificatePdfService.MEDIA_DIR / content_hash[:2] / f'{content_hash}.pdf'
+
+    @staticmethod
+    def get_pdf(certificate):
+        """
+        Path of a certificate's PDF, rendering it only if no file exists for its content.
+
+        Returns:
+            tuple: (Path, content hash)
+        """
+        content = CertificatePdfService.content(certificate)
+        content_hash = CertificatePdfService.content_hash(content)
+        path = CertificatePdfService.path_for(content_hash)
+        if not path.exists():
+            write_certificate_pdf((str(path), content))
+        return path, content_hash
+
+    @staticmethod
+    def render_event(event, workers=None):
+        """
+        Render every certificate issued for an event that has no PDF yet.
+
+        Args:
+            event: Event whose certificates to render
+            workers: Process pool size (defaults to the CPU count); 1 renders in-process
+
+        Returns:
+            dict: {'rendered', 'cached'} counts
+        """
+        certificates = EvaluationCertificate.objects.filter(event=event).select_related(
+            'athlete', 'event', 'issued_by'
+        )
+
+        pending = []
+        total = 0
+        for certificate in certificates:
+            total += 1
+            content = CertificatePdfService.content(certificate)
+            path = CertificatePdfService.path_for(CertificatePdfService.content_hash(content))
+            if not path.exists():
+                pending.append((str(path), content))
+
+        if workers == 1 or len(pending) < 2:
+            for job in pending:
+                write_certificate_pdf(job)
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                list(pool.map(write_certificate_pdf, pending, chunksize=16))
+
+        return {'rendered': len(pending), 'cached': total - len(pending)}
+
+    @staticmethod
+    def render(content):
+        """Render certificate content to PDF bytes."""
+        center = PAGE_WIDTH / 2
+        ops = [
+            # Double border
+            '0.13 0.29 0.53 RG 4 w 24 24 794 547 re S',
+            '0.8 0.65 0.2 RG 1.5 w 36 36 770 523 re S',
+            '0.13 0.29 0.53 rg',
+            _centered('F2', 34, 'Certificate', center, 490),
+            '0.2 0.2 0.2 rg',
+            _centered('F1', 14, 'This certifies that', center, 440),
+            _centered('F2', 28, content['athlete'], center, 400),
+            _centered('F2', 20, content['title'], center, 350),
+        ]
+
+        y = 315
+        for line in _wrap(content['description'], 'F1', 12, TEXT_WIDTH)[:6]:
+            ops.append(_centered('F1', 12, line, center, y))
+            y -= 17
+
+        details = [content['event'] and f"Event: {content['event']}", f"Issued: {content['issued']}"]
+        if content['valid_until']:
+            details.append(f"Valid until: {content['valid_until']}")
+        ops.append(_centered('F1', 11, '   |   '.join(filter(None, details)), center, 130))
+        if content['issued_by']:
+            ops.append(_centered('F1', 11, f"Issued by {content['issued_by']}", center, 110))
+        ops.append('0.45 0.45 0.45 rg')
+        ops.append(_centered('F1', 9, f"Certificate No. {content['number']}", center, 60))
+
+        return _pdf_document('\n'.join(ops).encode('cp1252', errors='replace'))
+
+
+def write_certificate_pdf(job):
+    """
+    Render one certificate to its path, atomically.
+
+    Module-level so a process pool can pickle it.
+
+    Args:
+        job: (path, content) tuple
+    """
+    path, content = job
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    data = CertificatePdfService.render(content)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+    with os.fdopen(fd, 'wb') as tmp_file:
+        tmp_file.write(data)
+    os.replace(tmp_path, path)
+    return str(path)
+
+
+def _text_width(text, font, size):
+    widths = FONTS[font][1]
+    units = sum(widths[ord(char) - 32] if 32 <= ord(char) <= 126 else 556 for char in text)
+    return units * size / 1000
+
+
+def _escape(text):
+    text = text.encode('cp1252', errors='replace').decode('cp1252')
+    return text.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+
+
+def _centered(font, size, text, center_x, y):
+    x = center_x - _text_width(text, font, size) / 2
+    return f'BT /{font} {size} Tf {x:.2f} {y} Td ({_escape(text)}) Tj ET'
+
+
+def _wrap(text, font, size, max_width):
+    lines = []
+    for paragraph in text.splitlines() or ['']:
+        line = ''
+        for word in paragraph.split():
+            candidate = f'{line} {word}' if line else word
+            if line and _text_width(candidate, font, size) > max_width:
+                lines.append(line)
+                line = word
+            else:
+                line = candidate
+        lines.append(line)
+    return lines
+
+
+def _pdf_document(stream):
+    """Assemble a one-page PDF around a content stream."""
+    fonts = ' '.join(f'/{name} {5 + i} 0 R' for i, name in enumerate(FONTS))
+    objects = [
+        b'<< /Type /Catalog /Pages 2 0 R >>',
+        b'<< /Type /Pages /Kids [3 0 R] /Count 1 >>',
+        (
+            f'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {PAGE_WIDTH} {PAGE_HEIGHT}] '
+            f'/Resources << /Font << {fonts} >> >> /Contents 4 0 R >>'
+        ).encode('ascii'),
+        b'<< /Length ' + str(len(stream)).encode('ascii') + b' >>\nstream\n' + stream + b'\nendstream',
+    ] + [
+        f'<< /Type /Font /Subtype /Type1 /BaseFont /{base_font} /Encoding /WinAnsiEncoding >>'.encode('ascii')
+        for base_font, _ in FONTS.values()
+    ]
+
+    output = bytearray(b'%PDF-1.4\n')
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(output))
+        output += f'{number} 0 obj\n'.encode('ascii') + body + b'\nendobj\n'
+
+    xref_offset = len(output)
+    output += f'xref\n0 {len(objects) + 1}\n0000000000 65535 f \n'.encode('ascii')
+    for offset in offsets:
+        output += f'{offset:010d} 00000 n \n'.encode('ascii')
+    output += (
+        f'trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\n'
+        f'startxref\n{xref_offset}\n%%EOF\n'
+    ).encode('ascii')
+    return bytes(output)
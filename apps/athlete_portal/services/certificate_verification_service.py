@@ -0,0 +1,170 @@
+"""
+Public certificate verification for the athlete portal.
+Looks certificates up by number, with validity computed in SQL.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from django.db import transaction
+from django.db.models import BooleanField, Case, Q, Value, When
+from django.utils import timezone
+
+from apps.athlete_portal.models import EvaluationCertificate
+
+
+class CertificateVerificationService:
+    """
+    Service class for verifying certificates by certificate_number.
+
+    Lookups use the unique index on certificate_number; a bulk check is a
+    single IN query. Validity follows EvaluationCertificate.is_valid() but is
+    computed in SQL against today's date.
+
+    Results are kept in a small in-process LRU cache with a TTL, including
+    unknown numbers (negative entries, with a shorter TTL) so repeated checks
+    of a bad number do not reach the database. Entries are stored per day so
+    validity never outlives the date it was computed for. Certificate changes
+    drop the entry in this process once their transaction commits; other
+    processes see the change when the TTL runs out.
+
+    Only what a verifier needs is returned: the holder is shown by first
+    name and last initial.
+    """
+
+    MAX_BULK = 1000
+    CACHE_SIZE = 5000
+    CACHE_TIMEOUT = 60 * 5  # seconds
+    NEGATIVE_CACHE_TIMEOUT = 60  # seconds
+
+    _cache = OrderedDict()
+    _lock = threading.Lock()
+
+    @staticmethod
+    def verify(certificate_number):
+        """
+        Verify one certificate.
+
+        Returns:
+            dict or None: Verification details, None for an unknown number
+        """
+        return CertificateVerificationService.verify_many([certificate_number])[certificate_number]
+
+    @staticmethod
+    def verify_many(certificate_numbers):
+        """
+        Verify up to MAX_BULK certificates with at most one query.
+
+        Args:
+            certificate_numbers: Iterable of certificate numbers
+
+        Returns:
+            dict: Certificate number to verification details, or None for unknown numbers
+
+        Raises:
+            ValueError: If more than MAX_BULK distinct numbers are given
+        """
+        numbers = list(dict.fromkeys(certificate_numbers))
+        if len(numbers) > CertificateVerificationService.MAX_BULK:
+            raise ValueError(
+                f'At most {CertificateVerificationService.MAX_BULK} certificates can be verified at once.'
+            )
+
+        today = timezone.localdate()
+        results = {}
+        missing = []
+        for number in numbers:
+            found, result = CertificateVerificationService._cache_get(number, today)
+            if found:
+                results[number] = result
+            else:
+                missing.append(number)
+
+        if missing:
+            loaded = {
+                row['certificate_number']: CertificateVerificationService._result(row)
+                for row in CertificateVerificationService.queryset(today).filter(
+                    certificate_number__in=missing
+                )
+            }
+            for number in missing:
+                results[number] = loaded.get(number)
+                CertificateVerificationService._cache_set(number, today, results[number])
+        return results
+
+    @staticmethod
+    def queryset(on=None):
+        """Certificate rows with an is_currently_valid annotation for the given date."""
+        on = on or timezone.localdate()
+        return EvaluationCertificate.objects.annotate(
+            is_currently_valid=Case(
+                When(
+                    Q(valid_from__lte=on) & (Q(valid_until__isnull=True) | Q(valid_until__gte=on)),
+                    then=Value(True)
+                ),
+                default=Value(False),
+                output_field=BooleanField(),
+            )
+        ).values(
+            'certificate_number', 'title', 'issued_date', 'valid_from', 'valid_until',
+            'is_currently_valid', 'athlete__first_name', 'athlete__last_name', 'event__name',
+        ).order_by()
+
+    @staticmethod
+    def invalidate(certificate_numbers):
+        """Drop cached results once the current transaction commits."""
+        numbers = set(certificate_numbers)
+        if numbers:
+            transaction.on_commit(lambda: CertificateVerificationService._cache_delete(numbers))
+
+    @staticmethod
+    def clear():
+        with CertificateVerificationService._lock:
+            CertificateVerificationService._cache.clear()
+
+    @staticmethod
+    def _result(row):
+        last_name = row['athlete__last_name']
+        return {
+            'certificate_number': row['certificate_number'],
+            'valid': row['is_currently_valid'],
+            'title': row['title'],
+            'athlete': f"{row['athlete__first_name']} {last_name[:1]}." if last_name else row['athlete__first_name'],
+            'event': row['event__name'] or '',
+            'issued_date': row['issued_date'].isoformat(),
+            'valid_from': row['valid_from'].isoformat(),
+            'valid_until': row['valid_until'].isoformat() if row['valid_until'] else None,
+        }
+
+    @staticmethod
+    def _cache_get(number, today):
+        cache = CertificateVerificationService._cache
+        with CertificateVerificationService._lock:
+            entry = cache.get(number)
+            if entry is None:
+                return False, None
+            expires, day, result = entry
+            if expires < time.monotonic() or day != today:
+                del cache[number]
+                return False, None
+            cache.move_to_end(number)
+            return True, result
+
+    @staticmethod
+    def _cache_set(number, today, result):
+        timeout = (
+            CertificateVerificationService.CACHE_TIMEOUT if result is not None
+            else CertificateVerificationService.NEGATIVE_CACHE_TIMEOUT
+        )
+        cache = CertificateVerificationService._cache
+        with CertificateVerificationService._lock:
+            cache[number] = (time.monotonic() + timeout, today, result)
+            cache.move_to_end(number)
+            while len(cache) > CertificateVerificationService.CACHE_SIZE:
+                cache.popitem(last=False)
+
+    @staticmethod
+    def _cache_delete(numbers):
+        with CertificateVerificationService._lock:
+            for number in numbers:
+                CertificateVerificationService._cache.pop(number, None)
@@ -0,0 +1,171 @@
+"""
+Leaderboard service for the athlete portal.
+Serves top-N, "around me" and percentile queries from cached per-category arrays.
+"""
+from array import array
+from bisect import bisect_left
+
+from django.core.cache import cache
+
+from apps.athlete_portal.models import AthleteRanking
+
+
+class LeaderboardService:
+    """
+    Service class for category leaderboards.
+
+    Each category is cached as compact parallel arrays ordered by rank, read
+    once through the (category, rank) index. The ranking engine refreshes a
+    category's arrays whenever it recomputes that category, so warm lookups
+    run no queries; "around me" finds the athlete with a binary search.
+    """
+
+    CACHE_TIMEOUT = 60 * 60  # seconds
+
+    @staticmethod
+    def cache_key(category):
+        return f'athlete_portal:leaderboard:{category}'
+
+    @staticmethod
+    def build(category):
+        """
+        Load a category's ranked athletes into compact ordered arrays.
+
+        Args:
+            category: Ranking category name
+
+        Returns:
+            dict: Parallel arrays ordered by rank plus a sorted athlete id index
+        """
+        rows = AthleteRanking.objects.filter(
+            category=category,
+            rank__gte=1
+        ).order_by('rank', 'athlete_id').values_list(
+            'athlete_id', 'rank', 'total_score',
+            'athlete__center_id', 'athlete__first_name', 'athlete__last_name'
+        )
+
+        board = {
+            'athlete_ids': array('q'),
+            'ranks': array('l'),
+            'scores': array('d'),
+            'center_ids': array('q'),
+            'names': [],
+        }
+        for athlete_id, rank, total_score, center_id, first_name, last_name in rows:
+            board['athlete_ids'].append(athlete_id)
+            board['ranks'].append(rank)
+            board['scores'].append(float(total_score))
+            board['center_ids'].append(center_id or 0)
+            board['names'].append(f'{first_name} {last_name}')
+
+        order = sorted(range(len(board['athlete_ids'])), key=board['athlete_ids'].__getitem__)
+        board['sorted_ids'] = array('q', (board['athlete_ids'][i] for i in order))
+        board['sorted_positions'] = array('l', order)
+        return board
+
+    @staticmethod
+    def get_board(category):
+        """Get a category's arrays from cache, building them when cold."""
+        key = LeaderboardService.cache_key(category)
+        board = cache.get(key)
+        if board is None:
+            board = LeaderboardService.build(category)
+            cache.set(key, board, LeaderboardService.CACHE_TIMEOUT)
+        return board
+
+    @staticmethod
+    def refresh(categories):
+        """Rebuild and cache the arrays for categories the ranking engine changed."""
+        cache.set_many(
+            {
+                LeaderboardService.cache_key(category): LeaderboardService.build(category)
+                for category in categories
+            },
+            LeaderboardService.CACHE_TIMEOUT
+        )
+
+    @staticmethod
+    def invalidate(categories):
+        cache.delete_many([LeaderboardService.cache_key(category) for category in categories])
+
+    @staticmethod
+    def top(category, n=10, center_id=None):
+        """
+        Top N athletes in a category, optionally limited to one center.
+
+        Returns:
+            list: Entry dicts ordered by rank
+        """
+        board = LeaderboardService.get_board(category)
+        if center_id is None:
+            return [LeaderboardService._entry(board, i) for i in range(min(n, len(board['ranks'])))]
+
+        entries = []
+        for i, entry_center_id in enumerate(board['center_ids']):
+            if entry_center_id == center_id:
+                entries.append(LeaderboardService._entry(board, i))
+                if len(entries) >= n:
+                    break
+        return entries
+
+    @staticmethod
+    def around(category, athlete_id, k=5):
+        """
+        An athlete's position with up to k neighbours on each side.
+
+        Returns:
+            dict or None: {'entry', 'neighbours', 'total', 'percentile'},
+                or None if the athlete is not ranked in the category
+        """
+        board = LeaderboardService.get_board(category)
+        position = LeaderboardService._position(board, athlete_id)
+        if position is None:
+            return None
+
+        total = len(board['ranks'])
+        start = max(position - k, 0)
+        end = min(position + k + 1, total)
+        entry = LeaderboardService._entry(board, position)
+        return {
+            'entry': entry,
+            'neighbours': [LeaderboardService._entry(board, i) for i in range(start, end)],
+            'total': total,
+            'percentile': LeaderboardService._percentile(entry['rank'], total),
+        }
+
+    @staticmethod
+    def percentile(category, athlete_id):
+        """
+        Percentage of the category an athlete ranks at or above (100 for first place).
+
+        Returns:
+            float or None: Percentile, or None if the athlete is not ranked
+        """
+        board = LeaderboardService.get_board(category)
+        position = LeaderboardService._position(board, athlete_id)
+        if position is None:
+            return None
+        return LeaderboardService._percentile(board['ranks'][position], len(board['ranks']))
+
+    @staticmethod
+    def _position(board, athlete_id):
+        sorted_ids = board['sorted_ids']
+        i = bisect_left(sorted_ids, athlete_id)
+        if i < len(sorted_ids) and sorted_ids[i] == athlete_id:
+            return board['sorted_positions'][i]
+        return None
+
+    @staticmethod
+    def _percentile(rank, total):
+        return round(100.0 * (total - rank + 1) / total, 1) if total else 0.0
+
+    @staticmethod
+    def _entry(board, i):
+        return {
+            'athlete_id': board['athlete_ids'][i],
+            'name': board['names'][i],
+            'center_id': board['center_ids'][i] or None,
+            'rank': board['ranks'][i],
+            'total_score': board['scores'][i],
+        }
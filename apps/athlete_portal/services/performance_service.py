@@ -0,0 +1,205 @@
+"""
+Performance time-series for the athlete portal.
+Builds per-score-type progress series with downsampling and personal bests.
+"""
+from datetime import date
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Avg, Count, Max, Min
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+
+from apps.athlete_portal.models import AthleteScore
+from .ranking_service import RankingService
+
+
+class PerformanceService:
+    """
+    Service class for athlete performance series.
+
+    Series are keyed by score_type and returned as parallel arrays (dates in
+    't', values in 'v') so the JSON stays compact. Two methods are offered:
+
+        lttb: every score by event date, thinned to the requested number of
+              points with Largest-Triangle-Three-Buckets
+        monthly: min/max/avg per month, aggregated in SQL with TruncMonth
+
+    Personal bests are a running max, or a running min for time and rank
+    score types. The raw series and the monthly buckets are cached per athlete
+    until one of its scores changes.
+    """
+
+    METHODS = ['lttb', 'monthly']
+    DEFAULT_POINTS = 200
+    MAX_POINTS = 2000
+    CACHE_TIMEOUT = 60 * 60 * 24  # seconds
+
+    @staticmethod
+    def cache_key(athlete_id, method):
+        return f'athlete_portal:performance:{athlete_id}:{method}'
+
+    @staticmethod
+    def invalidate(athlete_ids):
+        """Drop cached series once the current transaction commits."""
+        keys = [
+            PerformanceService.cache_key(athlete_id, method)
+            for athlete_id in set(athlete_ids)
+            for method in PerformanceService.METHODS
+        ]
+        if keys:
+            transaction.on_commit(lambda: cache.delete_many(keys))
+
+    @staticmethod
+    def get_series(athlete_id, method='lttb', points=DEFAULT_POINTS):
+        """
+        Get an athlete's performance series per score_type.
+
+        Args:
+            athlete_id: AthletePerson id
+            method: 'lttb' or 'monthly'
+            points: Maximum points per series for the lttb method
+
+        Returns:
+            dict: {'method', 'series': {score_type: columns}}. lttb columns are
+                t, v, best, pb_t, pb_v and n (raw score count); monthly
+                columns are t, min, max, avg, count, best, pb_t and pb_v.
+        """
+        key = PerformanceService.cache_key(athlete_id, method)
+        data = cache.get(key)
+        if data is None:
+            if method == 'monthly':
+                data = PerformanceService._load_monthly(athlete_id)
+            else:
+                data = PerformanceService._load_raw(athlete_id)
+            cache.set(key, data, PerformanceService.CACHE_TIMEOUT)
+
+        series = {}
+        for score_type, columns in data.items():
+            lower_is_better = score_type in RankingService.LOWER_IS_BETTER
+            if method == 'monthly':
+                bucket_best = columns['min'] if lower_is_better else columns['max']
+                series[score_type] = {
+                    **columns,
+                    **PerformanceService.personal_bests(columns['t'], bucket_best, lower_is_better),
+                }
+                continue
+
+            dates, values = columns['t'], columns['v']
+            bests = PerformanceService.personal_bests(dates, values, lower_is_better)
+            keep = PerformanceService.lttb([PerformanceService._ordinal(t) for t in dates], values, points)
+            series[score_type] = {
+                't': [dates[i] for i in keep],
+                'v': [values[i] for i in keep],
+                'best': [bests['best'][i] for i in keep],
+                'pb_t': bests['pb_t'],
+                'pb_v': bests['pb_v'],
+                'n': len(values),
+            }
+        return {'method': method, 'series': series}
+
+    @staticmethod
+    def personal_bests(dates, values, lower_is_better=False):
+        """
+        Running personal best over a series.
+
+        Returns:
+            dict: 'best' (the best so far at each point) and the dates and
+                values at which a new personal best was set ('pb_t', 'pb_v')
+        """
+        best_values, pb_dates, pb_values = [], [], []
+        best = None
+        for day, value in zip(dates, values):
+            if best is None or (value < best if lower_is_better else value > best):
+                best = value
+                pb_dates.append(day)
+                pb_values.append(value)
+            best_values.append(best)
+        return {'best': best_values, 'pb_t': pb_dates, 'pb_v': pb_values}
+
+    @staticmethod
+    def lttb(xs, ys, threshold):
+        """
+        Largest-Triangle-Three-Buckets downsampling.
+
+        Keeps the first and last points, and from each bucket in between the
+        point forming the largest triangle with the previously kept point and
+        the average of the next bucket.
+
+        Args:
+            xs: Ascending x values
+            ys: y values
+            threshold: Number of points to keep
+
+        Returns:
+            list: Indices of the kept points, ascending
+        """
+        n = len(xs)
+        if threshold >= n or n < 3:
+            return list(range(n))
+        threshold = max(threshold, 3)
+
+        bucket_size = (n - 2) / (threshold - 2)
+        kept = [0]
+        a = 0
+        for i in range(threshold - 2):
+            start = int(i * bucket_size) + 1
+            end = int((i + 1) * bucket_size) + 1
+
+            next_start = end
+            next_end = min(int((i + 2) * bucket_size) + 1, n)
+            next_count = next_end - next_start
+            avg_x = sum(xs[next_start:next_end]) / next_count
+            avg_y = sum(ys[next_start:next_end]) / next_count
+
+            best_area = -1
+            best_index = start
+            for j in range(start, end):
+                area = abs(
+                    (xs[a] - avg_x) * (ys[j] - ys[a]) - (xs[a] - xs[j]) * (avg_y - ys[a])
+                )
+                if area > best_area:
+                    best_area = area
+                    best_index = j
+            kept.append(best_index)
+            a = best_index
+        kept.append(n - 1)
+        return kept
+
+    @staticmethod
+    def _load_raw(athlete_id):
+        """Every score per score_type as date and value columns, ordered by event date."""
+        data = {}
+        for score_type, start_date, score in AthleteScore.objects.filter(
+            athlete_id=athlete_id
+        ).order_by('score_type', 'event__start_date', 'id').values_list(
+            'score_type', 'event__start_date', 'score'
+        ):
+            columns = data.setdefault(score_type, {'t': [], 'v': []})
+            columns['t'].append(timezone.localtime(start_date).date().isoformat())
+            columns['v'].append(float(score))
+        return data
+
+    @staticmethod
+    def _load_monthly(athlete_id):
+        """Min/max/avg/count per score_type and month, aggregated in SQL."""
+        data = {}
+        for row in AthleteScore.objects.filter(athlete_id=athlete_id).annotate(
+            month=TruncMonth('event__start_date')
+        ).values('score_type', 'month').annotate(
+            low=Min('score'), high=Max('score'), mean=Avg('score'), count=Count('id')
+        ).order_by('score_type', 'month'):
+            columns = data.setdefault(
+                row['score_type'], {'t': [], 'min': [], 'max': [], 'avg': [], 'count': []}
+            )
+            month = row['month']
+            columns['t'].append((month.date() if hasattr(month, 'date') else month).isoformat())
+            columns['min'].append(float(row['low']))
+            columns['max'].append(float(row['high']))
+            columns['avg'].append(round(float(row['mean']), 2))
+            columns['count'].append(row['count'])
+        return data
+
+    @staticmethod
+    def _ordinal(iso_date):
+        return date.fromisoformat(iso_date).toordinal()
@@ -0,0 +1,111 @@
+"""
+Athlete profile loading shared by the athlete, coach and parent portals.
+Loads an athlete and everything its profile pages show in a fixed number of queries.
+"""
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Prefetch
+from django.utils import timezone
+
+from apps.athlete_portal.models import AthletePerson, AthleteScore, EvaluationCertificate
+from apps.coach_portal.models import TeamMember, TrainingSession
+
+
+class AthleteProfileLoader:
+    """
+    Loader for an athlete's profile graph.
+
+    One query loads the athlete with its center, user and ranking, and one
+    prefetch each loads recent scores with their events, certificates, active
+    team memberships with their teams, and upcoming training sessions. The
+    result is cached per athlete; score, certificate, membership, ranking and
+    training session changes invalidate the entry once their transaction
+    commits. The entry also expires when its first upcoming session starts,
+    so a session that has begun is never listed as upcoming.
+
+    The loaded athlete carries these attributes:
+        rankings: List with the athlete's ranking, if any
+        recent_scores: Latest RECENT_SCORES scores, newest first
+        all_certificates: Certificates, newest first
+        active_memberships: Team memberships that have not been removed
+        upcoming_sessions: Next UPCOMING_SESSIONS training sessions
+    """
+
+    RECENT_SCORES = 10
+    UPCOMING_SESSIONS = 5
+    CACHE_TIMEOUT = 60 * 5  # seconds
+
+    @staticmethod
+    def cache_key(athlete_id):
+        return f'athlete_portal:profile:{athlete_id}'
+
+    @staticmethod
+    def load(athlete_id):
+        """
+        Get an athlete's profile graph, from cache when possible.
+
+        Args:
+            athlete_id: AthletePerson id
+
+        Returns:
+            AthletePerson or None: Athlete with the profile attributes set
+        """
+        key = AthleteProfileLoader.cache_key(athlete_id)
+        athlete = cache.get(key)
+        if athlete is None:
+            athlete = AthleteProfileLoader.queryset().filter(id=athlete_id).first()
+            if athlete is None:
+                return None
+            athlete.rankings = [athlete.ranking] if hasattr(athlete, 'ranking') else []
+            cache.set(key, athlete, AthleteProfileLoader.cache_timeout(athlete))
+        return athlete
+
+    @staticmethod
+    def cache_timeout(athlete, now=None):
+        """Seconds to cache a loaded profile: CACHE_TIMEOUT, or until its next session starts."""
+        timeout = AthleteProfileLoader.CACHE_TIMEOUT
+        if athlete.upcoming_sessions:
+            starts_in = (athlete.upcoming_sessions[0].start_time - (now or timezone.now())).total_seconds()
+            timeout = max(1, min(timeout, int(starts_in)))
+        return timeout
+
+    @staticmethod
+    def queryset():
+        """AthletePerson queryset with the profile graph joined and prefetched."""
+        return AthletePerson.objects.select_related('center', 'user', 'ranking').prefetch_related(
+            Prefetch(
+                'scores',
+                queryset=AthleteScore.objects.select_related('event').order_by(
+                    '-recorded_at'
+                )[:AthleteProfileLoader.RECENT_SCORES],
+                to_attr='recent_scores'
+            ),
+            Prefetch(
+                'certificates',
+                queryset=EvaluationCertificate.objects.select_related('event', 'issued_by').order_by(
+                    '-issued_date'
+                ),
+                to_attr='all_certificates'
+            ),
+            Prefetch(
+                'teammember_set',
+                queryset=TeamMember.objects.filter(removed_at__isnull=True).select_related('team'),
+                to_attr='active_memberships'
+            ),
+            Prefetch(
+                'training_sessions',
+                queryset=TrainingSession.objects.filter(
+                    start_time__gte=timezone.now()
+                ).select_related('coach__user').order_by(
+                    'start_time'
+                )[:AthleteProfileLoader.UPCOMING_SESSIONS],
+                to_attr='upcoming_sessions'
+            ),
+        )
+
+    @staticmethod
+    def invalidate(athlete_ids):
+        """Drop cached profiles once the current transaction commits."""
+        keys = [AthleteProfileLoader.cache_key(athlete_id) for athlete_id in set(athlete_ids)]
+        if keys:
+            transaction.on_commit(lambda: cache.delete_many(keys))
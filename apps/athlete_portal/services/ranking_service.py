@@ -0,0 +1,248 @@
+"""
+Ranking engine for the athlete portal.
+Maintains AthleteRanking totals incrementally from AthleteScore changes.
+"""
+import threading
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Case, Count, DecimalField, F, Sum, Value, When, Window
+from django.db.models.functions import Rank
+from django.utils import timezone
+
+from apps.athlete_portal.models import (
+    AGE_BANDS, OPEN_AGE_BAND, AthletePerson, AthleteRanking, AthleteScore
+)
+from .leaderboard_service import LeaderboardService
+from .profile_loader import AthleteProfileLoader
+
+
+_pending = threading.local()
+
+
+class RankingService:
+    """
+    Service class for athlete rankings.
+
+    Every AthleteScore contributes ranking points to its athlete's total:
+    the score itself for higher-is-better types, and LOWER_IS_BETTER_SCALE / score
+    for lower-is-better types such as time, so a faster time earns more points.
+    Totals are adjusted by deltas as scores change, and ranks are recomputed
+    only for the categories whose totals moved.
+    """
+
+    LOWER_IS_BETTER = ['time', 'rank']
+    LOWER_IS_BETTER_SCALE = Decimal('1000')
+
+    # Age bands used for the category of a newly created ranking
+    AGE_BANDS = AGE_BANDS
+    OPEN_CATEGORY = OPEN_AGE_BAND
+
+    TWO_PLACES = Decimal('0.01')
+
+    @staticmethod
+    def score_points(score, score_type):
+        """
+        Convert a score to ranking points according to its score_type.
+
+        Args:
+            score: Decimal score value
+            score_type: AthleteScore.score_type
+
+        Returns:
+            Decimal: Ranking points (never negative)
+        """
+        score = Decimal(score)
+        if score_type in RankingService.LOWER_IS_BETTER:
+            if score <= 0:
+                return Decimal('0.00')
+            return (RankingService.LOWER_IS_BETTER_SCALE / score).quantize(RankingService.TWO_PLACES)
+        return score.quantize(RankingService.TWO_PLACES)
+
+    @staticmethod
+    def default_category(athlete):
+        """Age-group category for an athlete without a ranking yet (e.g. U-14)."""
+        age = athlete.age
+        for band in RankingService.AGE_BANDS:
+            if age < band:
+                return f'U-{band}'
+        return RankingService.OPEN_CATEGORY
+
+    @staticmethod
+    def apply_deltas(deltas):
+        """
+        Adjust ranking totals for several athletes with one bulk UPDATE.
+
+        Missing AthleteRanking rows are created with a default age category.
+
+        Args:
+            deltas: Dict mapping athlete id to a (points_delta, events_delta) tuple
+
+        Returns:
+            set: Categories whose totals changed
+        """
+        deltas = {athlete_id: delta for athlete_id, delta in deltas.items() if any(delta)}
+        if not deltas:
+            return set()
+
+        now = timezone.now()
+        with transaction.atomic():
+            rankings = {
+                ranking.athlete_id: ranking
+                for ranking in AthleteRanking.objects.select_for_update().filter(athlete_id__in=deltas)
+            }
+
+            missing = deltas.keys() - rankings.keys()
+            if missing:
+                AthleteRanking.objects.bulk_create([
+                    AthleteRanking(athlete_id=athlete.id, category=RankingService.default_category(athlete))
+                    for athlete in AthletePerson.objects.filter(id__in=missing).only('id', 'date_of_birth')
+                ])
+                rankings.update({
+                    ranking.athlete_id: ranking
+                    for ranking in AthleteRanking.objects.select_for_update().filter(athlete_id__in=missing)
+                })
+
+            for athlete_id, (points, events) in deltas.items():
+                ranking = rankings[athlete_id]
+                ranking.total_score = max(ranking.total_score + points, Decimal('0.00'))
+                ranking.events_participated = max(ranking.events_participated + events, 0)
+                ranking.last_updated = now
+
+            AthleteRanking.objects.bulk_update(
+                rankings.values(), ['total_score', 'events_participated', 'last_updated']
+            )
+            AthleteProfileLoader.invalidate(rankings.keys())
+
+        return {ranking.category for ranking in rankings.values()}
+
+    @staticmethod
+    def recompute_ranks(categories):
+        """
+        Recompute ranks for the given categories.
+
+        Ranks come from RANK() OVER (PARTITION BY category ORDER BY total_score DESC)
+        and only rows whose rank changed are written, in one bulk UPDATE.
+
+        Args:
+            categories: Iterable of category names
+
+        Returns:
+            int: Number of rankings whose rank changed
+        """
+        categories = set(categories)
+        if not categories:
+            return 0
+
+        ranked = AthleteRanking.objects.filter(category__in=categories).annotate(
+            new_rank=Window(
+                expression=Rank(),
+                partition_by=F('category'),
+                order_by=F('total_score').desc(),
+            )
+        ).values_list('id', 'athlete_id', 'rank', 'new_rank')
+
+        changed = {
+            athlete_id: AthleteRanking(id=ranking_id, rank=new_rank)
+            for ranking_id, athlete_id, rank, new_rank in ranked
+            if rank != new_rank
+        }
+        AthleteRanking.objects.bulk_update(changed.values(), ['rank'])
+        AthleteProfileLoader.invalidate(changed.keys())
+
+        # Totals or ranks moved, so the cached leaderboards are stale
+        transaction.on_commit(lambda: LeaderboardService.refresh(categories))
+        return len(changed)
+
+    @staticmethod
+    def record_change(athlete_id, points_delta, events_delta):
+        """
+        Apply one athlete's delta and schedule a rank recompute for its category.
+
+        Rank recomputes are deferred until the surrounding transaction commits,
+        so several score changes in one transaction recompute each category once.
+        """
+        categories = RankingService.apply_deltas({athlete_id: (points_delta, events_delta)})
+        RankingService.schedule_recompute(categories)
+
+    @staticmethod
+    def schedule_recompute(categories):
+        """
+        Recompute ranks for categories once the current transaction commits.
+
+        Every call registers its own on_commit flush, so a rolled-back
+        transaction (which drops its callbacks) cannot strand later calls.
+        The first flush after a commit recomputes every pending category and
+        the rest find nothing left to do. Categories left behind by a
+        rollback are recomputed with the next flush, which is harmless.
+        """
+        if not categories:
+            return
+        pending = getattr(_pending, 'categories', None)
+        if pending is None:
+            pending = _pending.categories = set()
+        pending.update(categories)
+        transaction.on_commit(RankingService._flush_pending)
+
+    @staticmethod
+    def _flush_pending():
+        categories = getattr(_pending, 'categories', None)
+        _pending.categories = None
+        if categories:
+            RankingService.recompute_ranks(categories)
+
+    @staticmethod
+    def rebuild(categories=None):
+        """
+        Rebuild every ranking total from AthleteScore rows, then all ranks.
+
+        Args:
+            categories: Optional iterable limiting the rebuild to these categories
+
+        Returns:
+            int: Number of rankings rebuilt
+        """
+        points = Case(
+            When(
+                score_type__in=RankingService.LOWER_IS_BETTER,
+                score__gt=0,
+                then=Value(RankingService.LOWER_IS_BETTER_SCALE) / F('score'),
+            ),
+            When(score_type__in=RankingService.LOWER_IS_BETTER, then=Value(Decimal('0'))),
+            default=F('score'),
+            output_field=DecimalField(max_digits=12, decimal_places=2),
+        )
+        totals = defaultdict(lambda: (Decimal('0.00'), 0))
+        for row in AthleteScore.objects.values('athlete_id').annotate(
+            points=Sum(points), events=Count('id')
+        ).order_by():
+            totals[row['athlete_id']] = (
+                Decimal(row['points'] or 0).quantize(RankingService.TWO_PLACES),
+                row['events'],
+            )
+
+        with transaction.atomic():
+            existing = AthleteRanking.objects.select_for_update().values_list('athlete_id', flat=True)
+            missing = set(totals) - set(existing)
+            if missing and categories is None:
+                AthleteRanking.objects.bulk_create([
+                    AthleteRanking(athlete_id=athlete.id, category=RankingService.default_category(athlete))
+                    for athlete in AthletePerson.objects.filter(id__in=missing).only('id', 'date_of_birth')
+                ])
+
+            rankings = AthleteRanking.objects.all()
+            if categories is not None:
+                rankings = rankings.filter(category__in=set(categories))
+            rankings = list(rankings)
+
+            now = timezone.now()
+            for ranking in rankings:
+                ranking.total_score, ranking.events_participated = totals[ranking.athlete_id]
+                ranking.last_updated = now
+            AthleteRanking.objects.bulk_update(
+                rankings, ['total_score', 'events_participated', 'last_updated'], batch_size=1000
+            )
+            RankingService.recompute_ranks({ranking.category for ranking in rankings})
+
+        return len(rankings)
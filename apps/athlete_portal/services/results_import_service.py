@@ -0,0 +1,309 @@
+"""
+Event results import for the athlete portal.
+Turns a results spreadsheet into AthleteScore rows for one event.
+"""
+import csv
+import io
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+
+from django.db import transaction
+
+from apps.athlete_portal.models import AthletePerson, AthleteScore
+from apps.core.services import ActivityService
+from apps.events.models import EventRegistration
+from .performance_service import PerformanceService
+from .profile_loader import AthleteProfileLoader
+from .ranking_service import RankingService
+
+
+class ResultsImportService:
+    """
+    Service class for bulk event results.
+
+    Each row names its athlete by athlete_id, bib_number (the event
+    registration's bib) or first_name + last_name + date_of_birth. Athletes are
+    resolved against lookup dicts loaded with one query per strategy, the
+    per-event placings are recomputed in memory, and all scores are written
+    with one upsert on (athlete, event). Ranking totals are adjusted once for
+    the whole batch instead of once per row.
+    """
+
+    COLUMNS = [
+        'athlete_id', 'bib_number', 'first_name', 'last_name', 'date_of_birth',
+        'score', 'score_type', 'notes',
+    ]
+    SCORE_TYPES = [choice for choice, _ in AthleteScore._meta.get_field('score_type').choices]
+    MAX_SCORE = Decimal('999999.99')
+    DATE_FORMAT = '%Y-%m-%d'
+    BATCH_SIZE = 500
+
+    @staticmethod
+    def read_csv(file):
+        """
+        Read results rows from an uploaded or opened CSV file.
+
+        Header names are matched case-insensitively, with spaces treated as underscores.
+
+        Returns:
+            list: Row dicts keyed by normalized column name
+
+        Raises:
+            ValueError: A binary file is not UTF-8
+        """
+        content = file.read()
+        if isinstance(content, bytes):
+            try:
+                content = content.decode('utf-8-sig')
+            except UnicodeDecodeError:
+                raise ValueError('The file must be a UTF-8 CSV. Save it as "CSV UTF-8" and upload it again.')
+        reader = csv.DictReader(io.StringIO(content))
+        if reader.fieldnames:
+            reader.fieldnames = [
+                (name or '').strip().lower().replace(' ', '_') for name in reader.fieldnames
+            ]
+        return list(reader)
+
+    @staticmethod
+    def import_csv(event, file, default_score_type='points'):
+        """
+        Read a results CSV and import it for an event. See import_rows.
+
+        Raises:
+            ValueError: A binary file is not UTF-8; nothing was imported
+        """
+        return ResultsImportService.import_rows(
+            event, ResultsImportService.read_csv(file), default_score_type
+        )
+
+    @staticmethod
+    def import_rows(event, rows, default_score_type='points'):
+        """
+        Import results rows for an event.
+
+        Valid rows are upserted; invalid rows are skipped and reported.
+
+        Args:
+            event: Event the results belong to
+            rows: Iterable of row dicts (see COLUMNS)
+            default_score_type: score_type for rows that do not give one
+
+        Returns:
+            dict: {'created', 'updated', 'errors'} where errors is a list of
+                (row number, message) tuples, counting the header as row 1
+        """
+        rows = list(rows)
+        lookups = ResultsImportService._load_lookups(event, rows)
+
+        results = {}
+        errors = []
+        for row_number, row in enumerate(rows, start=2):
+            try:
+                athlete_id, score, score_type = ResultsImportService._parse_row(
+                    row, lookups, default_score_type
+                )
+            except ValueError as exc:
+                errors.append((row_number, str(exc)))
+                continue
+            if athlete_id in results:
+                errors.append((row_number, f'Duplicate result for athlete {athlete_id}.'))
+                continue
+            results[athlete_id] = {
+                'score': score,
+                'score_type': score_type,
+                'notes': (row.get('notes') or '').strip(),
+            }
+
+        if not results:
+            return {'created': 0, 'updated': 0, 'errors': errors}
+
+        with transaction.atomic():
+            existing = {
+                row['athlete_id']: row
+                for row in AthleteScore.objects.select_for_update().filter(event=event).values(
+                    'athlete_id', 'score', 'score_type', 'rank', 'notes'
+                )
+            }
+
+            # Placings cover the whole event, including scores not in this file
+            standings = {**existing, **results}
+            ranks = ResultsImportService.event_ranks(standings)
+
+            scores = [
+                AthleteScore(
+                    athlete_id=athlete_id,
+                    event=event,
+                    score=values['score'],
+                    score_type=values['score_type'],
+                    rank=ranks[athlete_id],
+                    notes=values['notes'],
+                )
+                for athlete_id, values in standings.items()
+                if athlete_id in results or existing[athlete_id]['rank'] != ranks[athlete_id]
+            ]
+            AthleteScore.objects.bulk_create(
+                scores,
+                batch_size=ResultsImportService.BATCH_SIZE,
+                update_conflicts=True,
+                unique_fields=['athlete', 'event'],
+                update_fields=['score', 'score_type', 'rank', 'notes', 'updated_at'],
+            )
+            AthleteProfileLoader.invalidate(score.athlete_id for score in scores)
+            PerformanceService.invalidate(results)
+
+            # bulk_create skips the score signals, so feed the ranking engine once
+            deltas = {}
+            for athlete_id, values in results.items():
+                points = RankingService.score_points(values['score'], values['score_type'])
+                previous = existing.get(athlete_id)
+                if previous is None:
+                    deltas[athlete_id] = (points, 1)
+                else:
+                    previous_points = RankingService.score_points(previous['score'], previous['score_type'])
+                    deltas[athlete_id] = (points - previous_points, 0)
+            RankingService.schedule_recompute(RankingService.apply_deltas(deltas))
+
+            created = len(results.keys() - existing.keys())
+            ActivityService.record_batch(
+                event, f'Results imported: {created} new, {len(results) - created} updated'
+            )
+        return {'created': created, 'updated': len(results) - created, 'errors': errors}
+
+    @staticmethod
+    def event_ranks(standings):
+        """
+        Placings within an event, computed per score_type with a sort.
+
+        Lower values place first for time and rank score types. Tied scores
+        share a placing and the next placing is skipped (1, 2, 2, 4).
+
+        Args:
+            standings: Dict mapping athlete id to a dict with 'score' and 'score_type'
+
+        Returns:
+            dict: Athlete id to placing
+        """
+        by_type = {}
+        for athlete_id, values in standings.items():
+            by_type.setdefault(values['score_type'], []).append((values['score'], athlete_id))
+
+        ranks = {}
+        for score_type, entries in by_type.items():
+            entries.sort(
+                key=lambda entry: entry[0],
+                reverse=score_type not in RankingService.LOWER_IS_BETTER
+            )
+            previous_score = None
+            for position, (score, athlete_id) in enumerate(entries, start=1):
+                if score != previous_score:
+                    rank = position
+                    previous_score = score
+                ranks[athlete_id] = rank
+        return ranks
+
+    @staticmethod
+    def _load_lookups(event, rows):
+        """Load the id, bib and name+DOB lookups the rows need, one query each."""
+        ids = set()
+        bibs = set()
+        birth_dates = set()
+        for row in rows:
+            value = (row.get('athlete_id') or '').strip()
+            if value.isdigit():
+                ids.add(int(value))
+            elif (row.get('bib_number') or '').strip():
+                bibs.add(row['bib_number'].strip())
+            else:
+                birth_date = ResultsImportService._parse_date(row.get('date_of_birth'))
+                if birth_date:
+                    birth_dates.add(birth_date)
+
+        lookups = {'ids': set(), 'bibs': {}, 'names': {}}
+        if ids:
+            lookups['ids'] = set(AthletePerson.objects.filter(id__in=ids).values_list('id', flat=True))
+        if bibs:
+            lookups['bibs'] = dict(
+                EventRegistration.objects.filter(
+                    event=event,
+                    bib_number__in=bibs,
+                    participant__athlete_profile__isnull=False
+                ).exclude(status='cancelled').values_list('bib_number', 'participant__athlete_profile__id')
+            )
+        if birth_dates:
+            for athlete_id, first_name, last_name, birth_date in AthletePerson.objects.filter(
+                date_of_birth__in=birth_dates
+            ).values_list('id', 'first_name', 'last_name', 'date_of_birth'):
+                key = ResultsImportService._name_key(first_name, last_name, birth_date)
+                lookups['names'].setdefault(key, []).append(athlete_id)
+        return lookups
+
+    @staticmethod
+    def _parse_row(row, lookups, default_score_type):
+        """
+        Resolve and validate one row.
+
+        Returns:
+            tuple: (athlete_id, score, score_type)
+
+        Raises:
+            ValueError: With a message for the error report
+        """
+        athlete_id = ResultsImportService._resolve_athlete(row, lookups)
+
+        score_type = (row.get('score_type') or '').strip().lower() or default_score_type
+        if score_type not in ResultsImportService.SCORE_TYPES:
+            raise ValueError(f'Unknown score type "{score_type}".')
+
+        raw_score = (row.get('score') or '').strip()
+        try:
+            score = Decimal(raw_score)
+        except InvalidOperation:
+            raise ValueError(f'Score "{raw_score}" is not a number.')
+        if not score.is_finite() or score < 0 or score > ResultsImportService.MAX_SCORE:
+            raise ValueError(f'Score "{raw_score}" is out of range.')
+        if score != score.quantize(RankingService.TWO_PLACES):
+            raise ValueError(f'Score "{raw_score}" has more than two decimal places.')
+        if score_type == 'time' and score == 0:
+            raise ValueError('Time must be greater than zero.')
+        if score_type == 'rank' and (score < 1 or score != score.to_integral_value()):
+            raise ValueError('Rank must be a whole number of at least 1.')
+
+        return athlete_id, score.quantize(RankingService.TWO_PLACES), score_type
+
+    @staticmethod
+    def _resolve_athlete(row, lookups):
+        value = (row.get('athlete_id') or '').strip()
+        if value:
+            if not value.isdigit() or int(value) not in lookups['ids']:
+                raise ValueError(f'Athlete {value} does not exist.')
+            return int(value)
+
+        bib_number = (row.get('bib_number') or '').strip()
+        if bib_number:
+            if bib_number not in lookups['bibs']:
+                raise ValueError(f'No athlete registered with bib {bib_number}.')
+            return lookups['bibs'][bib_number]
+
+        first_name = (row.get('first_name') or '').strip()
+        last_name = (row.get('last_name') or '').strip()
+        birth_date = ResultsImportService._parse_date(row.get('date_of_birth'))
+        if not (first_name and last_name and birth_date):
+            raise ValueError('Row needs athlete_id, bib_number, or first_name, last_name and date_of_birth.')
+
+        matches = lookups['names'].get(ResultsImportService._name_key(first_name, last_name, birth_date), [])
+        if not matches:
+            raise ValueError(f'No athlete named {first_name} {last_name} born {birth_date}.')
+        if len(matches) > 1:
+            raise ValueError(f'Several athletes named {first_name} {last_name} born {birth_date}; use athlete_id.')
+        return matches[0]
+
+    @staticmethod
+    def _parse_date(value):
+        try:
+            return datetime.strptime((value or '').strip(), ResultsImportService.DATE_FORMAT).date()
+        except ValueError:
+            return None
+
+    @staticmethod
+    def _name_key(first_name, last_name, birth_date):
+        return (first_name.strip().casefold(), last_name.strip().casefold(), birth_date)
@@ -0,0 +1,137 @@
+"""
+Signal handlers for athlete portal models.
+Feed AthleteScore changes into the incremental ranking engine and keep
+cached leaderboards, athlete profiles, performance series and certificate
+verifications in step with edits.
+"""
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from apps.coach_portal.models import TeamMember, TrainingSession
+from .models import AthletePerson, AthleteRanking, AthleteScore, EvaluationCertificate
+from .services import (
+    AthleteProfileLoader, CertificateVerificationService, LeaderboardService, PerformanceService, RankingService
+)
+
+
+@receiver(pre_save, sender=AthleteScore)
+def remember_previous_score(sender, instance, **kwargs):
+    """Keep the stored score so post_save can apply the difference."""
+    instance._ranking_previous = None
+    if instance.pk:
+        instance._ranking_previous = AthleteScore.objects.filter(pk=instance.pk).values(
+            'athlete_id', 'score', 'score_type'
+        ).first()
+
+
+@receiver(post_save, sender=AthleteScore)
+def update_ranking_on_save(sender, instance, created, **kwargs):
+    points = RankingService.score_points(instance.score, instance.score_type)
+    previous = getattr(instance, '_ranking_previous', None)
+
+    if previous is None:
+        RankingService.record_change(instance.athlete_id, points, 1)
+        return
+
+    previous_points = RankingService.score_points(previous['score'], previous['score_type'])
+    if previous['athlete_id'] != instance.athlete_id:
+        RankingService.record_change(previous['athlete_id'], -previous_points, -1)
+        RankingService.record_change(instance.athlete_id, points, 1)
+    elif points != previous_points:
+        RankingService.record_change(instance.athlete_id, points - previous_points, 0)
+
+
+@receiver(post_delete, sender=AthleteScore)
+def update_ranking_on_delete(sender, instance, **kwargs):
+    points = RankingService.score_points(instance.score, instance.score_type)
+    RankingService.record_change(instance.athlete_id, -points, -1)
+
+
+@receiver(post_save, sender=AthleteRanking)
+@receiver(post_delete, sender=AthleteRanking)
+def invalidate_leaderboard_on_ranking_change(sender, instance, **kwargs):
+    """Rankings edited directly (e.g. in the admin) bypass the engine's refresh."""
+    LeaderboardService.invalidate([instance.category])
+
+
+@receiver(post_save, sender=AthletePerson)
+def invalidate_leaderboard_on_athlete_change(sender, instance, created, **kwargs):
+    """Leaderboards carry athlete names and centers."""
+    if created:
+        return
+    category = AthleteRanking.objects.filter(athlete=instance).values_list('category', flat=True).first()
+    if category is not None:
+        LeaderboardService.invalidate([category])
+
+
+@receiver(post_save, sender=AthleteScore)
+@receiver(post_delete, sender=AthleteScore)
+@receiver(post_save, sender=EvaluationCertificate)
+@receiver(post_delete, sender=EvaluationCertificate)
+@receiver(post_save, sender=TeamMember)
+@receiver(post_delete, sender=TeamMember)
+@receiver(post_save, sender=AthleteRanking)
+def invalidate_profile_on_related_change(sender, instance, **kwargs):
+    """A score moved to another athlete also drops the previous athlete's profile."""
+    athlete_ids = [instance.athlete_id]
+    previous = getattr(instance, '_ranking_previous', None)
+    if previous is not None:
+        athlete_ids.append(previous['athlete_id'])
+    AthleteProfileLoader.invalidate(athlete_ids)
+
+
+@receiver(post_save, sender=AthletePerson)
+@receiver(post_delete, sender=AthletePerson)
+def invalidate_profile_on_athlete_change(sender, instance, **kwargs):
+    AthleteProfileLoader.invalidate([instance.id])
+
+
+@receiver(post_save, sender=TrainingSession)
+@receiver(pre_delete, sender=TrainingSession)
+def invalidate_profile_on_session_change(sender, instance, created=False, **kwargs):
+    """Profiles list upcoming sessions. Attendees are read before a delete removes their links."""
+    if created:
+        return
+    AthleteProfileLoader.invalidate(instance.athletes.values_list('id', flat=True))
+
+
+@receiver(m2m_changed, sender=TrainingSession.athletes.through)
+def invalidate_profile_on_session_athletes_change(sender, instance, action, reverse, pk_set, **kwargs):
+    """Sessions added to or removed from an athlete, from either side of the relation."""
+    if reverse:
+        if action in ('post_add', 'post_remove', 'post_clear'):
+            AthleteProfileLoader.invalidate([instance.pk])
+    elif action in ('post_add', 'post_remove'):
+        AthleteProfileLoader.invalidate(pk_set)
+    elif action == 'pre_clear':
+        AthleteProfileLoader.invalidate(instance.athletes.values_list('id', flat=True))
+
+
+@receiver(post_save, sender=AthleteScore)
+@receiver(post_delete, sender=AthleteScore)
+def invalidate_performance_on_score_change(sender, instance, **kwargs):
+    athlete_ids = [instance.athlete_id]
+    previous = getattr(instance, '_ranking_previous', None)
+    if previous is not None:
+        athlete_ids.append(previous['athlete_id'])
+    PerformanceService.invalidate(athlete_ids)
+
+
+@receiver(pre_save, sender=EvaluationCertificate)
+def remember_previous_certificate_number(sender, instance, **kwargs):
+    instance._previous_certificate_number = None
+    if instance.pk:
+        instance._previous_certificate_number = EvaluationCertificate.objects.filter(
+            pk=instance.pk
+        ).values_list('certificate_number', flat=True).first()
+
+
+@receiver(post_save, sender=EvaluationCertificate)
+@receiver(post_delete, sender=EvaluationCertificate)
+def invalidate_verification_on_certificate_change(sender, instance, **kwargs):
+    """A renumbered certificate also drops the entry for its old number."""
+    numbers = [instance.certificate_number]
+    previous = getattr(instance, '_previous_certificate_number', None)
+    if previous:
+        numbers.append(previous)
+    CertificateVerificationService.invalidate(numbers)
@@ -1,3 +1,763 @@
-from django.test import TestCase
+import shutil
+import tempfile
+from datetime import date, timedelta
+from decimal import Decimal
+from io import StringIO
 
-# Create your tests here.
+from django.core import mail
+from django.core.cache import cache
+from django.core.mail.backends.base import BaseEmailBackend
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import IntegrityError, connection, transaction
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from apps.athlete_portal import views
+from apps.athlete_portal.models import AthletePerson, AthleteRanking, AthleteScore, EvaluationCertificate
+from apps.athlete_portal.services import (
+    AthleteImportService, AthleteProfileLoader, CertificateIssuanceService, CertificatePdfService, CertificateVerificationService,
+    LeaderboardService, PerformanceService, RankingService, ResultsImportService
+)
+from apps.centers.models import Center
+from apps.coach_portal.models import CoachProfile, CompetitionTeam, TeamMember, TrainingSession
+from apps.core.models import Role, User, UserRole
+from apps.core.services import TokenBucketLimiter
+from apps.events.models import Event, EventRegistration
+from apps.parent_portal.models import Parent, ParentChildRelation
+
+
+def create_center(name='Test Center'):
+    return Center.objects.create(
+        name=name, address='1 Track Rd', city='Pune', phone='123', email='center@test.com'
+    )
+
+
+def create_event(center, name='Meet'):
+    now = timezone.now()
+    return Event.objects.create(
+        name=name, description='Meet', center=center,
+        start_date=now, end_date=now + timedelta(hours=4),
+        registration_start=now - timedelta(days=7), registration_end=now,
+        max_participants=100
+    )
+
+
+def create_athlete(center, first_name, born=date(2013, 1, 1)):
+    return AthletePerson.objects.create(
+        first_name=first_name, last_name='Test', date_of_birth=born,
+        gender='female', center=center
+    )
+
+
+class RankingServiceTest(TestCase):
+    def setUp(self):
+        self.center = create_center()
+        self.event = create_event(self.center)
+
+    def test_score_points_respect_score_type(self):
+        self.assertEqual(RankingService.score_points(Decimal('42.5'), 'points'), Decimal('42.50'))
+        self.assertEqual(RankingService.score_points(Decimal('10'), 'time'), Decimal('100.00'))
+        self.assertGreater(
+            RankingService.score_points(Decimal('11.2'), 'time'),
+            RankingService.score_points(Decimal('12.4'), 'time'),
+        )
+
+    def test_scores_update_totals_and_ranks_incrementally(self):
+        a = create_athlete(self.center, 'A')
+        b = create_athlete(self.center, 'B')
+        with self.captureOnCommitCallbacks(execute=True):
+            AthleteScore.objects.create(athlete=a, event=self.event, score=Decimal('50'))
+            score_b = AthleteScore.objects.create(athlete=b, event=self.event, score=Decimal('80'))
+
+        ranking_a, ranking_b = a.ranking, b.ranking
+        ranking_a.refresh_from_db()
+        ranking_b.refresh_from_db()
+        self.assertEqual(ranking_a.category, 'U-14')
+        self.assertEqual((ranking_b.total_score, ranking_b.rank, ranking_b.events_participated), (Decimal('80'), 1, 1))
+        self.assertEqual(ranking_a.rank, 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            score_b.score = Decimal('20')
+            score_b.save()
+        ranking_a.refresh_from_db()
+        ranking_b.refresh_from_db()
+        self.assertEqual((ranking_b.total_score, ranking_b.rank), (Decimal('20'), 2))
+        self.assertEqual(ranking_a.rank, 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            score_b.delete()
+        ranking_b.refresh_from_db()
+        self.assertEqual((ranking_b.total_score, ranking_b.events_participated), (Decimal('0'), 0))
+
+    def test_rolled_back_recompute_does_not_block_later_ones(self):
+        a = create_athlete(self.center, 'A')
+        b = create_athlete(self.center, 'B')
+        with self.captureOnCommitCallbacks(execute=True):
+            try:
+                with transaction.atomic():
+                    AthleteScore.objects.create(athlete=a, event=self.event, score=Decimal('50'))
+                    raise ValueError('rolled back')
+            except ValueError:
+                pass
+
+        with self.captureOnCommitCallbacks(execute=True):
+            AthleteScore.objects.create(athlete=b, event=self.event, score=Decimal('80'))
+        b.ranking.refresh_from_db()
+        self.assertEqual((b.ranking.total_score, b.ranking.rank), (Decimal('80'), 1))
+
+    def test_score_insert_touches_only_its_category(self):
+        other_event = create_event(self.center, 'Other Meet')
+        for i in range(50):
+            athlete = create_athlete(self.center, f'Younger{i}', born=date(2016, 1, 1))
+            AthleteRanking.objects.create(athlete=athlete, category='U-10', total_score=i)
+        for i in range(50):
+            athlete = create_athlete(self.center, f'Older{i}')
+            AthleteRanking.objects.create(athlete=athlete, category='U-14', total_score=i)
+        RankingService.rebuild()
+        untouched = dict(AthleteRanking.objects.filter(category='U-10').values_list('id', 'last_updated'))
+
+        athlete = AthletePerson.objects.get(first_name='Older0')
+        with CaptureQueriesContext(connection) as queries:
+            with self.captureOnCommitCallbacks(execute=True):
+                AthleteScore.objects.create(athlete=athlete, event=other_event, score=Decimal('1000'))
+
+        updates = [q['sql'] for q in queries.captured_queries if q['sql'].startswith('UPDATE')]
+        # One UPDATE for the total, one for the changed ranks in U-14 only
+        self.assertEqual(len(updates), 2)
+        self.assertEqual(
+            dict(AthleteRanking.objects.filter(category='U-10').values_list('id', 'last_updated')),
+            untouched
+        )
+        athlete.ranking.refresh_from_db()
+        self.assertEqual(athlete.ranking.rank, 1)
+
+    def test_rebuild_command(self):
+        a = create_athlete(self.center, 'A')
+        AthleteScore.objects.bulk_create([
+            AthleteScore(athlete=a, event=self.event, score=Decimal('10'), score_type='time'),
+            AthleteScore(athlete=a, event=create_event(self.center, 'Second'), score=Decimal('5')),
+        ])
+        call_command('rebuild_rankings', stdout=StringIO())
+        ranking = AthleteRanking.objects.get(athlete=a)
+        self.assertEqual((ranking.total_score, ranking.events_participated, ranking.rank), (Decimal('105'), 2, 1))
+
+
+class LeaderboardServiceTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.center = create_center()
+        self.other_center = create_center('Other Center')
+        self.athletes = []
+        for i in range(10):
+            center = self.center if i % 2 == 0 else self.other_center
+            athlete = create_athlete(center, f'Athlete{i}')
+            AthleteRanking.objects.create(athlete=athlete, category='U-14', total_score=100 - i)
+            self.athletes.append(athlete)
+        RankingService.recompute_ranks(['U-14'])
+
+    def test_top_and_center_filter(self):
+        top = LeaderboardService.top('U-14', n=3)
+        self.assertEqual([entry['rank'] for entry in top], [1, 2, 3])
+        self.assertEqual(top[0]['athlete_id'], self.athletes[0].id)
+
+        center_top = LeaderboardService.top('U-14', n=2, center_id=self.other_center.id)
+        self.assertEqual([entry['athlete_id'] for entry in center_top], [self.athletes[1].id, self.athletes[3].id])
+
+    def test_around_is_served_from_cache(self):
+        LeaderboardService.get_board('U-14')
+        with self.assertNumQueries(0):
+            window = LeaderboardService.around('U-14', self.athletes[5].id, k=2)
+        self.assertEqual([entry['rank'] for entry in window['neighbours']], [4, 5, 6, 7, 8])
+        self.assertEqual(window['entry']['rank'], 6)
+        self.assertEqual(window['total'], 10)
+        self.assertEqual(window['percentile'], 50.0)
+
+        edge = LeaderboardService.around('U-14', self.athletes[0].id, k=2)
+        self.assertEqual([entry['rank'] for entry in edge['neighbours']], [1, 2, 3])
+        self.assertIsNone(LeaderboardService.around('U-10', self.athletes[0].id))
+
+    def test_rank_recompute_refreshes_cached_board(self):
+        LeaderboardService.get_board('U-14')
+        last = self.athletes[-1]
+        with self.captureOnCommitCallbacks(execute=True):
+            AthleteScore.objects.create(athlete=last, event=create_event(self.center), score=Decimal('500'))
+
+        self.assertEqual(LeaderboardService.top('U-14', n=1)[0]['athlete_id'], last.id)
+        self.assertEqual(LeaderboardService.percentile('U-14', last.id), 100.0)
+
+
+class ResultsImportServiceTest(TestCase):
+    def setUp(self):
+        self.center = create_center()
+        self.event = create_event(self.center)
+        self.a = create_athlete(self.center, 'Asha')
+        self.b = create_athlete(self.center, 'Bela', born=date(2012, 5, 6))
+        self.c = create_athlete(self.center, 'Chitra')
+        self.c.user = User.objects.create_user(email='chitra@test.com', password='password')
+        self.c.save()
+        EventRegistration.objects.create(event=self.event, participant=self.c.user, bib_number='101')
+
+    def import_csv(self, content, score_type='time'):
+        with self.captureOnCommitCallbacks(execute=True):
+            return ResultsImportService.import_csv(self.event, StringIO(content), score_type)
+
+    def test_resolves_athletes_and_ranks_in_memory(self):
+        result = self.import_csv(
+            'Athlete ID,Bib Number,First Name,Last Name,Date of Birth,Score\n'
+            f'{self.a.id},,,,,12.40\n'
+            ',101,,,,11.90\n'
+            ',,bela,TEST,2012-05-06,12.40\n'
+            ',,Nobody,Test,2012-05-06,10.00\n'
+            f'{self.a.id},,,,,13.00\n'
+            '999999,,,,,10.00\n'
+        )
+
+        self.assertEqual((result['created'], result['updated']), (3, 0))
+        self.assertEqual([row for row, _ in result['errors']], [5, 6, 7])
+        ranks = dict(AthleteScore.objects.filter(event=self.event).values_list('athlete_id', 'rank'))
+        self.assertEqual(ranks, {self.c.id: 1, self.a.id: 2, self.b.id: 2})
+
+        ranking = AthleteRanking.objects.get(athlete=self.c)
+        self.assertEqual((ranking.rank, ranking.events_participated), (1, 1))
+
+    def test_validates_against_score_type(self):
+        result = self.import_csv(
+            'athlete_id,score,score_type\n'
+            f'{self.a.id},0,time\n'
+            f'{self.b.id},2.5,rank\n'
+            f'{self.c.id},abc,points\n'
+            f'{self.c.id},1.234,points\n'
+            f'{self.c.id},5,speed\n'
+        )
+        self.assertEqual(len(result['errors']), 5)
+        self.assertFalse(AthleteScore.objects.exists())
+
+    def test_reimport_upserts_and_adjusts_rankings_once(self):
+        self.import_csv(f'athlete_id,score\n{self.a.id},20\n{self.b.id},25\n')
+
+        with CaptureQueriesContext(connection) as queries:
+            result = self.import_csv(f'athlete_id,score\n{self.a.id},10\n{self.c.id},30\n')
+
+        self.assertEqual((result['created'], result['updated']), (1, 1))
+        self.assertEqual(AthleteScore.objects.filter(event=self.event).count(), 3)
+        ranks = dict(AthleteScore.objects.filter(event=self.event).values_list('athlete_id', 'rank'))
+        self.assertEqual(ranks, {self.a.id: 1, self.b.id: 2, self.c.id: 3})
+
+        ranking_a = AthleteRanking.objects.get(athlete=self.a)
+        self.assertEqual((ranking_a.total_score, ranking_a.events_participated), (Decimal('100.00'), 1))
+        ranking_updates = [
+            q['sql'] for q in queries.captured_queries
+            if q['sql'].startswith('UPDATE "athlete_rankings" SET "total_score"')
+        ]
+        self.assertEqual(len(ranking_updates), 1)
+
+    def test_admin_upload_rejects_non_utf8(self):
+        admin_user = User.objects.create_user(email='admin@test.com', password='password', is_active=True)
+        role = Role.objects.create(code=Role.ADMIN, name='Admin', dashboard_url='admin_portal:dashboard')
+        UserRole.objects.create(user=admin_user, role=role)
+        self.client.force_login(admin_user)
+
+        content = f'athlete_id,score,notes\n{self.a.id},12.40,Très bien\n'.encode('cp1252')
+        response = self.client.post(
+            reverse('admin_portal:event_results_import', args=[self.event.id]),
+            {'results_file': SimpleUploadedFile('results.csv', content), 'score_type': 'time'}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNone(response.context['result'])
+        self.assertIn('UTF-8', response.context['form'].errors['results_file'][0])
+        self.assertFalse(AthleteScore.objects.exists())
+
+
+class AthleteProfileLoaderTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.center = create_center()
+        self.athlete = create_athlete(self.center, 'Asha')
+        coach_user = User.objects.create_user(email='coach@test.com', password='password', is_active=True)
+        role = Role.objects.create(code=Role.COACH, name='Coach', dashboard_url='coach_portal:dashboard')
+        UserRole.objects.create(user=coach_user, role=role)
+        self.coach_user = coach_user
+        coach = CoachProfile.objects.create(user=coach_user, center=self.center)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            for i in range(12):
+                AthleteScore.objects.create(
+                    athlete=self.athlete, event=create_event(self.center, f'Meet {i}'), score=i
+                )
+        for name in ['Jumpers', 'Sprinters']:
+            team = CompetitionTeam.objects.create(coach=coach, name=name, category='U-14')
+            TeamMember.objects.create(team=team, athlete=self.athlete)
+        TeamMember.objects.filter(team__name='Sprinters').update(removed_at=timezone.now())
+        now = timezone.now()
+        for days in [-1, 1, 2]:
+            session = TrainingSession.objects.create(
+                coach=coach, center=self.center, title=f'Session {days}',
+                start_time=now + timedelta(days=days), end_time=now + timedelta(days=days, hours=1)
+            )
+            session.athletes.add(self.athlete)
+
+    def test_loads_profile_in_fixed_queries_then_from_cache(self):
+        with self.assertNumQueries(5):
+            athlete = AthleteProfileLoader.load(self.athlete.id)
+        self.assertEqual(len(athlete.recent_scores), AthleteProfileLoader.RECENT_SCORES)
+        self.assertEqual(athlete.recent_scores[0].event.name, 'Meet 11')
+        self.assertEqual([m.team.name for m in athlete.active_memberships], ['Jumpers'])
+        self.assertEqual([s.title for s in athlete.upcoming_sessions], ['Session 1', 'Session 2'])
+        self.assertEqual(athlete.rankings[0].events_participated, 12)
+
+        with self.assertNumQueries(0):
+            AthleteProfileLoader.load(self.athlete.id)
+
+    def test_certificate_change_invalidates_after_commit(self):
+        AthleteProfileLoader.load(self.athlete.id)
+        with self.captureOnCommitCallbacks(execute=True):
+            EvaluationCertificate.objects.create(
+                athlete=self.athlete, title='Gold', description='First place', certificate_number='C-1'
+            )
+        self.assertEqual(len(AthleteProfileLoader.load(self.athlete.id).all_certificates), 1)
+
+    def test_session_changes_invalidate_after_commit(self):
+        AthleteProfileLoader.load(self.athlete.id)
+        session = TrainingSession.objects.get(title='Session 2')
+        with self.captureOnCommitCallbacks(execute=True):
+            session.title = 'Moved session'
+            session.save()
+        self.assertEqual(
+            [s.title for s in AthleteProfileLoader.load(self.athlete.id).upcoming_sessions],
+            ['Session 1', 'Moved session']
+        )
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.athlete.training_sessions.remove(session)
+        self.assertEqual(
+            [s.title for s in AthleteProfileLoader.load(self.athlete.id).upcoming_sessions], ['Session 1']
+        )
+
+        with self.captureOnCommitCallbacks(execute=True):
+            TrainingSession.objects.get(title='Session 1').delete()
+        self.assertEqual(AthleteProfileLoader.load(self.athlete.id).upcoming_sessions, [])
+
+    def test_cache_expires_when_next_session_starts(self):
+        athlete = AthleteProfileLoader.load(self.athlete.id)
+        first_start = athlete.upcoming_sessions[0].start_time
+        self.assertEqual(
+            AthleteProfileLoader.cache_timeout(athlete, now=first_start - timedelta(seconds=90)), 90
+        )
+        self.assertEqual(
+            AthleteProfileLoader.cache_timeout(athlete, now=first_start - timedelta(days=1)),
+            AthleteProfileLoader.CACHE_TIMEOUT
+        )
+
+    def test_detail_view_for_coach(self):
+        self.client.force_login(self.coach_user)
+        response = self.client.get(reverse('athlete_portal:detail', args=[self.athlete.id]))
+        self.assertContains(response, 'Meet 11')
+        self.assertContains(response, 'Team Memberships (1)')
+
+
+class AgeAnnotationTest(TestCase):
+    def setUp(self):
+        self.center = create_center()
+        self.on = date(2024, 2, 28)
+        self.births = {
+            'Birthday': date(2012, 2, 28),
+            'Tomorrow': date(2012, 2, 29),
+            'Eleven': date(2012, 3, 1),
+            'Nine': date(2014, 6, 1),
+            'Adult': date(2000, 1, 1),
+        }
+        for name, born in self.births.items():
+            create_athlete(self.center, name, born=born)
+
+    def test_with_age_matches_python_age(self):
+        ages = dict(AthletePerson.objects.with_age(on=self.on).values_list('first_name', 'age'))
+        self.assertEqual(ages, {'Birthday': 12, 'Tomorrow': 11, 'Eleven': 11, 'Nine': 9, 'Adult': 24})
+
+        athlete = AthletePerson.objects.with_age().get(first_name='Adult')
+        self.assertEqual(athlete.age, AthletePerson.objects.get(first_name='Adult').age)
+
+    def test_age_filters_and_bands(self):
+        twelve_plus = AthletePerson.objects.with_age(on=self.on).filter(age__gte=12)
+        self.assertEqual(set(twelve_plus.values_list('first_name', flat=True)), {'Birthday', 'Adult'})
+
+        aged = AthletePerson.objects.aged(min_age=10, max_age=11, on=self.on)
+        self.assertEqual(set(aged.values_list('first_name', flat=True)), {'Tomorrow', 'Eleven'})
+
+        bands = dict(AthletePerson.objects.with_age_band(on=self.on).values_list('first_name', 'age_band'))
+        self.assertEqual(
+            bands,
+            {'Birthday': 'U-14', 'Tomorrow': 'U-12', 'Eleven': 'U-12', 'Nine': 'U-10', 'Adult': 'Open'}
+        )
+
+
+class PerformanceServiceTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.center = create_center()
+        self.athlete = create_athlete(self.center, 'Asha')
+        start = timezone.now() - timedelta(days=400)
+        times = [14.0, 13.5, 13.8, 13.1, 13.4, 12.9]
+        events = []
+        for i, _ in enumerate(times):
+            event = create_event(self.center, f'Meet {i}')
+            event.start_date = start + timedelta(days=60 * i)
+            event.save()
+            events.append(event)
+        AthleteScore.objects.bulk_create([
+            AthleteScore(athlete=self.athlete, event=event, score=Decimal(str(time)), score_type='time')
+            for event, time in zip(events, times)
+        ])
+        self.events = events
+
+    def test_series_tracks_running_personal_best(self):
+        series = PerformanceService.get_series(self.athlete.id)['series']['time']
+        self.assertEqual(series['v'], [14.0, 13.5, 13.8, 13.1, 13.4, 12.9])
+        self.assertEqual(series['best'], [14.0, 13.5, 13.5, 13.1, 13.1, 12.9])
+        self.assertEqual(series['pb_v'], [14.0, 13.5, 13.1, 12.9])
+        self.assertEqual(series['n'], 6)
+
+    def test_lttb_keeps_endpoints_and_requested_points(self):
+        xs = list(range(1000))
+        ys = [float((i * 37) % 101) for i in xs]
+        kept = PerformanceService.lttb(xs, ys, 50)
+        self.assertEqual(len(kept), 50)
+        self.assertEqual((kept[0], kept[-1]), (0, 999))
+        self.assertEqual(kept, sorted(kept))
+
+        series = PerformanceService.get_series(self.athlete.id, points=3)['series']['time']
+        self.assertEqual(len(series['t']), 3)
+        self.assertEqual(series['pb_v'][-1], 12.9)
+
+    def test_monthly_buckets_and_cache_invalidation(self):
+        monthly = PerformanceService.get_series(self.athlete.id, method='monthly')['series']['time']
+        self.assertEqual(sum(monthly['count']), 6)
+        self.assertEqual(monthly['best'][-1], 12.9)
+
+        with self.assertNumQueries(0):
+            PerformanceService.get_series(self.athlete.id, method='monthly')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            AthleteScore.objects.filter(event=self.events[-1]).get().delete()
+        monthly = PerformanceService.get_series(self.athlete.id, method='monthly')['series']['time']
+        self.assertEqual(sum(monthly['count']), 5)
+        self.assertEqual(monthly['best'][-1], 13.1)
+
+
+class CertificatePdfServiceTest(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        override = override_settings(MEDIA_ROOT=self.media_root)
+        override.enable()
+        self.addCleanup(override.disable)
+
+        self.center = create_center()
+        self.event = create_event(self.center)
+        self.athlete = create_athlete(self.center, 'Asha')
+        self.athlete.user = User.objects.create_user(email='asha@test.com', password='password', is_active=True)
+        self.athlete.save()
+        self.certificates = [
+            EvaluationCertificate.objects.create(
+                athlete=self.athlete, event=self.event, title=f'Award {i}',
+                description='For (outstanding) effort', certificate_number=f'C-{i}'
+            )
+            for i in range(3)
+        ]
+
+    def test_renders_once_per_content(self):
+        path, content_hash = CertificatePdfService.get_pdf(self.certificates[0])
+        self.assertTrue(path.read_bytes().startswith(b'%PDF-1.4'))
+        self.assertIn(rb'For \(outstanding\) effort', path.read_bytes())
+        modified = path.stat().st_mtime_ns
+
+        self.assertEqual(CertificatePdfService.get_pdf(self.certificates[0]), (path, content_hash))
+        self.assertEqual(path.stat().st_mtime_ns, modified)
+
+        self.certificates[0].title = 'Gold'
+        self.certificates[0].save()
+        new_path, new_hash = CertificatePdfService.get_pdf(self.certificates[0])
+        self.assertNotEqual(new_hash, content_hash)
+        self.assertTrue(new_path.exists())
+
+    def test_render_event_skips_existing_files(self):
+        CertificatePdfService.get_pdf(self.certificates[0])
+        self.assertEqual(CertificatePdfService.render_event(self.event, workers=1), {'rendered': 2, 'cached': 1})
+        self.assertEqual(CertificatePdfService.render_event(self.event, workers=1), {'rendered': 0, 'cached': 3})
+
+    def test_download_uses_etag(self):
+        self.client.force_login(self.athlete.user)
+        url = reverse('athlete_portal:certificate_pdf', args=[self.certificates[0].id])
+        response = self.client.get(url)
+        self.assertEqual(response['Content-Type'], 'application/pdf')
+        self.assertIn('max-age', response['Cache-Control'])
+        self.assertTrue(b''.join(response.streaming_content).startswith(b'%PDF'))
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+
+
+class CertificateVerificationTest(TestCase):
+    def setUp(self):
+        CertificateVerificationService.clear()
+        self.addCleanup(CertificateVerificationService.clear)
+        views.VERIFICATION_LIMITER.reset()
+        self.addCleanup(views.VERIFICATION_LIMITER.reset)
+
+        self.center = create_center()
+        self.athlete = create_athlete(self.center, 'Asha')
+        self.valid = EvaluationCertificate.objects.create(
+            athlete=self.athlete, title='Gold', description='-', certificate_number='MFU-1'
+        )
+        self.expired = EvaluationCertificate.objects.create(
+            athlete=self.athlete, title='Silver', description='-', certificate_number='MFU-2',
+            valid_until=timezone.localdate() - timedelta(days=1)
+        )
+
+    def test_validity_matches_model(self):
+        results = CertificateVerificationService.verify_many(['MFU-1', 'MFU-2', 'NOPE'])
+        self.assertIs(results['MFU-1']['valid'], self.valid.is_valid())
+        self.assertIs(results['MFU-2']['valid'], self.expired.is_valid())
+        self.assertFalse(results['MFU-2']['valid'])
+        self.assertIsNone(results['NOPE'])
+        self.assertEqual(results['MFU-1']['athlete'], 'Asha T.')
+
+    def test_cache_covers_hits_and_unknown_numbers(self):
+        with self.assertNumQueries(1):
+            CertificateVerificationService.verify_many(['MFU-1', 'NOPE'])
+        with self.assertNumQueries(0):
+            CertificateVerificationService.verify('MFU-1')
+            CertificateVerificationService.verify('NOPE')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.valid.certificate_number = 'NOPE'
+            self.valid.save()
+        self.assertIsNone(CertificateVerificationService.verify('MFU-1'))
+        self.assertEqual(CertificateVerificationService.verify('NOPE')['title'], 'Gold')
+
+    def test_bulk_endpoint(self):
+        url = reverse('athlete_portal:verify_certificates_bulk')
+        numbers = ['MFU-1', 'MFU-2'] + [f'X-{i}' for i in range(998)]
+        with self.assertNumQueries(1):
+            response = self.client.post(url, {'certificate_numbers': numbers}, content_type='application/json')
+        results = response.json()['results']
+        self.assertEqual(len(results), 1000)
+        self.assertTrue(results['MFU-1']['valid'])
+        self.assertIsNone(results['X-0'])
+
+        response = self.client.post(
+            url, {'certificate_numbers': numbers + ['MFU-3']}, content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_single_endpoint_is_rate_limited(self):
+        url = reverse('athlete_portal:verify_certificate', args=['MFU-1'])
+        self.assertTrue(self.client.get(url).json()['valid'])
+        self.assertEqual(
+            self.client.get(reverse('athlete_portal:verify_certificate', args=['NOPE'])).status_code, 404
+        )
+
+        for _ in range(views.VERIFICATION_LIMITER.capacity):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 429)
+        self.assertIn('Retry-After', response)
+        self.assertEqual(self.client.get(url, REMOTE_ADDR='10.0.0.2').status_code, 200)
+
+    def test_token_bucket_refills(self):
+        limiter = TokenBucketLimiter(rate=1000, capacity=2)
+        self.assertTrue(limiter.allow('ip')[0])
+        self.assertTrue(limiter.allow('ip')[0])
+        allowed, retry_after = limiter.allow('ip', cost=3)
+        self.assertFalse(allowed)
+        self.assertGreater(retry_after, 0)
+
+
+class FailingEmailBackend(BaseEmailBackend):
+    def send_messages(self, email_messages):
+        raise ConnectionRefusedError('Mail server unavailable')
+
+
+class CertificateIssuanceServiceTest(TestCase):
+    def setUp(self):
+        self.center = create_center()
+        self.event = create_event(self.center)
+        self.athletes = [create_athlete(self.center, name) for name in ['Asha', 'Bela', 'Chitra', 'Divya']]
+        for rank, athlete in enumerate(self.athletes, start=1):
+            AthleteScore.objects.create(
+                athlete=athlete, event=self.event, score=Decimal(100 - rank), rank=rank
+            )
+        parent_user = User.objects.create_user(email='parent@test.com', password='password')
+        parent = Parent.objects.create(user=parent_user)
+        for athlete in self.athletes[:2]:
+            ParentChildRelation.objects.create(parent=parent, child=athlete)
+        self.prefix = CertificateIssuanceService.default_prefix(self.event)
+
+    def test_issues_awards_by_rank(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            result = CertificateIssuanceService.issue(self.event)
+        self.assertEqual(result['issued'], 4)
+
+        titles = dict(EvaluationCertificate.objects.values_list('athlete__first_name', 'title'))
+        self.assertEqual(titles, {
+            'Asha': 'Gold Medal', 'Bela': 'Silver Medal', 'Chitra': 'Bronze Medal',
+            'Divya': CertificateIssuanceService.PARTICIPATION_TITLE,
+        })
+        self.assertEqual(
+            sorted(EvaluationCertificate.objects.values_list('certificate_number', flat=True)),
+            [f'{self.prefix}-{n:06d}' for n in range(1, 5)]
+        )
+
+        # One batched email for the parent of both children
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertIn('Gold Medal', mail.outbox[0].body)
+        self.assertIn('Silver Medal', mail.outbox[0].body)
+
+    @override_settings(EMAIL_BACKEND='apps.athlete_portal.tests.FailingEmailBackend')
+    def test_mail_failure_does_not_fail_committed_issue(self):
+        with self.assertLogs(level='ERROR'), self.captureOnCommitCallbacks(execute=True):
+            result = CertificateIssuanceService.issue(self.event)
+        self.assertEqual(result['issued'], 4)
+        self.assertEqual(EvaluationCertificate.objects.count(), 4)
+
+    def test_issuing_again_only_fills_gaps(self):
+        CertificateIssuanceService.issue(self.event, participation=False, notify=False)
+        result = CertificateIssuanceService.issue(self.event, notify=False)
+        self.assertEqual((result['issued'], result['skipped']), (1, 3))
+        self.assertEqual(EvaluationCertificate.objects.count(), 4)
+
+    def test_issue_reads_held_certificates_under_event_lock(self):
+        with CaptureQueriesContext(connection) as queries:
+            CertificateIssuanceService.issue(self.event, notify=False)
+        statements = [query['sql'] for query in queries.captured_queries]
+        lock = next(i for i, sql in enumerate(statements) if '"events"' in sql.split('WHERE')[0])
+        held = next(i for i, sql in enumerate(statements) if 'evaluation_certificates' in sql)
+        # Nothing is read before the issue's transaction opens
+        self.assertTrue(statements[0].startswith('SAVEPOINT'))
+        self.assertLess(lock, held)
+
+    def test_duplicate_certificate_title_is_rejected(self):
+        CertificateIssuanceService.issue(self.event, notify=False)
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            EvaluationCertificate.objects.create(
+                athlete=self.athletes[0], event=self.event, title='Gold Medal',
+                description='-', certificate_number=f'{self.prefix}-999999'
+            )
+
+    def test_sequence_continues_after_existing_numbers(self):
+        EvaluationCertificate.objects.create(
+            athlete=self.athletes[0], title='Manual', description='-', certificate_number=f'{self.prefix}-000041'
+        )
+        self.assertEqual(
+            CertificateIssuanceService.allocate_numbers(self.prefix, 2),
+            [f'{self.prefix}-000042', f'{self.prefix}-000043']
+        )
+        self.assertEqual(CertificateIssuanceService.allocate_numbers(self.prefix, 1), [f'{self.prefix}-000044'])
+
+    def test_admin_issue_view(self):
+        admin_user = User.objects.create_user(email='admin@test.com', password='password', is_active=True)
+        role = Role.objects.create(code=Role.ADMIN, name='Admin', dashboard_url='admin_portal:dashboard')
+        UserRole.objects.create(user=admin_user, role=role)
+        self.client.force_login(admin_user)
+        url = reverse('admin_portal:event_certificates_issue', args=[self.event.id])
+
+        self.assertEqual(self.client.get(url).context['preview']['Gold Medal'], 1)
+        response = self.client.post(url, {
+            'gold_max_rank': 1, 'silver_max_rank': 0, 'bronze_max_rank': 2, 'participation': '',
+        })
+        self.assertEqual(response.context['result']['issued'], 2)
+        self.assertEqual(
+            set(EvaluationCertificate.objects.values_list('title', 'issued_by')),
+            {('Gold Medal', admin_user.id), ('Bronze Medal', admin_user.id)}
+        )
+
+
+class AthleteImportServiceTest(TestCase):
+    HEADER = 'First Name,Last Name,Date of Birth,Gender,user_email,guardian_email,guardian_relationship\n'
+
+    def setUp(self):
+        self.center = create_center()
+        self.existing = create_athlete(self.center, 'Asha')
+        self.athlete_role = Role.objects.create(
+            code=Role.ATHLETE, name='Athlete', dashboard_url='athlete_portal:dashboard'
+        )
+        self.athlete_user = User.objects.create_user(email='bela@test.com', password='password')
+        self.guardian_user = User.objects.create_user(email='mom@test.com', password='password')
+
+    def import_text(self, text):
+        return AthleteImportService.import_csv(StringIO(self.HEADER + text), self.center)
+
+    def test_creates_athletes_with_links(self):
+        result = self.import_text(
+            'Bela,Test,2012-05-01,female,BELA@test.com,mom@test.com,mother\n'
+            'Chitra,Test,03/04/2011,Female,,mom@test.com,\n'
+        )
+        self.assertEqual(
+            (result['created'], result['users_linked'], result['guardians_linked'], result['errors']),
+            (2, 1, 2, [])
+        )
+        bela = AthletePerson.objects.get(first_name='Bela')
+        self.assertEqual(bela.user, self.athlete_user)
+        self.assertTrue(self.athlete_user.has_role(Role.ATHLETE))
+        self.assertEqual(
+            set(ParentChildRelation.objects.values_list('child__first_name', 'relationship')),
+            {('Bela', 'mother'), ('Chitra', 'guardian')}
+        )
+        self.assertEqual(Parent.objects.get().user, self.guardian_user)
+
+    def test_reports_duplicates_and_bad_rows(self):
+        result = self.import_text(
+            ' asha ,TEST,2013-01-01,female,,,\n'
+            'Bela,Test,2012-05-01,female,,,\n'
+            'BELA,Test,2012-05-01,female,,,\n'
+            'Chitra,Test,2012-13-01,female,,,\n'
+            'Divya,Test,2012-05-01,female,,nobody@test.com,\n'
+            'Esha,Test,2012-05-01,female,nobody@test.com,,\n'
+        )
+        self.assertEqual(result['created'], 2)
+        self.assertEqual([row for row, _ in result['errors']], [2, 4, 5, 6, 7])
+        messages = dict(result['errors'])
+        self.assertIn(f'athlete {self.existing.id}', messages[2])
+        self.assertIn('row 3', messages[4])
+        self.assertIn('Athlete imported', messages[6])
+
+    def test_queries_do_not_grow_with_rows(self):
+        rows = ''.join(
+            f'Athlete{i},Test,2012-01-01,male,,mom@test.com,\n' for i in range(300)
+        )
+        with CaptureQueriesContext(connection) as queries:
+            result = self.import_text(rows)
+        self.assertEqual(result['created'], 300)
+        self.assertLess(len(queries), 20)
+
+    def test_admin_upload(self):
+        admin_user = User.objects.create_user(email='admin@test.com', password='password', is_active=True)
+        role = Role.objects.create(code=Role.ADMIN, name='Admin', dashboard_url='admin_portal:dashboard')
+        UserRole.objects.create(user=admin_user, role=role)
+        self.client.force_login(admin_user)
+
+        roster = SimpleUploadedFile('roster.csv', (self.HEADER + 'Bela,Test,2012-05-01,female,,,\n').encode())
+        response = self.client.post(
+            reverse('admin_portal:center_athletes_import', args=[self.center.id]), {'roster_file': roster}
+        )
+        self.assertEqual(response.context['result']['created'], 1)
+        self.assertTrue(AthletePerson.objects.filter(first_name='Bela', center=self.center).exists())
+
+    def test_admin_upload_rejects_non_utf8_before_importing(self):
+        admin_user = User.objects.create_user(email='admin@test.com', password='password', is_active=True)
+        role = Role.objects.create(code=Role.ADMIN, name='Admin', dashboard_url='admin_portal:dashboard')
+        UserRole.objects.create(user=admin_user, role=role)
+        self.client.force_login(admin_user)
+
+        # A cp1252 name after more than a batch of good rows
+        rows = ''.join(f'Athlete{i},Test,2012-01-01,male,,,\n' for i in range(AthleteImportService.BATCH_SIZE + 5))
+        content = (self.HEADER + rows).encode() + 'Zoë,Test,2012-05-01,female,,,\n'.encode('cp1252')
+        response = self.client.post(
+            reverse('admin_portal:center_athletes_import', args=[self.center.id]),
+            {'roster_file': SimpleUploadedFile('roster.csv', content)}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNone(response.context['result'])
+        self.assertIn('UTF-8', response.context['form'].errors['roster_file'][0])
+        self.assertEqual(AthletePerson.objects.count(), 1)
@@ -7,9 +7,30 @@ app_name = 'athlete_portal'
 urlpatterns = [
     path('dashboard/', views.athlete_dashboard, name='dashboard'),
     path('<int:athlete_id>/', views.athlete_detail, name='detail'),
+    path('<int:athlete_id>/performance/', views.athlete_performance, name='performance'),
     path('rankings/', views.athlete_rankings, name='rankings'),
+    path('leaderboard/<str:category>/top/', views.leaderboard_top, name='leaderboard_top'),
+    path(
+        'leaderboard/<str:category>/around/<int:athlete_id>/',
+        views.leaderboard_around,
+        name='leaderboard_around'
+    ),
     path('scores/', views.athlete_scores, name='scores'),
     path('certificates/', views.athlete_certificates, name='certificates'),
+    path('certificates/<int:certificate_id>/pdf/', views.certificate_pdf, name='certificate_pdf'),
+    path('certificates/verify/', views.verify_certificates_bulk, name='verify_certificates_bulk'),
+    path(
+        'certificates/verify/<str:certificate_number>/',
+        views.verify_certificate,
+        name='verify_certificate'
+    ),
     path('teams/', views.athlete_teams, name='teams'),
     path('events/', views.athlete_events, name='events'),
+    path('events/<int:event_id>/register/', views.event_register, name='event_register'),
+    path(
+        'events/registrations/<int:registration_id>/cancel/',
+        views.event_registration_cancel,
+        name='event_registration_cancel'
+    ),
+    path('events/waitlist/<int:entry_id>/leave/', views.event_waitlist_leave, name='event_waitlist_leave'),
 ]
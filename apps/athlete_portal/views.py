@@ -1,10 +1,36 @@
-from django.shortcuts import render, get_object_or_404
+import json
+
+from django.shortcuts import redirect, render, get_object_or_404
+from django.contrib import messages
 from django.contrib.auth.decorators import login_required
+from django.core.exceptions import ValidationError
+from django.http import FileResponse, Http404, HttpResponseForbidden, HttpResponseNotModified, JsonResponse
+from django.utils.cache import patch_cache_control
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_GET, require_POST
 
 from apps.core.decorators.permissions import require_roles
+from apps.core.services import TokenBucketLimiter
 from .models import AthletePerson, AthleteRanking, EvaluationCertificate, AthleteScore
-from apps.events.models import EventRegistration, Event
-from apps.coach_portal.models import TrainingSession, TeamMember
+from apps.events.models import EventRegistration, EventWaitlistEntry, Event
+from apps.events.services import RegistrationService, WaitlistService
+from apps.coach_portal.models import TeamMember
+from apps.parent_portal.models import ParentChildRelation
+from .services import (
+    AthleteProfileLoader, CertificatePdfService, CertificateVerificationService, LeaderboardService,
+    PerformanceService
+)
+
+LEADERBOARD_MAX_TOP = 100
+LEADERBOARD_MAX_WINDOW = 25
+
+# Certificate PDFs are content-addressed, so browsers may keep them for a day
+CERTIFICATE_PDF_MAX_AGE = 60 * 60 * 24
+
+# Public verification: bursts of 30 lookups per IP, refilling at one per second;
+# a bulk request costs one token plus one per 100 numbers
+VERIFICATION_LIMITER = TokenBucketLimiter(rate=1, capacity=30)
+VERIFICATION_BULK_TOKENS_PER = 100
 
 
 @login_required
@@ -14,101 +40,82 @@ def athlete_detail(request, athlete_id):
     Accessible to: the athlete themselves, coaches, admins.
     """
     user = request.user
-    athlete = get_object_or_404(AthletePerson, id=athlete_id)
+    athlete = AthleteProfileLoader.load(athlete_id)
+    if athlete is None:
+        raise Http404('Athlete not found')
     
     # Permission check: only athlete themselves, coaches, or admins can view
     has_permission = (
-        user == athlete.user or
-        user.has_role('coach') or
-        user.has_role('admin')
+        athlete.user_id == user.id or
+        user.has_any_role(['coach', 'admin'])
     )
     
     if not has_permission:
-        from django.http import HttpResponseForbidden
         return HttpResponseForbidden("You don't have permission to view this profile.")
     
-    # Get athlete's rankings
-    rankings = AthleteRanking.objects.filter(
-        athlete=athlete,
-        is_active=True
-    ).order_by('-total_score')
-    
-    # Get athlete's recent scores
-    recent_scores = AthleteScore.objects.filter(
-        athlete=athlete
-    ).select_related('event').order_by('-recorded_at')[:10]
-    
-    # Get athlete's certificates
-    certificates = EvaluationCertificate.objects.filter(
-        athlete=athlete
-    ).order_by('-issued_date')
-    
-    # Get athlete's team memberships
-    team_memberships = TeamMember.objects.filter(
-        athlete=athlete,
-        removed_at__isnull=True
-    ).select_related('team')
-    
     context = {
         'athlete': athlete,
-        'rankings': rankings,
-        'recent_scores': recent_scores,
-        'certificates': certificates,
-        'team_memberships': team_memberships,
+        'rankings': athlete.rankings,
+        'recent_scores': athlete.recent_scores,
+        'certificates': athlete.all_certificates,
+        'team_memberships': athlete.active_memberships,
     }
     
     return render(request, 'athlete_portal/athlete_detail.html', context)
 
 
+@login_required
+def athlete_performance(request, athlete_id):
+    """
+    Performance time-series per score type as columnar JSON.
+    Accessible to: the athlete themselves, coaches, admins, and parents who can view scores.
+    
+    Query params:
+        method: 'lttb' (default) or 'monthly'
+        points: Maximum points per series for lttb
+    """
+    user = request.user
+    athlete = get_object_or_404(AthletePerson.objects.only('id', 'user_id'), id=athlete_id)
+    
+    has_permission = (
+        athlete.user_id == user.id or
+        user.has_any_role(['coach', 'admin']) or
+        ParentChildRelation.objects.filter(
+            parent__user=user, child_id=athlete_id, can_view_scores=True
+        ).exists()
+    )
+    if not has_permission:
+        return JsonResponse({'error': "You don't have permission to view this athlete."}, status=403)
+    
+    method = request.GET.get('method', 'lttb')
+    if method not in PerformanceService.METHODS:
+        method = 'lttb'
+    points = _bounded_int(request.GET.get('points'), PerformanceService.DEFAULT_POINTS, PerformanceService.MAX_POINTS)
+    
+    data = PerformanceService.get_series(athlete_id, method=method, points=max(points, 3))
+    data['athlete_id'] = athlete_id
+    return JsonResponse(data)
+
+
 @login_required
 @require_roles('athlete')
 def athlete_dashboard(request):
     """Athlete dashboard showing personal stats and rankings."""
     user = request.user
     
-    try:
-        athlete = AthletePerson.objects.get(user=user)
-    except AthletePerson.DoesNotExist:
+    athlete_id = AthletePerson.objects.filter(user=user).values_list('id', flat=True).first()
+    athlete = AthleteProfileLoader.load(athlete_id) if athlete_id else None
+    if athlete is None:
         context = {'error': 'Athlete profile not found'}
         return render(request, 'athlete_portal/dashboard.html', context)
     
-    # Get athlete's rankings
-    rankings = AthleteRanking.objects.filter(
-        athlete=athlete
-    ).order_by('-total_score')
-    
-    # Get athlete's recent scores
-    recent_scores = AthleteScore.objects.filter(
-        athlete=athlete
-    ).select_related('event').order_by('-recorded_at')[:10]
-    
-    # Get athlete's certificates
-    certificates = EvaluationCertificate.objects.filter(
-        athlete=athlete
-    ).order_by('-issued_date')
-    
-    # Get athlete's team memberships
-    team_memberships = TeamMember.objects.filter(
-        athlete=athlete,
-        removed_at__isnull=True
-    ).select_related('team')
-    
-    # Get upcoming training sessions
-    from django.utils import timezone
-    today = timezone.now().date()
-    
-    training_sessions = TrainingSession.objects.filter(
-        athletes=athlete,
-        start_time__date__gte=today
-    ).order_by('start_time')[:5]
-    
     context = {
         'athlete': athlete,
-        'rankings': rankings,
-        'recent_scores': recent_scores,
-        'certificates': certificates,
-        'team_memberships': team_memberships,
-        'upcoming_training': training_sessions,
+        'rankings': athlete.rankings,
+        'recent_scores': athlete.recent_scores,
+        'certificates': athlete.all_certificates,
+        'team_memberships': athlete.active_memberships,
+        'upcoming_training': athlete.upcoming_sessions,
     }
     
     return render(request, 'athlete_portal/dashboard.html', context)
@@ -125,6 +132,10 @@ def athlete_rankings(request):
         athlete=athlete
     ).order_by('-total_score')
     
+    # Neighbouring athletes and percentile for each ranked category
+    for ranking in rankings:
+        ranking.window = LeaderboardService.around(ranking.category, athlete.id, k=3)
+    
     context = {
         'athlete': athlete,
         'rankings': rankings,
@@ -133,6 +144,40 @@ def athlete_rankings(request):
     return render(request, 'athlete_portal/rankings.html', context)
 
 
+def _bounded_int(value, default, maximum):
+    try:
+        return max(1, min(int(value), maximum))
+    except (TypeError, ValueError):
+        return default
+
+
+@login_required
+@require_roles(['admin', 'coach', 'athlete', 'parent'])
+def leaderboard_top(request, category):
+    """Top N athletes in a category as JSON, optionally limited to one center."""
+    n = _bounded_int(request.GET.get('n'), 10, LEADERBOARD_MAX_TOP)
+    center_id = request.GET.get('center')
+    center_id = int(center_id) if center_id and center_id.isdigit() else None
+    
+    return JsonResponse({
+        'category': category,
+        'results': LeaderboardService.top(category, n=n, center_id=center_id),
+    })
+
+
+@login_required
+@require_roles(['admin', 'coach', 'athlete', 'parent'])
+def leaderboard_around(request, category, athlete_id):
+    """An athlete's leaderboard position with k neighbours on each side as JSON."""
+    k = _bounded_int(request.GET.get('k'), 5, LEADERBOARD_MAX_WINDOW)
+    window = LeaderboardService.around(category, athlete_id, k=k)
+    if window is None:
+        return JsonResponse({'error': 'Athlete is not ranked in this category.'}, status=404)
+    
+    window['category'] = category
+    return JsonResponse(window)
+
+
 @login_required
 @require_roles('athlete')
 def athlete_scores(request):
@@ -171,6 +216,97 @@ def athlete_certificates(request):
     return render(request, 'athlete_portal/certificates.html', context)
 
 
+@login_required
+def certificate_pdf(request, certificate_id):
+    """
+    Download a certificate as PDF.
+    Accessible to: the athlete, coaches, admins, and parents allowed to see the certificate.
+    """
+    user = request.user
+    certificate = get_object_or_404(
+        EvaluationCertificate.objects.select_related('athlete', 'event', 'issued_by'),
+        id=certificate_id
+    )
+    
+    has_permission = (
+        certificate.athlete.user_id == user.id or
+        user.has_any_role(['coach', 'admin']) or
+        (certificate.is_viewable_by_parents and ParentChildRelation.objects.filter(
+            parent__user=user, child_id=certificate.athlete_id, can_view_certificates=True
+        ).exists())
+    )
+    if not has_permission:
+        return HttpResponseForbidden("You don't have permission to view this certificate.")
+    
+    path, content_hash = CertificatePdfService.get_pdf(certificate)
+    etag = f'"{content_hash}"'
+    if request.headers.get('If-None-Match') == etag:
+        response = HttpResponseNotModified()
+    else:
+        response = FileResponse(
+            open(path, 'rb'),
+            content_type='application/pdf',
+            filename=f'certificate-{certificate.certificate_number}.pdf'
+        )
+    response['ETag'] = etag
+    patch_cache_control(response, private=True, max_age=CERTIFICATE_PDF_MAX_AGE)
+    return response
+
+
+def _rate_limited(request, cost=1):
+    """429 response if the client IP is over the verification limit, else None."""
+    allowed, retry_after = VERIFICATION_LIMITER.allow(request.META.get('REMOTE_ADDR', ''), cost)
+    if allowed:
+        return None
+    response = JsonResponse({'error': 'Too many verification requests. Try again later.'}, status=429)
+    response['Retry-After'] = str(max(1, int(retry_after + 0.999)))
+    return response
+
+
+@require_GET
+def verify_certificate(request, certificate_number):
+    """
+    Verify a certificate by number as JSON.
+    Public; rate-limited per IP.
+    """
+    limited = _rate_limited(request)
+    if limited:
+        return limited
+    
+    result = CertificateVerificationService.verify(certificate_number)
+    if result is None:
+        return JsonResponse({'certificate_number': certificate_number, 'found': False}, status=404)
+    return JsonResponse({'found': True, **result})
+
+
+@csrf_exempt
+@require_POST
+def verify_certificates_bulk(request):
+    """
+    Verify up to CertificateVerificationService.MAX_BULK certificates at once.
+    Public; rate-limited per IP.
+    
+    Body: {"certificate_numbers": ["...", ...]}
+    Response: {"results": {number: details or null}}
+    """
+    try:
+        numbers = json.loads(request.body).get('certificate_numbers')
+    except (ValueError, AttributeError):
+        numbers = None
+    if not isinstance(numbers, list) or not all(isinstance(number, str) for number in numbers):
+        return JsonResponse({'error': 'Send {"certificate_numbers": [...]} as JSON.'}, status=400)
+    if len(numbers) > CertificateVerificationService.MAX_BULK:
+        return JsonResponse({
+            'error': f'At most {CertificateVerificationService.MAX_BULK} certificates can be verified at once.'
+        }, status=400)
+    
+    limited = _rate_limited(request, 1 + len(numbers) // VERIFICATION_BULK_TOKENS_PER)
+    if limited:
+        return limited
+    
+    return JsonResponse({'results': CertificateVerificationService.verify_many(numbers)})
+
+
 @login_required
 @require_roles('athlete')
 def athlete_teams(request):
@@ -199,11 +335,77 @@ def athlete_events(request):
     
     event_registrations = EventRegistration.objects.filter(
         participant=user
-    ).select_related('event').order_by('-registered_at')
+    ).select_related('event__center').order_by('-registered_at')
+    
+    waitlist_entries = list(EventWaitlistEntry.objects.filter(
+        participant=user, status='waiting'
+    ).select_related('event__center').order_by('joined_at'))
+    for entry in waitlist_entries:
+        entry.position = WaitlistService.position(entry)
     
     context = {
         'event_registrations': event_registrations,
+        'waitlist_entries': waitlist_entries,
     }
     
     return render(request, 'athlete_portal/events.html', context)
 
+
+@require_POST
+@login_required
+@require_roles('athlete')
+def event_register(request, event_id):
+    """Register the athlete for an event, if a place is free."""
+    event = get_object_or_404(Event, id=event_id)
+    
+    try:
+        RegistrationService.register(event, request.user)
+        messages.success(request, f'You are registered for {event.name}.')
+    except ValidationError as e:
+        if e.code != 'full':
+            messages.error(request, e.messages[0])
+        else:
+            try:
+                entry = WaitlistService.join(event, request.user)
+                messages.info(
+                    request,
+                    f'{event.name} is full. You are number {WaitlistService.position(entry)} on the waitlist.'
+                )
+            except ValidationError as waitlist_error:
+                messages.error(request, waitlist_error.messages[0])
+    
+    return redirect('athlete_portal:events')
+
+
+@require_POST
+@login_required
+@require_roles('athlete')
+def event_registration_cancel(request, registration_id):
+    """Cancel one of the athlete's registrations and free the place."""
+    registration = get_object_or_404(
+        EventRegistration.objects.select_related('event'),
+        id=registration_id,
+        participant=request.user
+    )
+    
+    if RegistrationService.cancel(registration):
+        messages.success(request, f'Your registration for {registration.event.name} was cancelled.')
+    
+    return redirect('athlete_portal:events')
+
+
+@require_POST
+@login_required
+@require_roles('athlete')
+def event_waitlist_leave(request, entry_id):
+    """Take the athlete off an event's waitlist."""
+    entry = get_object_or_404(
+        EventWaitlistEntry.objects.select_related('event'),
+        id=entry_id,
+        participant=request.user
+    )
+    
+    if WaitlistService.leave(entry):
+        messages.success(request, f'You left the waitlist for {entry.event.name}.')
+    
+    return redirect('athlete_portal:events')
@@ -5,6 +5,7 @@ from .models import Center, CenterFacility
 @admin.register(Center)
 class CenterAdmin(admin.ModelAdmin):
     list_display = ('name', 'city', 'center_head', 'total_capacity', 'is_active', 'created_at')
+    list_select_related = ('center_head',)
     list_filter = ('city', 'is_active', 'created_at')
     search_fields = ('name', 'city', 'email')
     fieldsets = (
@@ -34,5 +35,6 @@ class CenterAdmin(admin.ModelAdmin):
 @admin.register(CenterFacility)
 class CenterFacilityAdmin(admin.ModelAdmin):
     list_display = ('center', 'facility_type', 'capacity', 'is_available')
+    list_select_related = ('center',)
     list_filter = ('facility_type', 'is_available', 'center')
     search_fields = ('center__name', 'facility_type')
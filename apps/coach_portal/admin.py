@@ -1,5 +1,7 @@
 from django.contrib import admin
-from .models import CoachProfile, TrainingSession, CompetitionTeam, TeamMember
+from django.db.models import Count
+from apps.core.admin_filters import select_related_filter
+from .models import CoachProfile, TrainingSession, CompetitionTeam, TeamMember, SessionAttendance
 
 
 class TrainingSessionInline(admin.TabularInline):
@@ -19,6 +21,7 @@ class TeamMemberInline(admin.TabularInline):
 @admin.register(CoachProfile)
 class CoachProfileAdmin(admin.ModelAdmin):
     list_display = ('get_full_name', 'specializations', 'is_head_coach', 'experience_years')
+    list_select_related = ('user',)
     list_filter = ('is_head_coach', 'experience_years', 'center')
     search_fields = ('user__first_name', 'user__last_name', 'specializations')
     inlines = [TrainingSessionInline]
@@ -42,7 +45,9 @@ class CoachProfileAdmin(admin.ModelAdmin):
 @admin.register(TrainingSession)
 class TrainingSessionAdmin(admin.ModelAdmin):
     list_display = ('title', 'coach', 'center', 'start_time', 'status')
-    list_filter = ('status', 'start_time', 'coach', 'center')
+    list_select_related = ('coach__user', 'center')
+    list_filter = ('status', 'start_time', ('coach', select_related_filter('user')), 'center')
+    show_full_result_count = False
     search_fields = ('title', 'coach__user__first_name', 'center__name')
     fieldsets = (
         ('Basic Information', {
@@ -60,7 +65,8 @@ class TrainingSessionAdmin(admin.ModelAdmin):
 @admin.register(CompetitionTeam)
 class CompetitionTeamAdmin(admin.ModelAdmin):
     list_display = ('name', 'coach', 'category', 'member_count', 'status')
-    list_filter = ('category', 'status', 'coach')
+    list_select_related = ('coach__user',)
+    list_filter = ('category', 'status', ('coach', select_related_filter('user')))
     search_fields = ('name', 'coach__user__first_name', 'category')
     inlines = [TeamMemberInline]
     fieldsets = (
@@ -72,14 +78,19 @@ class CompetitionTeamAdmin(admin.ModelAdmin):
         }),
     )
     
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(member_total=Count('athletes'))
+    
     def member_count(self, obj):
-        return obj.athletes.count()
+        return obj.member_total
     member_count.short_description = 'Members'
+    member_count.admin_order_field = 'member_total'
 
 
 @admin.register(TeamMember)
 class TeamMemberAdmin(admin.ModelAdmin):
     list_display = ('athlete', 'team', 'role', 'jersey_number', 'joined_at')
+    list_select_related = ('athlete', 'team')
     list_filter = ('role', 'team', 'joined_at')
     search_fields = ('athlete__first_name', 'team__name')
     readonly_fields = ('joined_at',)
@@ -93,3 +104,20 @@ class TeamMemberAdmin(admin.ModelAdmin):
     )
 
 
+@admin.register(SessionAttendance)
+class SessionAttendanceAdmin(admin.ModelAdmin):
+    list_display = ('athlete', 'session', 'status', 'minutes', 'recorded_at')
+    list_select_related = ('athlete', 'session')
+    show_full_result_count = False
+    list_filter = ('status', 'recorded_at')
+    search_fields = ('athlete__first_name', 'athlete__last_name', 'session__title')
+    readonly_fields = ('recorded_at', 'updated_at')
+    fieldsets = (
+        ('Attendance', {
+            'fields': ('session', 'athlete', 'status', 'minutes')
+        }),
+        ('Timestamps', {
+            'fields': ('recorded_at', 'updated_at'),
+            'classes': ('collapse',)
+        }),
+    )
@@ -5,3 +5,6 @@ class CoachPortalConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "apps.coach_portal"
     verbose_name = "Coach Portal"
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -37,3 +37,48 @@ class CompetitionTeamForm(forms.ModelForm):
             'category': forms.TextInput(attrs={'class': 'form-control'}),
             'status': forms.Select(attrs={'class': 'form-select'}),
         }
+
+
+class TeamBuilderForm(forms.Form):
+    GENDER_CHOICES = [('', 'Any')] + [
+        ('male', 'Male'),
+        ('female', 'Female'),
+        ('other', 'Other'),
+    ]
+
+    team_size = forms.IntegerField(
+        min_value=1, max_value=100, initial=6,
+        widget=forms.NumberInput(attrs={'class': 'form-control'})
+    )
+    alternates = forms.IntegerField(
+        min_value=0, max_value=50, initial=2,
+        widget=forms.NumberInput(attrs={'class': 'form-control'})
+    )
+    min_age = forms.IntegerField(
+        min_value=0, required=False,
+        widget=forms.NumberInput(attrs={'class': 'form-control'})
+    )
+    max_age = forms.IntegerField(
+        min_value=0, required=False,
+        help_text="Defaults to the team's U-NN category",
+        widget=forms.NumberInput(attrs={'class': 'form-control'})
+    )
+    gender = forms.ChoiceField(
+        choices=GENDER_CHOICES, required=False,
+        widget=forms.Select(attrs={'class': 'form-select'})
+    )
+    min_attendance = forms.DecimalField(
+        min_value=0, max_value=100, decimal_places=1, required=False,
+        help_text="Minimum attendance rate (%) over the last 90 days",
+        widget=forms.NumberInput(attrs={'class': 'form-control'})
+    )
+
+    def clean(self):
+        cleaned_data = super().clean()
+        min_age = cleaned_data.get('min_age')
+        max_age = cleaned_data.get('max_age')
+
+        if min_age is not None and max_age is not None and min_age > max_age:
+            raise forms.ValidationError("Minimum age cannot be greater than maximum age.")
+
+        return cleaned_data
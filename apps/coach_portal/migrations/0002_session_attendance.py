@@ -0,0 +1,34 @@
+# Generated by Django 5.2.11 on 2026-10-18 23:34
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('athlete_portal', '0001_initial'),
+        ('coach_portal', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SessionAttendance',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('present', 'Present'), ('absent', 'Absent'), ('late', 'Late')], default='present', max_length=20)),
+                ('minutes', models.PositiveIntegerField(blank=True, help_text='Minutes the athlete actually trained', null=True)),
+                ('recorded_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('athlete', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='session_attendance', to='athlete_portal.athleteperson')),
+                ('session', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attendance_records', to='coach_portal.trainingsession')),
+            ],
+            options={
+                'verbose_name': 'Session Attendance',
+                'verbose_name_plural': 'Session Attendance',
+                'db_table': 'session_attendance',
+                'indexes': [models.Index(fields=['athlete', 'status'], name='session_att_athlete_c09b22_idx')],
+                'unique_together': {('session', 'athlete')},
+            },
+        ),
+    ]
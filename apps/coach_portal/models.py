@@ -128,6 +128,62 @@ class TrainingSession(models.Model):
         return f"{self.title} - {self.start_time.strftime('%b %d, %Y')}"
 
 
+class SessionAttendance(models.Model):
+    """
+    Per-athlete attendance record for a training session.
+    TrainingSession.attendance is kept as a denormalized count of these rows.
+    """
+    PRESENT = 'present'
+    ABSENT = 'absent'
+    LATE = 'late'
+
+    STATUS_CHOICES = [
+        (PRESENT, 'Present'),
+        (ABSENT, 'Absent'),
+        (LATE, 'Late'),
+    ]
+
+    # Statuses that count towards TrainingSession.attendance
+    ATTENDED_STATUSES = [PRESENT, LATE]
+
+    session = models.ForeignKey(
+        TrainingSession,
+        on_delete=models.CASCADE,
+        related_name='attendance_records'
+    )
+    athlete = models.ForeignKey(
+        AthletePerson,
+        on_delete=models.CASCADE,
+        related_name='session_attendance'
+    )
+
+    status = models.CharField(
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default=PRESENT
+    )
+    minutes = models.PositiveIntegerField(
+        null=True,
+        blank=True,
+        help_text="Minutes the athlete actually trained"
+    )
+
+    recorded_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'session_attendance'
+        unique_together = ['session', 'athlete']
+        verbose_name = 'Session Attendance'
+        verbose_name_plural = 'Session Attendance'
+        indexes = [
+            models.Index(fields=['athlete', 'status']),
+        ]
+
+    def __str__(self):
+        return f"{self.athlete.get_full_name()} - {self.session.title} ({self.get_status_display()})"
+
+
 class CompetitionTeam(models.Model):
     """
     A team created by a coach for competitions.
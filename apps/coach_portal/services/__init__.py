@@ -0,0 +1,7 @@
+"""Services package for coach portal app."""
+from .attendance_service import AttendanceService
+from .roster_service import RosterService
+from .team_builder_service import TeamBuilderService
+from .workload_report_service import WorkloadReportService
+
+__all__ = ['AttendanceService', 'RosterService', 'TeamBuilderService', 'WorkloadReportService']
@@ -0,0 +1,161 @@
+"""
+Attendance service for the coach portal.
+Saves per-athlete training session attendance in bulk and aggregates attendance rates.
+"""
+from django.db import transaction
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from apps.athlete_portal.models import AthletePerson
+from apps.coach_portal.models import SessionAttendance, TrainingSession
+
+
+class AttendanceService:
+    """
+    Service class for training session attendance.
+    All writes to SessionAttendance should go through this service so that
+    TrainingSession.attendance stays in sync with the per-athlete records.
+    """
+
+    @staticmethod
+    def get_roster(session):
+        """
+        Get the athletes expected at a training session.
+
+        Athletes explicitly assigned to the session are used when present,
+        otherwise the active members of the coach's teams.
+
+        Args:
+            session: TrainingSession instance
+
+        Returns:
+            QuerySet: AthletePerson queryset ordered by name
+        """
+        athletes = session.athletes.filter(is_active=True)
+        if not athletes.exists() and session.coach_id:
+            athletes = AthletePerson.objects.filter(
+                teammember__team__coach_id=session.coach_id,
+                teammember__removed_at__isnull=True,
+                is_active=True,
+            ).distinct()
+        return athletes.order_by('last_name', 'first_name')
+
+    @staticmethod
+    def save_session_attendance(session, entries):
+        """
+        Save a whole session's attendance in one transaction.
+
+        Args:
+            session: TrainingSession instance
+            entries: Dict mapping athlete id to a (status, minutes) tuple
+
+        Returns:
+            int: Number of athletes who attended (present or late)
+        """
+        now = timezone.now()
+        with transaction.atomic():
+            # Lock the session row so concurrent saves serialize on the count
+            TrainingSession.objects.select_for_update().filter(pk=session.pk).exists()
+
+            existing = {
+                record.athlete_id: record
+                for record in SessionAttendance.objects.filter(
+                    session=session,
+                    athlete_id__in=entries.keys()
+                )
+            }
+
+            to_create = []
+            to_update = []
+            for athlete_id, (status, minutes) in entries.items():
+                record = existing.get(athlete_id)
+                if record is None:
+                    to_create.append(SessionAttendance(
+                        session=session,
+                        athlete_id=athlete_id,
+                        status=status,
+                        minutes=minutes,
+                    ))
+                elif record.status != status or record.minutes != minutes:
+                    record.status = status
+                    record.minutes = minutes
+                    record.updated_at = now
+                    to_update.append(record)
+
+            SessionAttendance.objects.bulk_create(to_create)
+            SessionAttendance.objects.bulk_update(to_update, ['status', 'minutes', 'updated_at'])
+            if entries:
+                session.athletes.add(*entries.keys())
+
+            attended = SessionAttendance.objects.filter(
+                session=session,
+                status__in=SessionAttendance.ATTENDED_STATUSES
+            ).count()
+            TrainingSession.objects.filter(pk=session.pk).update(attendance=attended, updated_at=now)
+
+        session.attendance = attended
+        return attended
+
+    @staticmethod
+    def athlete_attendance_rates(athlete_ids, start, end):
+        """
+        Attendance rate per athlete over a date range, in one grouped query.
+
+        Args:
+            athlete_ids: Iterable of AthletePerson ids
+            start: Range start (inclusive) on session start_time
+            end: Range end (exclusive) on session start_time
+
+        Returns:
+            dict: athlete id -> {'total', 'attended', 'rate'}
+        """
+        rows = AttendanceService._recorded_sessions(start, end).filter(
+            athlete_id__in=athlete_ids
+        ).values('athlete_id').annotate(**AttendanceService._rate_aggregates())
+        return {row['athlete_id']: AttendanceService._with_rate(row) for row in rows}
+
+    @staticmethod
+    def team_attendance_rates(team_ids, start, end):
+        """
+        Attendance rate per competition team over a date range, in one grouped query.
+        Only records of current (not removed) team members are counted.
+
+        Args:
+            team_ids: Iterable of CompetitionTeam ids
+            start: Range start (inclusive) on session start_time
+            end: Range end (exclusive) on session start_time
+
+        Returns:
+            dict: team id -> {'total', 'attended', 'rate'}
+        """
+        rows = AttendanceService._recorded_sessions(start, end).filter(
+            athlete__teammember__team_id__in=team_ids,
+            athlete__teammember__removed_at__isnull=True,
+        ).values('athlete__teammember__team_id').annotate(**AttendanceService._rate_aggregates())
+        return {
+            row['athlete__teammember__team_id']: AttendanceService._with_rate(row)
+            for row in rows
+        }
+
+    @staticmethod
+    def _recorded_sessions(start, end):
+        return SessionAttendance.objects.filter(
+            session__start_time__gte=start,
+            session__start_time__lt=end,
+        ).exclude(session__status='cancelled')
+
+    @staticmethod
+    def _rate_aggregates():
+        return {
+            'total': Count('id'),
+            'attended': Count('id', filter=Q(status__in=SessionAttendance.ATTENDED_STATUSES)),
+        }
+
+    @staticmethod
+    def _with_rate(row):
+        total = row['total']
+        return {
+            'total': total,
+            'attended': row['attended'],
+            'rate': round(100.0 * row['attended'] / total, 1) if total else 0.0,
+        }
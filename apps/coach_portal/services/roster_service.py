@@ -0,0 +1,132 @@
+"""
+Roster service for the coach portal.
+Applies bulk membership changes to a competition team.
+"""
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.utils import timezone
+
+from apps.athlete_portal.models import AthletePerson
+from apps.athlete_portal.services import AthleteProfileLoader
+from apps.coach_portal.models import TeamMember
+from apps.core.services import ActivityService
+
+
+class RosterService:
+    """
+    Service class for editing competition team rosters in bulk.
+    """
+
+    @staticmethod
+    def apply_changes(team, center, add_ids=(), remove_ids=(), roles=None):
+        """
+        Add, remove and re-role team members in one transaction.
+
+        Membership changes are computed as set differences against the current
+        roster, then written with one bulk_create for new members and one
+        bulk_update for re-activated, removed and re-roled members.
+
+        Args:
+            team: CompetitionTeam instance
+            center: Center every athlete must belong to (None skips the check)
+            add_ids: Athlete ids to add (or re-activate if previously removed)
+            remove_ids: Athlete ids to remove
+            roles: Optional dict mapping athlete id to TeamMember role
+
+        Returns:
+            dict: Counts of 'added', 'reactivated', 'removed' and 'role_changed' members
+
+        Raises:
+            ValidationError: If a role is invalid, an athlete is both added and
+                removed, or an athlete is not active in the given center
+        """
+        add_ids = set(add_ids)
+        remove_ids = set(remove_ids)
+        roles = dict(roles or {})
+
+        valid_roles = dict(TeamMember.ROLE_CHOICES)
+        invalid_roles = {role for role in roles.values() if role not in valid_roles}
+        if invalid_roles:
+            raise ValidationError(f"Invalid team role(s): {', '.join(sorted(invalid_roles))}.")
+
+        conflicting = add_ids & remove_ids
+        if conflicting:
+            raise ValidationError('An athlete cannot be added and removed at the same time.')
+
+        # Validate every athlete being added or re-roled with a single query
+        checked_ids = add_ids | set(roles)
+        if center is not None and checked_ids:
+            found_ids = set(AthletePerson.objects.filter(
+                id__in=checked_ids,
+                center=center,
+                is_active=True
+            ).values_list('id', flat=True))
+            missing = checked_ids - found_ids
+            if missing:
+                raise ValidationError(
+                    f'{len(missing)} selected athlete(s) are not active in your center.'
+                )
+
+        now = timezone.now()
+        with transaction.atomic():
+            memberships = {
+                member.athlete_id: member
+                for member in TeamMember.objects.select_for_update().filter(
+                    team=team,
+                    athlete_id__in=add_ids | remove_ids | set(roles)
+                )
+            }
+            active_ids = {
+                athlete_id for athlete_id, member in memberships.items()
+                if member.removed_at is None
+            }
+
+            new_ids = add_ids - memberships.keys()
+            reactivate_ids = (add_ids - active_ids) - new_ids
+            removed_ids = remove_ids & active_ids
+
+            changed = {}
+            for athlete_id in reactivate_ids:
+                member = memberships[athlete_id]
+                member.removed_at = None
+                changed[athlete_id] = member
+            for athlete_id in removed_ids:
+                member = memberships[athlete_id]
+                member.removed_at = now
+                changed[athlete_id] = member
+
+            role_changed = 0
+            for athlete_id, role in roles.items():
+                member = memberships.get(athlete_id)
+                if member is None or athlete_id in removed_ids or member.role == role:
+                    continue
+                if member.removed_at is not None and athlete_id not in reactivate_ids:
+                    continue
+                member.role = role
+                changed[athlete_id] = member
+                role_changed += 1
+
+            TeamMember.objects.bulk_create([
+                TeamMember(
+                    team=team,
+                    athlete_id=athlete_id,
+                    role=roles.get(athlete_id, 'athlete')
+                )
+                for athlete_id in new_ids
+            ])
+            TeamMember.objects.bulk_update(changed.values(), ['removed_at', 'role'])
+            AthleteProfileLoader.invalidate([*new_ids, *changed])
+            if new_ids or changed:
+                ActivityService.record_batch(
+                    team,
+                    f'Roster updated: {len(new_ids)} added, {len(reactivate_ids)} re-activated, '
+                    f'{len(removed_ids)} removed, {role_changed} re-roled',
+                    center=ActivityService.center_of(team, 'coach__center'),
+                )
+
+        return {
+            'added': len(new_ids),
+            'reactivated': len(reactivate_ids),
+            'removed': len(removed_ids),
+            'role_changed': role_changed,
+        }
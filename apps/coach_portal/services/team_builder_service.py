@@ -0,0 +1,249 @@
+"""
+Team builder service for the coach portal.
+Ranks candidate athletes for a competition team from precomputed score vectors.
+"""
+import re
+from datetime import timedelta
+
+import numpy as np
+from django.core.cache import cache
+from django.db.models import Avg, Count, Q
+from django.utils import timezone
+
+from apps.athlete_portal.models import AthletePerson, AthleteScore
+from apps.coach_portal.models import SessionAttendance, TeamMember
+
+
+class TeamBuilderService:
+    """
+    Service class for proposing competition team rosters.
+
+    Candidate features for a whole center are loaded once into NumPy arrays
+    and cached, so each proposal is a vectorized filter, a weighted score and
+    an argpartition top-k selection.
+    """
+
+    CACHE_TIMEOUT = 300  # seconds
+    ATTENDANCE_WINDOW_DAYS = 90
+
+    # Team statuses that make a member unavailable for another team
+    ACTIVE_TEAM_STATUSES = ['forming', 'active', 'competing']
+
+    # Relative weight of each feature in the composite score
+    RANKING_WEIGHT = 0.5
+    PLACEMENT_WEIGHT = 0.3
+    ATTENDANCE_WEIGHT = 0.2
+
+    GENDER_CODES = {'male': 0, 'female': 1, 'other': 2}
+
+    @staticmethod
+    def cache_key(center_id):
+        return f'coach_portal:team_builder:vectors:{center_id}'
+
+    @staticmethod
+    def get_vectors(center):
+        """
+        Get the candidate feature vectors for a center, from cache when warm.
+
+        Args:
+            center: Center instance
+
+        Returns:
+            dict: Parallel NumPy arrays keyed by feature name
+        """
+        key = TeamBuilderService.cache_key(center.id)
+        vectors = cache.get(key)
+        if vectors is None:
+            vectors = TeamBuilderService.build_vectors(center)
+            cache.set(key, vectors, TeamBuilderService.CACHE_TIMEOUT)
+        return vectors
+
+    @staticmethod
+    def invalidate(center_id):
+        """Drop the cached vectors for a center."""
+        cache.delete(TeamBuilderService.cache_key(center_id))
+
+    @staticmethod
+    def build_vectors(center):
+        """
+        Load candidate features for every active athlete in a center in four queries.
+
+        Args:
+            center: Center instance
+
+        Returns:
+            dict: Parallel NumPy arrays keyed by feature name
+        """
+        athletes = list(AthletePerson.objects.filter(
+            center=center,
+            is_active=True
+        ).order_by('id').values_list(
+            'id', 'date_of_birth', 'gender', 'ranking__total_score', 'ranking__category'
+        ))
+        count = len(athletes)
+
+        ids = np.fromiter((row[0] for row in athletes), dtype=np.int64, count=count)
+        position = {athlete_id: index for index, athlete_id in enumerate(ids.tolist())}
+
+        placement = np.zeros(count, dtype=np.float64)
+        score_rows = AthleteScore.objects.filter(
+            athlete__center=center,
+            athlete__is_active=True,
+            rank__isnull=False
+        ).values('athlete_id').annotate(avg_rank=Avg('rank'))
+        for row in score_rows:
+            if row['avg_rank']:
+                placement[position[row['athlete_id']]] = 1.0 / float(row['avg_rank'])
+
+        attendance = np.zeros(count, dtype=np.float64)
+        since = timezone.now() - timedelta(days=TeamBuilderService.ATTENDANCE_WINDOW_DAYS)
+        attendance_rows = SessionAttendance.objects.filter(
+            athlete__center=center,
+            athlete__is_active=True,
+            session__start_time__gte=since
+        ).exclude(session__status='cancelled').values('athlete_id').annotate(
+            total=Count('id'),
+            attended=Count('id', filter=Q(status__in=SessionAttendance.ATTENDED_STATUSES))
+        )
+        for row in attendance_rows:
+            attendance[position[row['athlete_id']]] = 100.0 * row['attended'] / row['total']
+
+        memberships = list(TeamMember.objects.filter(
+            athlete__center=center,
+            athlete__is_active=True,
+            removed_at__isnull=True,
+            team__status__in=TeamBuilderService.ACTIVE_TEAM_STATUSES
+        ).values_list('athlete_id', 'team_id'))
+
+        return {
+            'ids': ids,
+            'date_of_birth': np.array([row[1] for row in athletes], dtype='datetime64[D]'),
+            'gender': np.fromiter(
+                (TeamBuilderService.GENDER_CODES.get(row[2], -1) for row in athletes),
+                dtype=np.int8, count=count
+            ),
+            'ranking_score': np.fromiter(
+                (float(row[3] or 0) for row in athletes), dtype=np.float64, count=count
+            ),
+            'ranking_category': np.array([row[4] or '' for row in athletes], dtype=object),
+            'placement': placement,
+            'attendance': attendance,
+            'member_athlete_ids': np.array([row[0] for row in memberships], dtype=np.int64),
+            'member_team_ids': np.array([row[1] for row in memberships], dtype=np.int64),
+        }
+
+    @staticmethod
+    def ages_on(dates_of_birth, as_of):
+        """
+        Vectorized age in whole years on a given date.
+
+        Args:
+            dates_of_birth: NumPy datetime64[D] array
+            as_of: date
+
+        Returns:
+            ndarray: Ages as integers
+        """
+        birth_years = dates_of_birth.astype('datetime64[Y]').astype(np.int64) + 1970
+        month_starts = dates_of_birth.astype('datetime64[M]')
+        birth_months = month_starts.astype(np.int64) % 12 + 1
+        birth_days = (dates_of_birth - month_starts).astype(np.int64) + 1
+        before_birthday = (birth_months > as_of.month) | (
+            (birth_months == as_of.month) & (birth_days > as_of.day)
+        )
+        return as_of.year - birth_years - before_birthday.astype(np.int64)
+
+    @staticmethod
+    def age_band_from_category(category):
+        """
+        Derive the maximum age from an age-group category such as 'U-14'.
+
+        Returns:
+            int or None: Oldest eligible age, or None if the category is not an age group
+        """
+        match = re.match(r'^\s*U-?(\d+)\s*$', category or '', re.IGNORECASE)
+        if match:
+            return int(match.group(1)) - 1
+        return None
+
+    @staticmethod
+    def propose(team, center, team_size, alternates=0, min_age=None, max_age=None,
+                gender=None, min_attendance=None, as_of=None):
+        """
+        Propose a roster for a competition team.
+
+        Args:
+            team: CompetitionTeam being built (its current members stay eligible)
+            center: Center to pick athletes from
+            team_size: Number of starting athletes
+            alternates: Number of alternates after the starters
+            min_age: Optional minimum age
+            max_age: Optional maximum age (defaults to the team's U-NN category)
+            gender: Optional gender code
+            min_attendance: Optional minimum attendance rate (0-100)
+            as_of: Date ages are computed on (defaults to today)
+
+        Returns:
+            list: Dicts with 'athlete_id', 'role' and 'score', best first
+        """
+        vectors = TeamBuilderService.get_vectors(center)
+        ids = vectors['ids']
+        if not len(ids):
+            return []
+
+        as_of = as_of or timezone.now().date()
+        if max_age is None:
+            max_age = TeamBuilderService.age_band_from_category(team.category)
+
+        eligible = np.ones(len(ids), dtype=bool)
+        if min_age is not None or max_age is not None:
+            ages = TeamBuilderService.ages_on(vectors['date_of_birth'], as_of)
+            if min_age is not None:
+                eligible &= ages >= min_age
+            if max_age is not None:
+                eligible &= ages <= max_age
+        if gender:
+            eligible &= vectors['gender'] == TeamBuilderService.GENDER_CODES.get(gender, -1)
+        if min_attendance is not None:
+            eligible &= vectors['attendance'] >= min_attendance
+
+        busy_ids = vectors['member_athlete_ids'][vectors['member_team_ids'] != team.id]
+        if len(busy_ids):
+            eligible &= ~np.isin(ids, busy_ids)
+
+        candidates = np.flatnonzero(eligible)
+        if not len(candidates):
+            return []
+
+        ranking = np.where(
+            vectors['ranking_category'][candidates] == team.category,
+            vectors['ranking_score'][candidates],
+            0.0
+        )
+        scores = (
+            TeamBuilderService.RANKING_WEIGHT * TeamBuilderService._normalize(ranking)
+            + TeamBuilderService.PLACEMENT_WEIGHT * TeamBuilderService._normalize(vectors['placement'][candidates])
+            + TeamBuilderService.ATTENDANCE_WEIGHT * vectors['attendance'][candidates] / 100.0
+        )
+
+        k = min(team_size + alternates, len(candidates))
+        if k <= 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind='stable')]
+
+        return [
+            {
+                'athlete_id': int(ids[candidates[index]]),
+                'role': 'athlete' if position < team_size else 'alternate',
+                'score': round(float(scores[index]), 4),
+            }
+            for position, index in enumerate(top)
+        ]
+
+    @staticmethod
+    def _normalize(values):
+        peak = values.max() if len(values) else 0.0
+        if peak <= 0:
+            return np.zeros_like(values)
+        return values / peak
@@ -0,0 +1,163 @@
+"""
+Workload report service for the coach portal.
+Computes weekly coach utilization from training sessions, cached per center and week.
+"""
+from datetime import datetime, time, timedelta
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, DurationField, ExpressionWrapper, F, IntegerField, OuterRef, Q, Subquery, Sum
+from django.db.models.functions import Coalesce, TruncWeek
+from django.utils import timezone
+
+from apps.coach_portal.models import CoachProfile, TrainingSession
+
+
+class WorkloadReportService:
+    """
+    Service class for the coach workload report.
+
+    Rows are computed in the database with TruncWeek grouping and conditional
+    aggregation, and cached per (center, week). Saving or deleting a training
+    session only invalidates the weeks it touches, once its transaction
+    commits, so a report over a year of data recomputes just those weeks.
+    """
+
+    CACHE_TIMEOUT = 60 * 60 * 24 * 7  # one week
+
+    CSV_COLUMNS = [
+        'week', 'center_id', 'coach_id', 'coach_name', 'sessions', 'cancelled',
+        'hours', 'athletes_per_session', 'cancellation_rate',
+    ]
+
+    @staticmethod
+    def week_start(value):
+        """Get the Monday of the week containing a date or datetime."""
+        if isinstance(value, datetime):
+            value = timezone.localtime(value).date() if timezone.is_aware(value) else value.date()
+        return value - timedelta(days=value.weekday())
+
+    @staticmethod
+    def cache_key(center_id, week):
+        return f'coach_portal:workload:{center_id}:{week.isoformat()}'
+
+    @staticmethod
+    def invalidate(center_id, start_time):
+        """
+        Drop the cached rows for the week a session starts in, once the
+        current transaction commits. Dropping them earlier would let a report
+        read before the commit cache the old week again for CACHE_TIMEOUT.
+        """
+        key = WorkloadReportService.cache_key(center_id, WorkloadReportService.week_start(start_time))
+        transaction.on_commit(lambda: cache.delete(key))
+
+    @staticmethod
+    def get_report(center_ids, start, end):
+        """
+        Get weekly workload rows per coach.
+
+        Args:
+            center_ids: List of Center ids to report on
+            start: First date of the report (rounded down to its Monday)
+            end: Last date of the report (inclusive)
+
+        Returns:
+            list: Row dicts ordered by week, center and coach name
+        """
+        weeks = []
+        week = WorkloadReportService.week_start(start)
+        while week <= end:
+            weeks.append(week)
+            week += timedelta(days=7)
+
+        keys = {
+            WorkloadReportService.cache_key(center_id, week): (center_id, week)
+            for center_id in center_ids
+            for week in weeks
+        }
+        cached = cache.get_many(keys.keys())
+        missing = [keys[key] for key in keys if key not in cached]
+
+        if missing:
+            computed = WorkloadReportService._compute(missing)
+            cache.set_many(
+                {
+                    WorkloadReportService.cache_key(center_id, week): computed.get((center_id, week), [])
+                    for center_id, week in missing
+                },
+                WorkloadReportService.CACHE_TIMEOUT
+            )
+            cached.update({
+                WorkloadReportService.cache_key(center_id, week): rows
+                for (center_id, week), rows in computed.items()
+            })
+
+        rows = [row for key in keys for row in cached.get(key, [])]
+
+        coach_names = {
+            coach.id: coach.user.get_full_name()
+            for coach in CoachProfile.objects.filter(
+                id__in={row['coach_id'] for row in rows if row['coach_id']}
+            ).select_related('user')
+        }
+        for row in rows:
+            row['coach_name'] = coach_names.get(row['coach_id'], 'Unassigned')
+
+        rows.sort(key=lambda row: (row['week'], row['center_id'], row['coach_name']))
+        return rows
+
+    @staticmethod
+    def _compute(pairs):
+        """
+        Compute rows for (center_id, week) pairs in one grouped query.
+
+        Returns:
+            dict: (center_id, week) -> list of row dicts
+        """
+        center_ids = {center_id for center_id, _ in pairs}
+        first_week = min(week for _, week in pairs)
+        last_week = max(week for _, week in pairs)
+        tz = timezone.get_current_timezone()
+
+        athlete_counts = TrainingSession.athletes.through.objects.filter(
+            trainingsession_id=OuterRef('pk')
+        ).values('trainingsession_id').annotate(count=Count('*')).values('count')
+
+        not_cancelled = ~Q(status='cancelled')
+        grouped = TrainingSession.objects.filter(
+            center_id__in=center_ids,
+            start_time__gte=datetime.combine(first_week, time.min, tzinfo=tz),
+            start_time__lt=datetime.combine(last_week + timedelta(days=7), time.min, tzinfo=tz),
+        ).annotate(
+            athlete_count=Coalesce(Subquery(athlete_counts, output_field=IntegerField()), 0),
+            duration=ExpressionWrapper(F('end_time') - F('start_time'), output_field=DurationField()),
+        ).values(
+            'center_id', 'coach_id', week=TruncWeek('start_time')
+        ).annotate(
+            sessions=Count('id'),
+            cancelled=Count('id', filter=Q(status='cancelled')),
+            total_duration=Sum('duration', filter=not_cancelled),
+            athlete_total=Sum('athlete_count', filter=not_cancelled),
+        ).order_by()
+
+        wanted = set(pairs)
+        results = {}
+        for row in grouped:
+            week = WorkloadReportService.week_start(row['week'])
+            key = (row['center_id'], week)
+            if key not in wanted:
+                continue
+
+            held = row['sessions'] - row['cancelled']
+            duration = row['total_duration'] or timedelta()
+            results.setdefault(key, []).append({
+                'week': week.isoformat(),
+                'center_id': row['center_id'],
+                'coach_id': row['coach_id'],
+                'sessions': row['sessions'],
+                'cancelled': row['cancelled'],
+                'hours': round(duration.total_seconds() / 3600, 2),
+                'athletes_per_session': round((row['athlete_total'] or 0) / held, 2) if held else 0.0,
+                'cancellation_rate': round(100.0 * row['cancelled'] / row['sessions'], 1),
+            })
+        return results
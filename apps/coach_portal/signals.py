@@ -0,0 +1,40 @@
+"""
+Signal handlers for coach portal models.
+Keep cached workload report weeks in sync with training session changes.
+"""
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .models import TrainingSession
+from .services import WorkloadReportService
+
+
+@receiver(pre_save, sender=TrainingSession)
+def invalidate_previous_workload_week(sender, instance, **kwargs):
+    """A rescheduled session also changes the week it moved out of."""
+    if not instance.pk:
+        return
+    previous = TrainingSession.objects.filter(pk=instance.pk).values('center_id', 'start_time').first()
+    if previous and (
+        previous['center_id'] != instance.center_id or previous['start_time'] != instance.start_time
+    ):
+        WorkloadReportService.invalidate(previous['center_id'], previous['start_time'])
+
+
+@receiver(post_save, sender=TrainingSession)
+@receiver(post_delete, sender=TrainingSession)
+def invalidate_workload_week(sender, instance, **kwargs):
+    WorkloadReportService.invalidate(instance.center_id, instance.start_time)
+
+
+@receiver(m2m_changed, sender=TrainingSession.athletes.through)
+def invalidate_workload_week_on_roster_change(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        WorkloadReportService.invalidate(instance.center_id, instance.start_time)
+    elif pk_set:
+        for center_id, start_time in TrainingSession.objects.filter(
+            pk__in=pk_set
+        ).values_list('center_id', 'start_time'):
+            WorkloadReportService.invalidate(center_id, start_time)
@@ -1,3 +1,306 @@
+from datetime import date, datetime, timedelta
+
+import numpy as np
+
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
 from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from apps.athlete_portal.models import AthletePerson, AthleteRanking
+from apps.centers.models import Center
+from apps.coach_portal.models import (
+    CoachProfile, CompetitionTeam, SessionAttendance, TeamMember, TrainingSession
+)
+from apps.coach_portal.services import (
+    AttendanceService, RosterService, TeamBuilderService, WorkloadReportService
+)
+from apps.core.models import Role, User, UserRole
+
+
+class AttendanceServiceTest(TestCase):
+    def setUp(self):
+        self.center = Center.objects.create(
+            name='Test Center', address='1 Track Rd', city='Pune',
+            phone='123', email='center@test.com'
+        )
+        coach_user = User.objects.create_user(email='coach@test.com', password='password')
+        self.coach = CoachProfile.objects.create(user=coach_user, center=self.center)
+        self.team = CompetitionTeam.objects.create(coach=self.coach, name='Sprinters', category='U-14')
+        self.athletes = [
+            AthletePerson.objects.create(
+                first_name=f'Athlete{i}', last_name='Test', date_of_birth=date(2012, 1, 1),
+                gender='female', center=self.center
+            )
+            for i in range(3)
+        ]
+        for athlete in self.athletes:
+            TeamMember.objects.create(team=self.team, athlete=athlete)
+        start = timezone.now() - timedelta(days=1)
+        self.session = TrainingSession.objects.create(
+            coach=self.coach, center=self.center, title='Speed', description='Drills',
+            start_time=start, end_time=start + timedelta(hours=1)
+        )
+
+    def test_roster_falls_back_to_team_members(self):
+        roster = list(AttendanceService.get_roster(self.session))
+        self.assertEqual(len(roster), 3)
+
+    def test_save_keeps_denormalized_count(self):
+        a, b, c = self.athletes
+        attended = AttendanceService.save_session_attendance(self.session, {
+            a.id: (SessionAttendance.PRESENT, 60),
+            b.id: (SessionAttendance.LATE, 45),
+            c.id: (SessionAttendance.ABSENT, None),
+        })
+        self.assertEqual(attended, 2)
+        self.session.refresh_from_db()
+        self.assertEqual(self.session.attendance, 2)
+        self.assertEqual(self.session.athletes.count(), 3)
+
+        # Re-saving updates existing rows in place
+        AttendanceService.save_session_attendance(self.session, {
+            c.id: (SessionAttendance.PRESENT, 60),
+        })
+        self.session.refresh_from_db()
+        self.assertEqual(self.session.attendance, 3)
+        self.assertEqual(SessionAttendance.objects.filter(session=self.session).count(), 3)
+
+    def test_attendance_rates_are_one_grouped_query(self):
+        a, b, c = self.athletes
+        AttendanceService.save_session_attendance(self.session, {
+            a.id: (SessionAttendance.PRESENT, 60),
+            b.id: (SessionAttendance.ABSENT, None),
+        })
+        now = timezone.now()
+        with self.assertNumQueries(1):
+            rates = AttendanceService.athlete_attendance_rates(
+                [a.id, b.id, c.id], now - timedelta(days=30), now
+            )
+        self.assertEqual(rates[a.id]['rate'], 100.0)
+        self.assertEqual(rates[b.id]['rate'], 0.0)
+        self.assertNotIn(c.id, rates)
+
+        with self.assertNumQueries(1):
+            team_rates = AttendanceService.team_attendance_rates(
+                [self.team.id], now - timedelta(days=30), now
+            )
+        self.assertEqual(team_rates[self.team.id]['total'], 2)
+        self.assertEqual(team_rates[self.team.id]['rate'], 50.0)
+
+
+class AthleteSearchViewTest(TestCase):
+    def setUp(self):
+        self.center = Center.objects.create(
+            name='Test Center', address='1 Track Rd', city='Pune',
+            phone='123', email='center@test.com'
+        )
+        self.user = User.objects.create_user(email='head@test.com', password='password', is_active=True)
+        role = Role.objects.create(code=Role.COACH, name='Coach', dashboard_url='coach_portal:dashboard')
+        UserRole.objects.create(user=self.user, role=role)
+        coach = CoachProfile.objects.create(user=self.user, center=self.center, is_head_coach=True)
+        self.team = CompetitionTeam.objects.create(coach=coach, name='Jumpers', category='U-14')
+        for i in range(25):
+            AthletePerson.objects.create(
+                first_name=f'Sam{i}', last_name='Shah', date_of_birth=date(2012, 1, 1),
+                gender='male', center=self.center
+            )
+        self.member = AthletePerson.objects.create(
+            first_name='Samir', last_name='Shah', date_of_birth=date(2012, 1, 1),
+            gender='male', center=self.center
+        )
+        TeamMember.objects.create(team=self.team, athlete=self.member)
+        self.client.force_login(self.user)
+        self.url = reverse('coach_portal:athlete_search', args=[self.team.id])
+
+    def test_results_are_limited_and_exclude_members(self):
+        response = self.client.get(self.url, {'q': 'sha'})
+        results = response.json()['results']
+        self.assertEqual(len(results), 20)
+        self.assertNotIn(self.member.id, [row['id'] for row in results])
+
+    def test_terms_match_first_and_last_name_prefixes(self):
+        response = self.client.get(self.url, {'q': 'sam1 sh'})
+        names = [row['name'] for row in response.json()['results']]
+        self.assertEqual(len(names), 11)  # Sam1, Sam10..Sam19
+        self.assertTrue(all(name.startswith('Shah, Sam1') for name in names))
+
+    def test_empty_query_returns_nothing(self):
+        response = self.client.get(self.url, {'q': ' '})
+        self.assertEqual(response.json()['results'], [])
+
+    def test_each_searched_name_has_its_own_index(self):
+        # An OR over two columns can only use indexes if each column leads one
+        # after the center and is_active equality prefix
+        index_fields = [index.fields[:3] for index in AthletePerson._meta.indexes]
+        for column in ('last_name', 'first_name'):
+            self.assertIn(['center', 'is_active', column], index_fields)
+
+
+class RosterServiceTest(TestCase):
+    def setUp(self):
+        self.center = Center.objects.create(
+            name='Test Center', address='1 Track Rd', city='Pune',
+            phone='123', email='center@test.com'
+        )
+        coach_user = User.objects.create_user(email='coach@test.com', password='password')
+        coach = CoachProfile.objects.create(user=coach_user, center=self.center, is_head_coach=True)
+        self.team = CompetitionTeam.objects.create(coach=coach, name='Relay', category='U-18')
+        self.athletes = [
+            AthletePerson.objects.create(
+                first_name=f'Athlete{i}', last_name='Test', date_of_birth=date(2008, 1, 1),
+                gender='male', center=self.center
+            )
+            for i in range(4)
+        ]
+
+    def test_apply_changes(self):
+        a, b, c, d = self.athletes
+        TeamMember.objects.create(team=self.team, athlete=a)
+        TeamMember.objects.create(team=self.team, athlete=b)
+        TeamMember.objects.create(team=self.team, athlete=c, removed_at=timezone.now())
+
+        summary = RosterService.apply_changes(
+            self.team, self.center,
+            add_ids=[c.id, d.id], remove_ids=[b.id], roles={a.id: 'alternate'}
+        )
+
+        self.assertEqual(summary, {'added': 1, 'reactivated': 1, 'removed': 1, 'role_changed': 1})
+        active = dict(TeamMember.objects.filter(
+            team=self.team, removed_at__isnull=True
+        ).values_list('athlete_id', 'role'))
+        self.assertEqual(active, {a.id: 'alternate', c.id: 'athlete', d.id: 'athlete'})
+
+    def test_rejects_athletes_outside_center(self):
+        other_center = Center.objects.create(
+            name='Other Center', address='2 Field Rd', city='Pune',
+            phone='456', email='other@test.com'
+        )
+        outsider = AthletePerson.objects.create(
+            first_name='Out', last_name='Sider', date_of_birth=date(2008, 1, 1),
+            gender='male', center=other_center
+        )
+        with self.assertRaises(ValidationError):
+            RosterService.apply_changes(self.team, self.center, add_ids=[self.athletes[0].id, outsider.id])
+        self.assertFalse(TeamMember.objects.filter(team=self.team).exists())
+
+
+class TeamBuilderServiceTest(TestCase):
+    def setUp(self):
+        self.center = Center.objects.create(
+            name='Test Center', address='1 Track Rd', city='Pune',
+            phone='123', email='center@test.com'
+        )
+        coach_user = User.objects.create_user(email='coach@test.com', password='password')
+        self.coach = CoachProfile.objects.create(user=coach_user, center=self.center, is_head_coach=True)
+        self.team = CompetitionTeam.objects.create(coach=self.coach, name='U14 Girls', category='U-14')
+        self.as_of = date(2026, 6, 1)
+
+    def make_athlete(self, name, born, gender='female', score=0):
+        athlete = AthletePerson.objects.create(
+            first_name=name, last_name='Test', date_of_birth=born,
+            gender=gender, center=self.center
+        )
+        AthleteRanking.objects.create(athlete=athlete, category='U-14', total_score=score)
+        return athlete
+
+    def test_ages_on_handles_birthdays(self):
+        dobs = np.array([date(2013, 6, 1), date(2013, 6, 2), date(2012, 12, 31)], dtype='datetime64[D]')
+        self.assertEqual(TeamBuilderService.ages_on(dobs, self.as_of).tolist(), [13, 12, 13])
+
+    def test_propose_ranks_and_filters(self):
+        best = self.make_athlete('Best', date(2013, 1, 1), score=90)
+        second = self.make_athlete('Second', date(2013, 1, 1), score=70)
+        third = self.make_athlete('Third', date(2013, 1, 1), score=50)
+        self.make_athlete('TooOld', date(2010, 1, 1), score=100)
+        self.make_athlete('Boy', date(2013, 1, 1), gender='male', score=100)
+        busy = self.make_athlete('Busy', date(2013, 1, 1), score=100)
+        other_team = CompetitionTeam.objects.create(
+            coach=self.coach, name='Other', category='U-14', status='active'
+        )
+        TeamMember.objects.create(team=other_team, athlete=busy)
+
+        proposal = TeamBuilderService.propose(
+            self.team, self.center, team_size=2, alternates=1,
+            gender='female', as_of=self.as_of
+        )
+
+        self.assertEqual(
+            [(row['athlete_id'], row['role']) for row in proposal],
+            [(best.id, 'athlete'), (second.id, 'athlete'), (third.id, 'alternate')]
+        )
+
+
+class WorkloadReportServiceTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.center = Center.objects.create(
+            name='Test Center', address='1 Track Rd', city='Pune',
+            phone='123', email='center@test.com'
+        )
+        coach_user = User.objects.create_user(
+            email='coach@test.com', password='password', first_name='Asha', last_name='Rao'
+        )
+        self.coach = CoachProfile.objects.create(user=coach_user, center=self.center)
+        self.athlete = AthletePerson.objects.create(
+            first_name='Athlete', last_name='Test', date_of_birth=date(2012, 1, 1),
+            gender='female', center=self.center
+        )
+        self.monday = timezone.make_aware(datetime(2026, 3, 2, 9, 0))
+
+    def make_session(self, start, hours=2, status='completed'):
+        session = TrainingSession.objects.create(
+            coach=self.coach, center=self.center, title='Session', description='Drills',
+            start_time=start, end_time=start + timedelta(hours=hours), status=status
+        )
+        session.athletes.add(self.athlete)
+        return session
+
+    def test_weekly_rows(self):
+        self.make_session(self.monday)
+        self.make_session(self.monday + timedelta(days=2), hours=1)
+        self.make_session(self.monday + timedelta(days=3), status='cancelled')
+
+        rows = WorkloadReportService.get_report(
+            [self.center.id], self.monday.date(), self.monday.date() + timedelta(days=6)
+        )
+
+        self.assertEqual(len(rows), 1)
+        row = rows[0]
+        self.assertEqual(row['week'], '2026-03-02')
+        self.assertEqual(row['coach_name'], 'Asha Rao')
+        self.assertEqual(row['sessions'], 3)
+        self.assertEqual(row['hours'], 3.0)
+        self.assertEqual(row['athletes_per_session'], 1.0)
+        self.assertEqual(row['cancellation_rate'], 33.3)
+
+    def test_only_touched_weeks_are_recomputed(self):
+        self.make_session(self.monday)
+        self.make_session(self.monday + timedelta(days=7))
+        start, end = self.monday.date(), self.monday.date() + timedelta(days=13)
+        WorkloadReportService.get_report([self.center.id], start, end)
+
+        # Warm: only the coach name lookup runs
+        with self.assertNumQueries(1):
+            WorkloadReportService.get_report([self.center.id], start, end)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.make_session(self.monday + timedelta(days=8), hours=3)
+        self.assertIsNotNone(cache.get(WorkloadReportService.cache_key(self.center.id, start)))
+        rows = WorkloadReportService.get_report([self.center.id], start, end)
+        self.assertEqual([row['hours'] for row in rows], [2.0, 5.0])
+
+    def test_weeks_are_invalidated_after_commit(self):
+        self.make_session(self.monday)
+        start, end = self.monday.date(), self.monday.date() + timedelta(days=6)
+        WorkloadReportService.get_report([self.center.id], start, end)
+        key = WorkloadReportService.cache_key(self.center.id, start)
 
-# Create your tests here.
+        with self.captureOnCommitCallbacks(execute=True):
+            self.make_session(self.monday + timedelta(days=1))
+            # A report read before the commit must not be what stays cached
+            self.assertIsNotNone(cache.get(key))
+        self.assertIsNone(cache.get(key))
+        rows = WorkloadReportService.get_report([self.center.id], start, end)
+        self.assertEqual(rows[0]['sessions'], 2)
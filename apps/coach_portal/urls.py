@@ -10,8 +10,13 @@ urlpatterns = [
     path('teams/create/', views.create_team, name='create_team'),
     path('teams/<int:team_id>/', views.team_detail, name='team_detail'),
     path('teams/<int:team_id>/add-member/', views.add_team_member, name='add_team_member'),
+    path('teams/<int:team_id>/roster/', views.team_roster, name='team_roster'),
+    path('teams/<int:team_id>/builder/', views.team_builder, name='team_builder'),
+    path('teams/<int:team_id>/athlete-search/', views.athlete_search, name='athlete_search'),
     path('teams/<int:team_id>/remove-member/<int:member_id>/', views.remove_team_member, name='remove_team_member'),
     path('training-sessions/', views.training_sessions_dashboard, name='training_sessions'),
     path('training-sessions/create/', views.create_training_session, name='create_training_session'),
+    path('training-sessions/<int:session_id>/attendance/', views.session_attendance, name='session_attendance'),
+    path('reports/workload/', views.workload_report, name='workload_report'),
     path('athletes/', views.athletes_dashboard, name='athletes'),
 ]
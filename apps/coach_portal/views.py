@@ -1,12 +1,27 @@
+import csv
+
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required
-from django.db.models import Count
+from django.core.exceptions import PermissionDenied, ValidationError
+from django.db.models import Count, Exists, OuterRef, Q
+from django.http import HttpResponse, JsonResponse
 from django.utils import timezone
-from datetime import timedelta
+from datetime import date, timedelta
 
 from apps.core.decorators.permissions import require_roles
-from .models import CoachProfile, TrainingSession, CompetitionTeam, TeamMember
-from apps.athlete_portal.models import AthletePerson, AthleteScore, AthleteRanking
+from .models import CoachProfile, TrainingSession, CompetitionTeam, TeamMember, SessionAttendance
+from .services import AttendanceService, RosterService, TeamBuilderService, WorkloadReportService
+from apps.athlete_portal.models import (
+    AGE_BANDS, OPEN_AGE_BAND, AthletePerson, AthleteScore, AthleteRanking, age_band_expression, age_expression
+)
+from apps.centers.models import Center
+
+
+# Maximum number of athletes returned per typeahead keystroke
+ATHLETE_SEARCH_LIMIT = 20
+
+# Longest date range the workload report will compute
+WORKLOAD_REPORT_MAX_DAYS = 731
 
 
 @login_required
@@ -51,6 +66,17 @@ def coach_dashboard(request):
         athlete_id__in=team_athletes,
         athlete__is_active=True
     ).select_related('athlete').order_by('-total_score')[:10]
+
+    # Attendance rate per team over the last 30 days (one grouped query)
+    now = timezone.now()
+    attendance_rates = AttendanceService.team_attendance_rates(
+        team_ids, now - timedelta(days=30), now
+    )
+    team_attendance = [
+        {'team': team, **attendance_rates[team.id]}
+        for team in teams
+        if team.id in attendance_rates
+    ]
     
     context = {
         'coach': coach,
@@ -58,6 +84,7 @@ def coach_dashboard(request):
         'upcoming_sessions': upcoming_sessions,
         'past_sessions': past_sessions,
         'athlete_rankings': athlete_rankings,
+        'team_attendance': team_attendance,
         'total_teams': teams.count(),
         'total_athletes': TeamMember.objects.filter(
             team__in=teams,
@@ -142,12 +169,23 @@ def athletes_dashboard(request):
     team_members = TeamMember.objects.filter(
         team_id__in=team_ids,
         removed_at__isnull=True
-    ).select_related('athlete', 'team').order_by('team', 'athlete__user__first_name')
+    ).select_related('athlete', 'team').annotate(
+        athlete_age=age_expression('athlete__date_of_birth'),
+        athlete_age_band=age_band_expression('athlete__date_of_birth'),
+    ).order_by('team', 'athlete__last_name', 'athlete__first_name')
+    
+    # Filter by age band in SQL
+    age_bands = [f'U-{band}' for band in AGE_BANDS] + [OPEN_AGE_BAND]
+    selected_band = request.GET.get('band')
+    if selected_band in age_bands:
+        team_members = team_members.filter(athlete_age_band=selected_band)
     
     context = {
         'team_members': team_members,
         'teams': teams,
         'coach': coach,
+        'age_bands': age_bands,
+        'selected_band': selected_band,
     }
     
     return render(request, 'coach_portal/athletes.html', context)
@@ -183,6 +221,65 @@ def create_training_session(request):
         'title': 'Create Training Session'
     }
     return render(request, 'coach_portal/training_session_form.html', context)
+
+
+@login_required
+@require_roles('coach')
+def session_attendance(request, session_id):
+    """Record attendance for a whole training session from a roster."""
+    user = request.user
+    coach = get_object_or_404(CoachProfile, user=user)
+
+    # Head coaches can take attendance for any session in their center
+    if coach.has_head_coach_privileges and coach.center:
+        session = get_object_or_404(TrainingSession, id=session_id, center=coach.center)
+    else:
+        session = get_object_or_404(TrainingSession, id=session_id, coach=coach)
+
+    roster = list(AttendanceService.get_roster(session))
+    records = {record.athlete_id: record for record in session.attendance_records.all()}
+    valid_statuses = dict(SessionAttendance.STATUS_CHOICES)
+    errors = []
+
+    if request.method == 'POST':
+        entries = {}
+        for athlete in roster:
+            status = request.POST.get(f'status_{athlete.id}')
+            if not status:
+                continue
+            if status not in valid_statuses:
+                errors.append(f'Invalid status for {athlete.get_full_name()}.')
+                continue
+
+            minutes = request.POST.get(f'minutes_{athlete.id}', '').strip()
+            if minutes:
+                if not minutes.isdigit():
+                    errors.append(f'Minutes for {athlete.get_full_name()} must be a whole number.')
+                    continue
+                minutes = int(minutes)
+            else:
+                minutes = None
+            entries[athlete.id] = (status, minutes)
+
+        if not errors:
+            AttendanceService.save_session_attendance(session, entries)
+            return redirect('coach_portal:training_sessions')
+
+    rows = [
+        {'athlete': athlete, 'record': records.get(athlete.id)}
+        for athlete in roster
+    ]
+
+    context = {
+        'session': session,
+        'rows': rows,
+        'status_choices': SessionAttendance.STATUS_CHOICES,
+        'errors': errors,
+        'coach': coach,
+    }
+    return render(request, 'coach_portal/session_attendance.html', context)
+
+
 @login_required
 @require_roles('coach')
 def team_detail(request, team_id):
@@ -258,25 +355,10 @@ def add_team_member(request, team_id):
     else:
         team = get_object_or_404(CompetitionTeam, id=team_id, coach=coach)
 
-    # Get available athletes (in center, not currently active in team)
-    # We want athletes who are NOT currently in the team (removed_at is null)
-    current_member_ids = TeamMember.objects.filter(
-        team=team, 
-        removed_at__isnull=True
-    ).values_list('athlete_id', flat=True)
-    
-    if coach.center:
-        available_athletes = AthletePerson.objects.filter(
-            center=coach.center,
-            is_active=True
-        ).exclude(id__in=current_member_ids).order_by('last_name', 'first_name')
-    else:
-        available_athletes = []
-
     context = {
         'team': team,
-        'available_athletes': available_athletes,
-        'coach': coach
+        'coach': coach,
+        'has_age_band': TeamBuilderService.age_band_from_category(team.category) is not None,
     }
 
     if request.method == 'POST':
@@ -289,7 +371,7 @@ def add_team_member(request, team_id):
                 return render(request, 'coach_portal/add_team_member.html', context)
             
             # Verify athlete belongs to same center
-            if coach.center and athlete.center != coach.center:
+            if coach.center and athlete.center_id != coach.center_id:
                 # Should not happen if filtered correctly, but good for security
                 context['error'] = 'Selected athlete does not belong to your center.'
                 return render(request, 'coach_portal/add_team_member.html', context)
@@ -309,6 +391,171 @@ def add_team_member(request, team_id):
     return render(request, 'coach_portal/add_team_member.html', context)
 
 
+@login_required
+@require_roles('coach')
+def team_roster(request, team_id):
+    """Edit a team's roster in bulk: add, remove and re-role members (Head Coach only)."""
+    user = request.user
+    coach = get_object_or_404(CoachProfile, user=user)
+
+    if not coach.has_head_coach_privileges:
+        return redirect('coach_portal:team_detail', team_id=team_id)
+
+    if coach.center:
+        team = get_object_or_404(CompetitionTeam, id=team_id, coach__center=coach.center)
+    else:
+        team = get_object_or_404(CompetitionTeam, id=team_id, coach=coach)
+
+    error = None
+    if request.method == 'POST':
+        try:
+            add_ids = [int(value) for value in request.POST.getlist('add')]
+            remove_ids = [int(value) for value in request.POST.getlist('remove')]
+            roles = {
+                int(key[len('role_'):]): value
+                for key, value in request.POST.items()
+                if key.startswith('role_')
+            }
+        except ValueError:
+            error = 'Invalid athlete selection.'
+        else:
+            try:
+                RosterService.apply_changes(
+                    team, coach.center,
+                    add_ids=add_ids, remove_ids=remove_ids, roles=roles
+                )
+            except ValidationError as e:
+                error = ' '.join(e.messages)
+            else:
+                return redirect('coach_portal:team_detail', team_id=team.id)
+
+    members = TeamMember.objects.filter(
+        team=team,
+        removed_at__isnull=True
+    ).select_related('athlete').order_by('athlete__last_name', 'athlete__first_name')
+
+    context = {
+        'team': team,
+        'members': members,
+        'role_choices': TeamMember.ROLE_CHOICES,
+        'error': error,
+        'coach': coach,
+    }
+    return render(request, 'coach_portal/team_roster.html', context)
+
+
+@login_required
+@require_roles('coach')
+def team_builder(request, team_id):
+    """Propose a team roster from rankings, scores and attendance (Head Coach only)."""
+    user = request.user
+    coach = get_object_or_404(CoachProfile, user=user)
+
+    if not coach.has_head_coach_privileges or not coach.center:
+        return redirect('coach_portal:team_detail', team_id=team_id)
+
+    team = get_object_or_404(CompetitionTeam, id=team_id, coach__center=coach.center)
+
+    from .forms import TeamBuilderForm
+
+    error = None
+    rows = []
+    if request.method == 'POST':
+        # Commit the proposed roster through the regular roster service
+        try:
+            add_ids = [int(value) for value in request.POST.getlist('athlete')]
+            roles = {athlete_id: request.POST.get(f'role_{athlete_id}', 'athlete') for athlete_id in add_ids}
+        except ValueError:
+            error = 'Invalid athlete selection.'
+        else:
+            try:
+                RosterService.apply_changes(team, coach.center, add_ids=add_ids, roles=roles)
+            except ValidationError as e:
+                error = ' '.join(e.messages)
+            else:
+                TeamBuilderService.invalidate(coach.center_id)
+                return redirect('coach_portal:team_detail', team_id=team.id)
+        form = TeamBuilderForm()
+    else:
+        form = TeamBuilderForm(request.GET or None)
+        if form.is_valid():
+            data = form.cleaned_data
+            min_attendance = data['min_attendance']
+            proposal = TeamBuilderService.propose(
+                team, coach.center,
+                team_size=data['team_size'],
+                alternates=data['alternates'],
+                min_age=data['min_age'],
+                max_age=data['max_age'],
+                gender=data['gender'] or None,
+                min_attendance=float(min_attendance) if min_attendance is not None else None,
+            )
+            athletes = AthletePerson.objects.in_bulk([row['athlete_id'] for row in proposal])
+            rows = [{**row, 'athlete': athletes[row['athlete_id']]} for row in proposal]
+
+    context = {
+        'team': team,
+        'form': form,
+        'rows': rows,
+        'role_choices': TeamMember.ROLE_CHOICES,
+        'error': error,
+        'coach': coach,
+    }
+    return render(request, 'coach_portal/team_builder.html', context)
+
+
+@login_required
+@require_roles('coach')
+def athlete_search(request, team_id):
+    """Typeahead JSON search for athletes to add to the team (Head Coach only)."""
+    user = request.user
+    coach = get_object_or_404(CoachProfile, user=user)
+
+    if not coach.has_head_coach_privileges or not coach.center:
+        return JsonResponse({'results': []}, status=403)
+
+    team = get_object_or_404(CompetitionTeam, id=team_id, coach__center=coach.center)
+
+    terms = request.GET.get('q', '').split()
+    if not terms:
+        return JsonResponse({'results': []})
+
+    # Each term is a last name OR first name prefix; the (center_id,
+    # is_active, last_name, ...) and (center_id, is_active, first_name, ...)
+    # indexes give each side of the OR its own range
+    athletes = AthletePerson.objects.filter(center=coach.center, is_active=True)
+    if request.GET.get('eligible'):
+        # Only athletes young enough for the team's U-NN category
+        max_age = TeamBuilderService.age_band_from_category(team.category)
+        if max_age is not None:
+            athletes = athletes.aged(max_age=max_age)
+    for term in terms[:3]:
+        athletes = athletes.filter(
+            Q(last_name__istartswith=term) | Q(first_name__istartswith=term)
+        )
+
+    # NOT EXISTS anti-join against current (not removed) members
+    current_member = TeamMember.objects.filter(
+        team=team,
+        athlete=OuterRef('pk'),
+        removed_at__isnull=True
+    )
+    athletes = athletes.filter(~Exists(current_member)).with_age().with_age_band().values(
+        'id', 'first_name', 'last_name', 'age', 'age_band'
+    ).order_by('last_name', 'first_name')[:ATHLETE_SEARCH_LIMIT]
+
+    results = [
+        {
+            'id': athlete['id'],
+            'name': f"{athlete['last_name']}, {athlete['first_name']}",
+            'age': athlete['age'],
+            'age_band': athlete['age_band'],
+        }
+        for athlete in athletes
+    ]
+    return JsonResponse({'results': results})
+
+
 @login_required
 @require_roles('coach')
 def remove_team_member(request, team_id, member_id):
@@ -329,3 +576,67 @@ def remove_team_member(request, team_id, member_id):
     member.save()
     
     return redirect('coach_portal:team_detail', team_id=team_id)
+
+
+@login_required
+@require_roles(['admin', 'coach'])
+def workload_report(request):
+    """Weekly coach utilization report (Admins and Head Coaches), exportable as CSV or JSON."""
+    user = request.user
+
+    if user.has_role('admin'):
+        centers = Center.objects.filter(is_active=True)
+    else:
+        coach = get_object_or_404(CoachProfile, user=user)
+        if not coach.has_head_coach_privileges or not coach.center_id:
+            raise PermissionDenied('Head coach privileges are required')
+        centers = Center.objects.filter(id=coach.center_id)
+    centers = list(centers.order_by('name'))
+    center_ids = [center.id for center in centers]
+
+    selected_center = request.GET.get('center')
+    if selected_center and selected_center.isdigit() and int(selected_center) in center_ids:
+        center_ids = [int(selected_center)]
+
+    today = timezone.now().date()
+    try:
+        end = date.fromisoformat(request.GET['end']) if request.GET.get('end') else today
+        start = date.fromisoformat(request.GET['start']) if request.GET.get('start') else end - timedelta(weeks=12)
+    except ValueError:
+        end = today
+        start = end - timedelta(weeks=12)
+    if start > end:
+        start, end = end, start
+    start = max(start, end - timedelta(days=WORKLOAD_REPORT_MAX_DAYS))
+
+    rows = WorkloadReportService.get_report(center_ids, start, end)
+
+    export_format = request.GET.get('format')
+    if export_format == 'csv':
+        response = HttpResponse(content_type='text/csv')
+        response['Content-Disposition'] = (
+            f'attachment; filename="coach-workload-{start.isoformat()}-{end.isoformat()}.csv"'
+        )
+        writer = csv.DictWriter(response, fieldnames=WorkloadReportService.CSV_COLUMNS)
+        writer.writeheader()
+        writer.writerows(rows)
+        return response
+    if export_format == 'json':
+        return JsonResponse({
+            'start': start.isoformat(),
+            'end': end.isoformat(),
+            'rows': rows,
+        })
+
+    center_names = {center.id: center.name for center in centers}
+    for row in rows:
+        row['center_name'] = center_names.get(row['center_id'], '')
+
+    context = {
+        'rows': rows,
+        'centers': centers,
+        'selected_center': selected_center,
+        'start': start,
+        'end': end,
+    }
+    return render(request, 'coach_portal/workload_report.html', context)
@@ -4,8 +4,10 @@ Admin configuration for core models.
 
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
+from django.db.models import Prefetch
 from django.utils.html import format_html
-from .models import User, Role, RoleTag, UserRole, UserRoleTag
+from .admin_filters import select_related_filter
+from .models import ActivityLog, KpiCounter, User, Role, RoleTag, UserRole, UserRoleTag
 
 
 @admin.register(Role)
@@ -36,6 +38,7 @@ class RoleAdmin(admin.ModelAdmin):
 @admin.register(RoleTag)
 class RoleTagAdmin(admin.ModelAdmin):
     list_display = ['name', 'code', 'applicable_to_role', 'is_active']
+    list_select_related = ['applicable_to_role']
     list_filter = ['is_active', 'applicable_to_role', 'created_at']
     search_fields = ['name', 'code']
     ordering = ['name']
@@ -79,6 +82,8 @@ class UserAdmin(BaseUserAdmin):
     search_fields = ['email', 'first_name', 'last_name']
     ordering = ['-date_joined']
     readonly_fields = ['date_joined', 'last_login', 'created_at', 'updated_at']
+    # Skip the unfiltered COUNT(*) over every user on each changelist page
+    show_full_result_count = False
 
     fieldsets = (
         ('Login Credentials', {
@@ -116,6 +121,12 @@ class UserAdmin(BaseUserAdmin):
         return format_html('<span style="color: orange;">✗ Inactive</span>')
     active_status.short_description = 'Active Status'
 
+    def get_queryset(self, request):
+        # Role names for every row on the page in one query
+        return super().get_queryset(request).prefetch_related(
+            Prefetch('roles', queryset=Role.objects.only('name', 'display_order'))
+        )
+
     def get_roles_display(self, obj):
         roles = obj.roles.all()
         if roles:
@@ -127,7 +138,9 @@ class UserAdmin(BaseUserAdmin):
 @admin.register(UserRole)
 class UserRoleAdmin(admin.ModelAdmin):
     list_display = ['user', 'role', 'assigned_at', 'assigned_by']
+    list_select_related = ['user', 'role', 'assigned_by']
     list_filter = ['role', 'assigned_at']
+    show_full_result_count = False
     search_fields = ['user__email', 'user__first_name', 'user__last_name']
     autocomplete_fields = ['user', 'role', 'assigned_by']
     readonly_fields = ['assigned_at']
@@ -136,7 +149,36 @@ class UserRoleAdmin(admin.ModelAdmin):
 @admin.register(UserRoleTag)
 class UserRoleTagAdmin(admin.ModelAdmin):
     list_display = ['user', 'role_tag', 'assigned_at', 'assigned_by']
-    list_filter = ['role_tag', 'assigned_at']
+    list_select_related = ['user', 'role_tag__applicable_to_role', 'assigned_by']
+    list_filter = [('role_tag', select_related_filter('applicable_to_role')), 'assigned_at']
     search_fields = ['user__email', 'user__first_name', 'user__last_name']
     autocomplete_fields = ['user', 'role_tag', 'assigned_by']
     readonly_fields = ['assigned_at']
+
+
+@admin.register(KpiCounter)
+class KpiCounterAdmin(admin.ModelAdmin):
+    list_display = ['key', 'value', 'updated_at']
+    search_fields = ['key']
+    readonly_fields = ['key', 'value', 'updated_at']
+
+    def has_add_permission(self, request):
+        # Counters are created and corrected by the reconcile_kpis command
+        return False
+
+
+@admin.register(ActivityLog)
+class ActivityLogAdmin(admin.ModelAdmin):
+    list_display = ['created_at', 'verb', 'target_type', 'target_id', 'summary', 'center', 'actor']
+    list_filter = ['verb', 'target_type']
+    search_fields = ['summary']
+    list_select_related = ['center', 'actor']
+    date_hierarchy = 'created_at'
+    show_full_result_count = False
+
+    def has_add_permission(self, request):
+        # Entries are appended by signals and services only
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
@@ -0,0 +1,28 @@
+"""
+Shared Django admin list filters.
+"""
+from django.contrib import admin
+
+
+class SelectRelatedFieldListFilter(admin.RelatedFieldListFilter):
+    """
+    RelatedFieldListFilter whose choices are loaded with select_related(), for
+    related models whose __str__ follows a foreign key (e.g. CoachProfile,
+    which shows its user's name). The stock filter runs one query per choice.
+    """
+
+    select_related = ()
+
+    def field_choices(self, field, request, model_admin):
+        queryset = field.related_model._default_manager.complex_filter(
+            field.get_limit_choices_to()
+        ).select_related(*self.select_related)
+        ordering = self.field_admin_ordering(field, request, model_admin)
+        if ordering:
+            queryset = queryset.order_by(*ordering)
+        return [(obj.pk, str(obj)) for obj in queryset]
+
+
+def select_related_filter(*fields):
+    """List filter for a foreign key whose related objects are loaded with select_related(*fields)."""
+    return type('SelectRelatedFieldListFilter', (SelectRelatedFieldListFilter,), {'select_related': fields})
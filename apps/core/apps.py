@@ -5,3 +5,8 @@ class CoreConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "apps.core"
     verbose_name = "Core"
+
+    def ready(self):
+        from .signals import connect_activity_signals, connect_kpi_signals
+        connect_kpi_signals()
+        connect_activity_signals()
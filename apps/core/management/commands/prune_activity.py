@@ -0,0 +1,32 @@
+"""
+Management command to delete activity log entries past the retention period.
+Deletes in small batches so it can run alongside normal traffic (e.g. nightly from cron).
+Usage: python manage.py prune_activity [--days 180] [--batch-size 1000]
+"""
+
+from django.core.management.base import BaseCommand
+from apps.core.services import ActivityService
+
+
+class Command(BaseCommand):
+    help = 'Delete activity log entries older than the retention period'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=ActivityService.RETENTION_DAYS,
+            help=f'Keep entries from the last N days (default {ActivityService.RETENTION_DAYS})'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=ActivityService.PRUNE_BATCH_SIZE,
+            help=f'Entries deleted per statement (default {ActivityService.PRUNE_BATCH_SIZE})'
+        )
+
+    def handle(self, *args, **options):
+        deleted = ActivityService.prune(days=options['days'], batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f"✓ Deleted {deleted} activity entries older than {options['days']} days"
+        ))
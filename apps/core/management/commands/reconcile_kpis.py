@@ -0,0 +1,34 @@
+"""
+Management command to check the dashboard KPI counters against real counts and fix drift.
+Run it periodically (e.g. nightly from cron) to catch changes made by bulk writes.
+Usage: python manage.py reconcile_kpis [--check]
+"""
+
+from django.core.management.base import BaseCommand
+from apps.core.services import KpiService
+
+
+class Command(BaseCommand):
+    help = 'Compare KPI counters with real counts and correct any drift'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='Only report drift, without fixing it'
+        )
+
+    def handle(self, *args, **options):
+        check_only = options['check']
+        drift = KpiService.reconcile(fix=not check_only)
+
+        for key, (stored, actual) in sorted(drift.items()):
+            stored = 'missing' if stored is None else stored
+            self.stdout.write(f'  {key}: counter {stored}, actual {actual}')
+
+        if not drift:
+            self.stdout.write(self.style.SUCCESS('✓ All KPI counters match'))
+        elif check_only:
+            self.stdout.write(self.style.WARNING(f'{len(drift)} KPI counters drifted'))
+        else:
+            self.stdout.write(self.style.SUCCESS(f'✓ Fixed {len(drift)} KPI counters'))
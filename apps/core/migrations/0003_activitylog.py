@@ -0,0 +1,82 @@
+# Generated by Django 5.2.11 on 2026-10-19 00:53
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("centers", "0001_initial"),
+        ("core", "0002_kpicounter"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ActivityLog",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "verb",
+                    models.CharField(
+                        choices=[("created", "Created"), ("updated", "Updated")],
+                        max_length=20,
+                    ),
+                ),
+                (
+                    "target_type",
+                    models.CharField(
+                        help_text="Model label, e.g. events.Event", max_length=100
+                    ),
+                ),
+                ("target_id", models.PositiveBigIntegerField()),
+                ("summary", models.CharField(max_length=255)),
+                ("created_at", models.DateTimeField(default=django.utils.timezone.now)),
+                (
+                    "actor",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="activity",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                (
+                    "center",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="activity",
+                        to="centers.center",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Activity Log Entry",
+                "verbose_name_plural": "Activity Log",
+                "db_table": "activity_log",
+                "ordering": ["-created_at", "-id"],
+                "indexes": [
+                    models.Index(
+                        fields=["center", "created_at"],
+                        name="activity_lo_center__864dec_idx",
+                    ),
+                    models.Index(
+                        fields=["created_at"], name="activity_lo_created_8906e2_idx"
+                    ),
+                ],
+            },
+        ),
+    ]
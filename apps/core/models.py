@@ -195,6 +195,10 @@ class User(AbstractBaseUser, PermissionsMixin):
             models.Index(fields=['email']),
             models.Index(fields=['email', 'is_active']),
             models.Index(fields=['email', 'email_confirmed']),
+            # User directory: newest-first keyset pages and name prefix search
+            models.Index(fields=['date_joined', 'id']),
+            models.Index(fields=['first_name']),
+            models.Index(fields=['last_name']),
         ]
 
     def __str__(self):
@@ -276,3 +280,74 @@ class UserRoleTag(models.Model):
 
     def __str__(self):
         return f"{self.user.email} - {self.role_tag.name}"
+
+
+class KpiCounter(models.Model):
+    """
+    A running count behind a dashboard statistic, e.g. 'events' or 'events.status=ongoing'.
+    Kept current by model signals and checked against real counts by reconcile_kpis.
+    """
+
+    key = models.CharField(max_length=100, unique=True)
+    value = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'kpi_counters'
+        ordering = ['key']
+        verbose_name = 'KPI Counter'
+        verbose_name_plural = 'KPI Counters'
+
+    def __str__(self):
+        return f"{self.key}: {self.value}"
+
+
+class ActivityLog(models.Model):
+    """
+    Append-only record of a change to one of the portal's key models.
+    Read newest first per center through the (center, created_at) index.
+    """
+
+    VERB_CHOICES = [
+        ('created', 'Created'),
+        ('updated', 'Updated'),
+    ]
+
+    center = models.ForeignKey(
+        'centers.Center',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='activity'
+    )
+    actor = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='activity'
+    )
+    verb = models.CharField(max_length=20, choices=VERB_CHOICES)
+    target_type = models.CharField(max_length=100, help_text="Model label, e.g. events.Event")
+    target_id = models.PositiveBigIntegerField()
+    summary = models.CharField(max_length=255)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        db_table = 'activity_log'
+        ordering = ['-created_at', '-id']
+        verbose_name = 'Activity Log Entry'
+        verbose_name_plural = 'Activity Log'
+        indexes = [
+            models.Index(fields=['center', 'created_at']),
+            # Unscoped feed for admins, and retention pruning
+            models.Index(fields=['created_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.get_verb_display()} {self.target_type} #{self.target_id}: {self.summary}"
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            raise ValueError("Activity log entries cannot be changed.")
+        super().save(*args, **kwargs)
@@ -1,4 +1,12 @@
 """Services package for core app."""
+from .activity_service import ActivityService
+from .keyset import decode_cursor, encode_cursor
+from .kpi_service import KpiService
 from .permission_service import PermissionService
+from .rate_limiter import TokenBucketLimiter
+from .user_directory_service import UserDirectoryService
 
-__all__ = ['PermissionService']
+__all__ = [
+    'ActivityService', 'KpiService', 'PermissionService', 'TokenBucketLimiter', 'UserDirectoryService',
+    'decode_cursor', 'encode_cursor',
+]
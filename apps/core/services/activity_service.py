@@ -0,0 +1,204 @@
+"""
+Activity feed for MFU Web Portal.
+Append-only log of changes to key models, read per center newest first.
+"""
+from datetime import timedelta
+
+from django.apps import apps
+from django.db.models import Q, Subquery
+from django.utils import timezone
+
+from apps.core.models import ActivityLog, Role
+from apps.core.services.keyset import decode_cursor, encode_cursor
+from apps.core.services.permission_service import PermissionService
+
+
+class ActivityService:
+    """
+    Service class for the activity log and feed.
+
+    Signals write one entry each time a TRACKED model is created or saved,
+    inside the same transaction as the change. An entry's center is found
+    through the model's center path; when that path crosses a relation the
+    center id is read by a subquery inside the INSERT, so logging costs one
+    statement. Bulk writes skip signals; services that make them record one
+    entry for the whole batch against the parent object.
+
+    The feed reads the (center, created_at) index newest first, with a
+    keyset cursor on (created_at, id) rather than an OFFSET.
+    """
+
+    # (model label, path to its center, actor field or None, field shown in the summary)
+    TRACKED = [
+        ('events.Event', 'center', 'created_by', 'name'),
+        ('events.EventRegistration', 'event__center', 'participant', 'status'),
+        ('finance_portal.FinancialTransaction', 'center', 'recorded_by', 'transaction_id'),
+        ('volunteering.VolunteerApplication', 'opportunity__center', 'volunteer', 'status'),
+        ('coach_portal.TeamMember', 'team__coach__center', None, 'role'),
+        ('athlete_portal.AthleteScore', 'event__center', None, 'score'),
+    ]
+    PAGE_SIZE = 20
+    MAX_PAGE_SIZE = 100
+    RETENTION_DAYS = 180
+    PRUNE_BATCH_SIZE = 1000
+    FIELDS = ('id', 'created_at', 'verb', 'target_type', 'target_id', 'summary', 'center_id', 'actor_id')
+
+    @staticmethod
+    def tracked(model):
+        """TRACKED entry (center path, actor field, summary field) for a model class, or None."""
+        for label, center_path, actor, summary in ActivityService.TRACKED:
+            if model._meta.label == label:
+                return center_path, actor, summary
+        return None
+
+    @staticmethod
+    def center_of(instance, path):
+        """
+        Center id of an instance, or a subquery that finds it.
+
+        Args:
+            instance: Model instance
+            path: Lookup path from the instance's model to its center, e.g. 'event__center'
+
+        Returns:
+            int, None or Subquery: Usable as the center_id of a new entry
+        """
+        first, _, rest = path.partition('__')
+        field = instance._meta.get_field(first)
+        related_id = getattr(instance, field.attname)
+        if not rest or related_id is None:
+            return related_id
+        return Subquery(field.related_model._base_manager.filter(pk=related_id).values(rest)[:1])
+
+    @staticmethod
+    def record(instance, verb):
+        """
+        Append an entry for a change to a TRACKED model instance.
+
+        Args:
+            instance: Instance that was created or saved
+            verb: 'created' or 'updated'
+
+        Returns:
+            ActivityLog: The new entry
+        """
+        center_path, actor_field, summary_field = ActivityService.tracked(type(instance))
+        return ActivityService._append(
+            instance,
+            verb,
+            f'{ActivityService.describe(instance)}: {getattr(instance, summary_field)}',
+            ActivityService.center_of(instance, center_path),
+            getattr(instance, f'{actor_field}_id') if actor_field else None,
+        )
+
+    @staticmethod
+    def record_batch(parent, summary, center=None, actor=None):
+        """
+        Append one entry for a bulk write, which sends no signals.
+
+        Args:
+            parent: Instance the batch belongs to, e.g. the event whose results were imported
+            summary: What the batch did
+            center: Center id or expression (defaults to the parent's center path when it is TRACKED)
+            actor: User who made the change, or None
+
+        Returns:
+            ActivityLog: The new entry
+        """
+        spec = ActivityService.tracked(type(parent))
+        if center is None and spec is not None:
+            center = ActivityService.center_of(parent, spec[0])
+        return ActivityService._append(parent, 'updated', summary, center, getattr(actor, 'pk', actor))
+
+    @staticmethod
+    def _append(target, verb, summary, center, actor_id):
+        return ActivityLog.objects.create(
+            center_id=center,
+            actor_id=actor_id,
+            verb=verb,
+            target_type=target._meta.label,
+            target_id=target.pk,
+            summary=summary[:255],
+        )
+
+    @staticmethod
+    def describe(target):
+        """'Event Registration #12' for a model instance."""
+        return f'{target._meta.verbose_name.title()} #{target.pk}'
+
+    @staticmethod
+    def viewer_center_ids(user):
+        """
+        Centers whose activity a user may see.
+
+        Returns:
+            list or None: Center ids, or None when the user sees every center (admins)
+        """
+        if PermissionService.has_role(user, Role.ADMIN):
+            return None
+        center_model = apps.get_model('centers', 'Center')
+        return list(
+            center_model.objects.filter(Q(center_head=user) | Q(coaches__user=user))
+            .order_by().values_list('id', flat=True).distinct()
+        )
+
+    @staticmethod
+    def feed(user, cursor=None, limit=PAGE_SIZE):
+        """
+        A page of the activity a user may see, newest first.
+
+        Args:
+            user: Viewing user
+            cursor: Opaque cursor from a previous page's 'next'
+            limit: Page size, capped at MAX_PAGE_SIZE
+
+        Returns:
+            dict: {'entries': list of dicts (see FIELDS), 'next': cursor or None}
+        """
+        limit = max(1, min(limit, ActivityService.MAX_PAGE_SIZE))
+        center_ids = ActivityService.viewer_center_ids(user)
+        if center_ids == []:
+            return {'entries': [], 'next': None}
+
+        entries = ActivityLog.objects.all()
+        if center_ids is not None:
+            entries = entries.filter(center_id__in=center_ids)
+        position = decode_cursor(cursor)
+        if position:
+            created_at, entry_id = position
+            entries = entries.filter(
+                Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=entry_id)
+            )
+        rows = list(entries.order_by('-created_at', '-id').values(*ActivityService.FIELDS)[:limit + 1])
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(rows[-1]['created_at'], rows[-1]['id'])
+        return {'entries': rows, 'next': next_cursor}
+
+    @staticmethod
+    def prune(days=RETENTION_DAYS, batch_size=PRUNE_BATCH_SIZE):
+        """
+        Delete entries older than the retention period, a batch at a time.
+
+        Each batch is its own short DELETE by primary key, so pruning a large
+        backlog never holds locks on the whole range at once.
+
+        Args:
+            days: Entries older than this many days are deleted
+            batch_size: Entries deleted per statement
+
+        Returns:
+            int: Number of entries deleted
+        """
+        cutoff = timezone.now() - timedelta(days=days)
+        deleted = 0
+        while True:
+            ids = list(
+                ActivityLog.objects.filter(created_at__lt=cutoff)
+                .order_by('created_at').values_list('id', flat=True)[:batch_size]
+            )
+            if not ids:
+                return deleted
+            deleted += ActivityLog.objects.filter(id__in=ids).delete()[0]
@@ -0,0 +1,38 @@
+"""
+Keyset pagination cursors.
+Opaque page positions for listings ordered by (timestamp, id).
+"""
+import base64
+from datetime import datetime
+
+
+def encode_cursor(position, pk):
+    """
+    Cursor for the row a page ended on.
+
+    Args:
+        position: Date or datetime the listing is ordered by
+        pk: Primary key breaking ties between equal positions
+
+    Returns:
+        str: URL-safe cursor
+    """
+    raw = f'{position.isoformat()}|{pk}'.encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor):
+    """
+    Read a cursor made by encode_cursor.
+
+    Returns:
+        tuple or None: (datetime, pk), or None for a missing or malformed cursor
+    """
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode('utf-8')
+        position, pk = raw.split('|')
+        return datetime.fromisoformat(position), int(pk)
+    except (ValueError, UnicodeDecodeError):
+        return None
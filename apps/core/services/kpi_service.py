@@ -0,0 +1,172 @@
+"""
+KPI counters for MFU Web Portal dashboards.
+Keeps running entity and status counts so dashboards never count rows.
+"""
+from django.apps import apps
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import BigIntegerField, Case, Count, F, Value, When
+from django.utils import timezone
+
+from apps.core.models import KpiCounter
+
+
+class KpiService:
+    """
+    Service class for dashboard KPI counters.
+
+    Each entry of TRACKED counts one model as a whole ('events') and, when
+    it names a field, per value of that field ('events.status=ongoing').
+    Signals move the counters by one as rows are created, deleted or change
+    that field, inside the same transaction as the change. Bulk writes skip
+    signals; services that bulk-create tracked rows call record_created(),
+    and reconcile() puts any remaining drift right.
+
+    Dashboards read every counter with get_all(): one query, then nothing
+    while the cached copy lives.
+    """
+
+    # (counter name, model label, field counted per value or None)
+    TRACKED = [
+        ('centers', 'centers.Center', 'is_active'),
+        ('events', 'events.Event', 'status'),
+        ('athletes', 'athlete_portal.AthletePerson', 'is_active'),
+        ('coaches', 'coach_portal.CoachProfile', None),
+        ('parents', 'parent_portal.Parent', None),
+        ('volunteer_applications', 'volunteering.VolunteerApplication', 'status'),
+    ]
+    CACHE_KEY = 'kpi:counters'
+    CACHE_TIMEOUT = 300  # seconds
+
+    @staticmethod
+    def key(name, field=None, value=None):
+        """Counter key, e.g. key('events', 'status', 'ongoing') -> 'events.status=ongoing'."""
+        return name if field is None else f'{name}.{field}={value}'
+
+    @staticmethod
+    def tracked(model):
+        """TRACKED entries for a model class."""
+        return [
+            (name, field) for name, label, field in KpiService.TRACKED
+            if model._meta.label == label
+        ]
+
+    @staticmethod
+    def keys_for(name, field, values):
+        """Counter keys a row with the given field values counts towards."""
+        keys = [KpiService.key(name)]
+        if field:
+            keys.append(KpiService.key(name, field, values.get(field)))
+        return keys
+
+    @staticmethod
+    def get_all():
+        """
+        Every counter value.
+
+        Counters are seeded from real counts the first time they are read.
+
+        Returns:
+            dict: {key: value}
+        """
+        counters = cache.get(KpiService.CACHE_KEY)
+        if counters is None:
+            counters = dict(KpiCounter.objects.values_list('key', 'value'))
+            if not counters:
+                KpiService.reconcile()
+                counters = dict(KpiCounter.objects.values_list('key', 'value'))
+            cache.set(KpiService.CACHE_KEY, counters, KpiService.CACHE_TIMEOUT)
+        return counters
+
+    @staticmethod
+    def adjust(changes):
+        """
+        Move counters with one UPDATE, in the current transaction.
+
+        Counters that do not exist yet are left for reconcile() to create.
+
+        Args:
+            changes: dict of {key: delta}
+        """
+        changes = {key: delta for key, delta in changes.items() if delta}
+        if not changes:
+            return
+        KpiCounter.objects.filter(key__in=changes).update(
+            value=F('value') + Case(
+                *[When(key=key, then=Value(delta)) for key, delta in changes.items()],
+                output_field=BigIntegerField()
+            ),
+            updated_at=timezone.now(),
+        )
+        transaction.on_commit(KpiService.clear_cache)
+
+    @staticmethod
+    def record_created(instances):
+        """Count rows written by bulk_create, which sends no signals. Rows may be of several models."""
+        changes = {}
+        for instance in instances:
+            for name, field in KpiService.tracked(type(instance)):
+                values = {field: getattr(instance, field)} if field else {}
+                for key in KpiService.keys_for(name, field, values):
+                    changes[key] = changes.get(key, 0) + 1
+        KpiService.adjust(changes)
+
+    @staticmethod
+    def reconcile(fix=True):
+        """
+        Compare counters with real counts, and optionally correct them.
+
+        Every value of a field with choices (or both values of a boolean)
+        gets a counter, so later changes always have one to move.
+
+        Args:
+            fix: Write the real counts
+
+        Returns:
+            dict: {key: (stored, actual)} for counters that were wrong or missing
+        """
+        actual = {}
+        for name, label, field in KpiService.TRACKED:
+            model = apps.get_model(label)
+            if field is None:
+                actual[KpiService.key(name)] = model.objects.count()
+                continue
+            model_field = model._meta.get_field(field)
+            if model_field.choices:
+                values = [value for value, _ in model_field.choices]
+            else:
+                values = [True, False]
+            for value in values:
+                actual[KpiService.key(name, field, value)] = 0
+            total = 0
+            for value, count in model.objects.order_by().values_list(field).annotate(count=Count('pk')):
+                actual[KpiService.key(name, field, value)] = count
+                total += count
+            actual[KpiService.key(name)] = total
+
+        with transaction.atomic():
+            stored = dict(KpiCounter.objects.select_for_update().values_list('key', 'value'))
+            drift = {
+                key: (stored.get(key), value) for key, value in actual.items()
+                if stored.get(key) != value
+            }
+            if fix and drift:
+                now = timezone.now()
+                existing = [key for key in drift if key in stored]
+                KpiCounter.objects.bulk_update(
+                    [
+                        KpiCounter(id=counter_id, value=actual[key], updated_at=now)
+                        for counter_id, key in KpiCounter.objects.filter(key__in=existing).values_list('id', 'key')
+                    ],
+                    ['value', 'updated_at'],
+                )
+                KpiCounter.objects.bulk_create(
+                    [KpiCounter(key=key, value=actual[key]) for key in drift if key not in stored],
+                    ignore_conflicts=True,
+                )
+                transaction.on_commit(KpiService.clear_cache)
+        return drift
+
+    @staticmethod
+    def clear_cache():
+        cache.delete(KpiService.CACHE_KEY)
@@ -0,0 +1,57 @@
+"""
+In-process rate limiting for public endpoints.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+
+class TokenBucketLimiter:
+    """
+    Per-key token bucket kept in process memory.
+
+    Each key (usually a client IP) holds up to `capacity` tokens that refill
+    at `rate` tokens per second. A request spends tokens and is refused once
+    the bucket runs dry. Buckets are kept in LRU order and the least recently
+    used are dropped past `max_keys`; a dropped bucket simply starts full.
+
+    Limits are per process, so with several workers a client can get up to
+    `capacity` requests through each of them.
+    """
+
+    def __init__(self, rate, capacity, max_keys=10000):
+        self.rate = rate
+        self.capacity = capacity
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def allow(self, key, cost=1):
+        """
+        Spend tokens for a request.
+
+        Args:
+            key: Client key, e.g. an IP address
+            cost: Tokens the request needs
+
+        Returns:
+            tuple: (allowed, seconds to wait before retrying; 0 when allowed)
+        """
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.pop(key, (self.capacity, now))
+            tokens = min(self.capacity, tokens + (now - updated) * self.rate)
+            allowed = tokens >= cost
+            if allowed:
+                tokens -= cost
+            self._buckets[key] = (tokens, now)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+
+        if allowed:
+            return True, 0
+        return False, (cost - tokens) / self.rate
+
+    def reset(self):
+        with self._lock:
+            self._buckets.clear()
@@ -0,0 +1,135 @@
+"""
+User directory for MFU Web Portal.
+Filtered, keyset-paginated listing of user accounts for admins.
+"""
+from django.apps import apps
+from django.db.models import Exists, OuterRef, Prefetch, Q
+
+from apps.core.models import Role, RoleTag, User, UserRole, UserRoleTag
+from apps.core.services.keyset import decode_cursor, encode_cursor
+
+
+class UserDirectoryService:
+    """
+    Service class for the admin user directory.
+
+    Role and tag filters are EXISTS subqueries on user_roles and
+    user_role_tags, so a user with several roles is listed once and no
+    DISTINCT is needed. Search matches the start of the email, first name
+    or last name, which the indexes on those columns can serve. Pages are
+    read newest first with a keyset cursor on (date_joined, id) rather
+    than an OFFSET, and role and tag badges are prefetched for the whole
+    page.
+    """
+
+    PAGE_SIZE = 50
+    MAX_PAGE_SIZE = 200
+    FLAGS = {'yes': True, 'no': False}
+
+    @staticmethod
+    def clean_filters(params):
+        """
+        Read directory filters from query parameters, dropping invalid values.
+
+        Args:
+            params: QueryDict or dict with any of q, role, tag, center,
+                active (yes/no) and confirmed (yes/no)
+
+        Returns:
+            dict: Only the filters that were given and valid
+        """
+        filters = {}
+        q = ' '.join((params.get('q') or '').split())
+        if q:
+            filters['q'] = q[:150]
+        if params.get('role') in dict(Role.ROLE_CHOICES):
+            filters['role'] = params['role']
+        if params.get('tag') in dict(RoleTag.TAG_CHOICES):
+            filters['tag'] = params['tag']
+        center = params.get('center')
+        if center and center.isdigit():
+            filters['center'] = int(center)
+        for flag in ('active', 'confirmed'):
+            if params.get(flag) in UserDirectoryService.FLAGS:
+                filters[flag] = params[flag]
+        return filters
+
+    @staticmethod
+    def queryset(filters):
+        """Users matching the filters, unordered."""
+        users = User.objects.all()
+        if filters.get('role'):
+            users = users.filter(Exists(UserRole.objects.filter(
+                user=OuterRef('pk'), role__code=filters['role']
+            )))
+        if filters.get('tag'):
+            users = users.filter(Exists(UserRoleTag.objects.filter(
+                user=OuterRef('pk'), role_tag__code=filters['tag']
+            )))
+        if filters.get('center'):
+            center_id = filters['center']
+            athlete_model = apps.get_model('athlete_portal', 'AthletePerson')
+            coach_model = apps.get_model('coach_portal', 'CoachProfile')
+            center_model = apps.get_model('centers', 'Center')
+            users = users.filter(
+                Exists(athlete_model.objects.filter(user=OuterRef('pk'), center_id=center_id))
+                | Exists(coach_model.objects.filter(user=OuterRef('pk'), center_id=center_id))
+                | Exists(center_model.objects.filter(center_head=OuterRef('pk'), pk=center_id))
+            )
+        if 'active' in filters:
+            users = users.filter(is_active=UserDirectoryService.FLAGS[filters['active']])
+        if 'confirmed' in filters:
+            users = users.filter(email_confirmed=UserDirectoryService.FLAGS[filters['confirmed']])
+        if filters.get('q'):
+            users = users.filter(UserDirectoryService.search_q(filters['q']))
+        return users
+
+    @staticmethod
+    def search_q(text):
+        """
+        Prefix match on email, first name or last name. Two words also
+        match a first name and last name prefix pair, e.g. 'Ana Ku'.
+        """
+        match = (
+            Q(email__istartswith=text)
+            | Q(first_name__istartswith=text)
+            | Q(last_name__istartswith=text)
+        )
+        first, _, last = text.partition(' ')
+        if last:
+            match |= Q(first_name__istartswith=first, last_name__istartswith=last)
+        return match
+
+    @staticmethod
+    def page(filters, cursor=None, limit=PAGE_SIZE):
+        """
+        A page of users, newest first.
+
+        Args:
+            filters: Output of clean_filters()
+            cursor: Opaque cursor from a previous page's 'next'
+            limit: Page size, capped at MAX_PAGE_SIZE
+
+        Returns:
+            dict: {'users': list of User with roles and role_tags prefetched, 'next': cursor or None}
+        """
+        limit = max(1, min(limit, UserDirectoryService.MAX_PAGE_SIZE))
+        users = UserDirectoryService.queryset(filters)
+        position = decode_cursor(cursor)
+        if position:
+            date_joined, user_id = position
+            users = users.filter(
+                Q(date_joined__lt=date_joined) | Q(date_joined=date_joined, id__lt=user_id)
+            )
+        users = list(
+            users.order_by('-date_joined', '-id').prefetch_related(
+                Prefetch('roles', queryset=Role.objects.only('code', 'name', 'display_order')),
+                Prefetch('role_tags', queryset=RoleTag.objects.only('code', 'name')),
+            )[:limit + 1]
+        )
+
+        next_cursor = None
+        if len(users) > limit:
+            users = users[:limit]
+            next_cursor = encode_cursor(users[-1].date_joined, users[-1].id)
+        return {'users': users, 'next': next_cursor}
@@ -0,0 +1,65 @@
+"""
+Signal handlers for core models.
+Keep the dashboard KPI counters in step with the models they count,
+and append activity log entries as key models change.
+"""
+from django.apps import apps
+from django.db.models.signals import post_delete, post_save, pre_save
+
+from .services.activity_service import ActivityService
+from .services.kpi_service import KpiService
+
+
+def remember_counted_values(sender, instance, **kwargs):
+    """Keep the stored values of counted fields so post_save can move their counters."""
+    instance._kpi_previous = None
+    fields = [field for _, field in KpiService.tracked(sender) if field]
+    if instance.pk and fields:
+        instance._kpi_previous = sender._base_manager.filter(pk=instance.pk).values(*fields).first()
+
+
+def count_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    previous = getattr(instance, '_kpi_previous', None)
+    changes = {}
+    for name, field in KpiService.tracked(sender):
+        if created:
+            values = {field: getattr(instance, field)} if field else {}
+            for key in KpiService.keys_for(name, field, values):
+                changes[key] = changes.get(key, 0) + 1
+        elif field and previous is not None and previous[field] != getattr(instance, field):
+            old_key = KpiService.key(name, field, previous[field])
+            new_key = KpiService.key(name, field, getattr(instance, field))
+            changes[old_key] = changes.get(old_key, 0) - 1
+            changes[new_key] = changes.get(new_key, 0) + 1
+    KpiService.adjust(changes)
+
+
+def count_deleted(sender, instance, **kwargs):
+    changes = {}
+    for name, field in KpiService.tracked(sender):
+        values = {field: getattr(instance, field)} if field else {}
+        for key in KpiService.keys_for(name, field, values):
+            changes[key] = changes.get(key, 0) - 1
+    KpiService.adjust(changes)
+
+
+def connect_kpi_signals():
+    for _, label, _ in KpiService.TRACKED:
+        model = apps.get_model(label)
+        dispatch_uid = f'kpi_counters:{label}'
+        pre_save.connect(remember_counted_values, sender=model, dispatch_uid=dispatch_uid)
+        post_save.connect(count_saved, sender=model, dispatch_uid=dispatch_uid)
+        post_delete.connect(count_deleted, sender=model, dispatch_uid=dispatch_uid)
+
+
+def log_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    ActivityService.record(instance, 'created' if created else 'updated')
+
+
+def connect_activity_signals():
+    for label, _, _, _ in ActivityService.TRACKED:
+        post_save.connect(log_saved, sender=apps.get_model(label), dispatch_uid=f'activity_log:{label}')
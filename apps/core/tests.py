@@ -1,3 +1,363 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection, transaction
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from apps.centers.models import Center
+from apps.core.models import ActivityLog, KpiCounter, Role, RoleTag, User, UserRole
+from apps.core.services import ActivityService, KpiService, decode_cursor, encode_cursor
+from apps.events.models import Event
+from apps.events.services import RegistrationService
+
+
+class KpiServiceTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.center = Center.objects.create(
+            name='Main Center', address='1 Track Rd', city='Pune', phone='123', email='center@test.com'
+        )
+
+    def create_event(self, status='draft'):
+        now = timezone.now()
+        return Event.objects.create(
+            name='Meet', description='-', center=self.center, status=status, start_date=now, end_date=now,
+            registration_start=now, registration_end=now, max_participants=10,
+        )
+
+    def test_counters_are_seeded_then_follow_changes(self):
+        self.create_event()
+        kpis = KpiService.get_all()
+        self.assertEqual((kpis['centers'], kpis['events'], kpis['events.status=draft']), (1, 1, 1))
+        self.assertEqual(kpis['events.status=ongoing'], 0)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            event = self.create_event()
+            event.status = 'ongoing'
+            event.save()
+            self.center.is_active = False
+            self.center.save()
+        with self.assertNumQueries(1):
+            kpis = KpiService.get_all()
+        with self.assertNumQueries(0):
+            KpiService.get_all()
+        self.assertEqual(
+            (kpis['events'], kpis['events.status=draft'], kpis['events.status=ongoing']), (2, 1, 1)
+        )
+        self.assertEqual((kpis['centers.is_active=True'], kpis['centers.is_active=False']), (0, 1))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            event.delete()
+        self.assertEqual(KpiService.get_all()['events.status=ongoing'], 0)
+        self.assertEqual(KpiService.reconcile(), {})
+
+    def test_reconcile_command_reports_and_fixes_drift(self):
+        KpiService.reconcile()
+        Event.objects.bulk_create([Event(
+            name='Bulk', description='-', center=self.center, status='published', start_date=timezone.now(),
+            end_date=timezone.now(), registration_start=timezone.now(), registration_end=timezone.now(),
+            max_participants=5,
+        )])
+
+        out = StringIO()
+        call_command('reconcile_kpis', '--check', stdout=out)
+        self.assertIn('events.status=published: counter 0, actual 1', out.getvalue())
+        self.assertEqual(KpiCounter.objects.get(key='events').value, 0)
+
+        call_command('reconcile_kpis', stdout=StringIO())
+        self.assertEqual(KpiCounter.objects.get(key='events').value, 1)
+        out = StringIO()
+        call_command('reconcile_kpis', stdout=out)
+        self.assertIn('All KPI counters match', out.getvalue())
+
+
+class KeysetCursorTest(TestCase):
+    def test_round_trip_and_malformed_cursors(self):
+        joined = timezone.now()
+        self.assertEqual(decode_cursor(encode_cursor(joined, 42)), (joined, 42))
+        for cursor in (None, '', 'not-a-cursor', encode_cursor(joined, 'x')):
+            self.assertIsNone(decode_cursor(cursor))
+
+
+class ActivityServiceTest(TestCase):
+    def setUp(self):
+        now = timezone.now()
+        self.centers = [
+            Center.objects.create(
+                name=f'Center {i}', address='1 Track Rd', city='Pune', phone='123', email=f'c{i}@test.com'
+            )
+            for i in range(2)
+        ]
+        self.head = User.objects.create_user(email='head@test.com', password='password')
+        self.centers[0].center_head = self.head
+        self.centers[0].save()
+        self.events = [
+            Event.objects.create(
+                name=f'Meet {i}', description='-', center=center, status='published',
+                start_date=now + timedelta(days=7), end_date=now + timedelta(days=8),
+                registration_start=now - timedelta(days=1), registration_end=now + timedelta(days=1),
+                max_participants=10,
+            )
+            for i, center in enumerate(self.centers)
+        ]
+
+    def test_changes_are_logged_against_their_center(self):
+        athlete = User.objects.create_user(email='athlete@test.com', password='password')
+        with self.assertNumQueries(1):
+            ActivityService.record(self.events[0], 'updated')
+        registration = RegistrationService.register(self.events[1], athlete)
+
+        entry = ActivityLog.objects.filter(target_type='events.EventRegistration').get()
+        self.assertEqual(
+            (entry.verb, entry.target_id, entry.center_id, entry.actor_id),
+            ('created', registration.pk, self.centers[1].pk, athlete.pk)
+        )
+        self.assertEqual(
+            ActivityLog.objects.filter(target_type='events.Event', target_id=self.events[0].pk).count(), 2
+        )
+        with self.assertRaises(ValueError):
+            entry.save()
+
+    def test_feed_is_scoped_and_paginated(self):
+        for _ in range(3):
+            self.events[0].save()
+        visible = list(ActivityLog.objects.filter(center=self.centers[0]).order_by('-created_at', '-id'))
+        self.assertEqual(len(visible), 4)
+
+        first = ActivityService.feed(self.head, limit=3)
+        self.assertEqual([row['id'] for row in first['entries']], [entry.id for entry in visible[:3]])
+        second = ActivityService.feed(self.head, first['next'], limit=3)
+        self.assertEqual([row['id'] for row in second['entries']], [visible[3].id])
+        self.assertIsNone(second['next'])
+
+        outsider = User.objects.create_user(email='outsider@test.com', password='password')
+        self.assertEqual(ActivityService.feed(outsider)['entries'], [])
+
+        admin = User.objects.create_user(email='admin@test.com', password='password', is_active=True)
+        UserRole.objects.create(user=admin, role=Role.objects.create(
+            code=Role.ADMIN, name='Admin', dashboard_url='admin_portal:dashboard'
+        ))
+        self.client.force_login(admin)
+        response = self.client.get(reverse('core:activity_feed'), {'limit': 50})
+        self.assertEqual(len(response.json()['results']), ActivityLog.objects.count())
+
+    def test_prune_deletes_old_entries_in_batches(self):
+        ActivityLog.objects.update(created_at=timezone.now() - timedelta(days=200))
+        self.events[0].save()
+        old = ActivityLog.objects.count() - 1
+
+        out = StringIO()
+        with self.assertNumQueries(2 * old + 1):
+            call_command('prune_activity', days=180, batch_size=1, stdout=out)
+        self.assertIn(f'Deleted {old} activity entries', out.getvalue())
+        self.assertEqual(ActivityLog.objects.count(), 1)
+
+
+class AdminChangelistQueryTest(TestCase):
+    """
+    Every changelist runs the same number of queries with 1, 100 and
+    10,000 rows: nothing is loaded per row shown, or per row stored.
+    """
+
+    ROW_COUNTS = (1, 100, 10000)
+
+    def setUp(self):
+        from apps.athlete_portal.models import AthletePerson
+        from apps.coach_portal.models import CoachProfile, CompetitionTeam, TrainingSession
+        from apps.core.models import RoleTag
+        from apps.finance_portal.models import Equipment
+        from apps.parent_portal.models import Parent
+        from apps.volunteering.models import VolunteeringOpportunity
+
+        self.serial = 0
+        self.now = timezone.now()
+        self.admin = User.objects.create_superuser(email='admin@test.com', password='password')
+        self.client.force_login(self.admin)
+
+        self.role = Role.objects.create(code=Role.COACH, name='Coach', dashboard_url='coach_portal:dashboard')
+        self.tag = RoleTag.objects.create(code=RoleTag.HEAD_COACH, name='Head Coach', applicable_to_role=self.role)
+        self.center = self.new_centers(1)[0]
+        self.event = self.new_events(1)[0]
+        self.coach = CoachProfile.objects.create(user=self.new_users(1)[0], center=self.center)
+        self.team = CompetitionTeam.objects.create(coach=self.coach, name='Relay', category='U-18')
+        self.session = TrainingSession.objects.create(
+            coach=self.coach, center=self.center, title='Drills', description='-',
+            start_time=self.now, end_time=self.now,
+        )
+        self.athlete = AthletePerson.objects.create(
+            first_name='Asha', last_name='Patil', date_of_birth='2010-01-01', gender='female'
+        )
+        self.parent = Parent.objects.create(user=self.new_users(1)[0])
+        self.equipment = Equipment.objects.create(
+            center=self.center, equipment_type='hurdle', name='Hurdle', equipment_code='EQ-SETUP',
+            purchase_date='2024-01-01', purchase_cost=10,
+        )
+        self.opportunity = VolunteeringOpportunity.objects.create(
+            title='Marshal', description='-', center=self.center, start_date=self.now, end_date=self.now
+        )
+
+    def next_serial(self, count):
+        start = self.serial
+        self.serial += count
+        return range(start, start + count)
+
+    def new_users(self, count):
+        return User.objects.bulk_create([
+            User(email=f'user{i}@test.com', password='!', first_name='User', last_name=str(i))
+            for i in self.next_serial(count)
+        ])
+
+    def athlete_rows(self, count):
+        from apps.athlete_portal.models import AthletePerson
+        return [
+            AthletePerson(first_name='Athlete', last_name=str(i), date_of_birth='2010-01-01', gender='male')
+            for i in self.next_serial(count)
+        ]
+
+    def center_rows(self, count):
+        return [
+            Center(name=f'Center {i}', address='1 Track Rd', city='Pune', phone='123', email=f'c{i}@test.com')
+            for i in self.next_serial(count)
+        ]
+
+    def event_rows(self, count):
+        return [
+            Event(
+                name=f'Meet {i}', description='-', center=self.center, start_date=self.now,
+                end_date=self.now, registration_start=self.now, registration_end=self.now, max_participants=10,
+            )
+            for i in self.next_serial(count)
+        ]
+
+    def new_athletes(self, count):
+        from apps.athlete_portal.models import AthletePerson
+        return AthletePerson.objects.bulk_create(self.athlete_rows(count))
+
+    def new_centers(self, count):
+        return Center.objects.bulk_create(self.center_rows(count))
+
+    def new_events(self, count):
+        return Event.objects.bulk_create(self.event_rows(count))
+
+    def row_builders(self):
+        """Model -> function building `count` new, unsaved rows."""
+        from apps.athlete_portal.models import AthletePerson, AthleteRanking, AthleteScore, EvaluationCertificate
+        from apps.centers.models import CenterFacility
+        from apps.coach_portal.models import (
+            CoachProfile, CompetitionTeam, SessionAttendance, TeamMember, TrainingSession
+        )
+        from apps.core.models import UserRoleTag
+        from apps.events.models import EventRegistration, EventWaitlistEntry
+        from apps.finance_portal.models import (
+            Equipment, EquipmentRequest, EventRevenue, FinancialTransaction
+        )
+        from apps.parent_portal.models import Parent, ParentChildRelation
+        from apps.volunteering.models import VolunteerApplication, VolunteeringOpportunity
+
+        now = self.now
+        return {
+            User: lambda n: [User(email=f'row{i}@test.com', password='!') for i in self.next_serial(n)],
+            UserRole: lambda n: [UserRole(user=user, role=self.role) for user in self.new_users(n)],
+            UserRoleTag: lambda n: [UserRoleTag(user=user, role_tag=self.tag) for user in self.new_users(n)],
+            ActivityLog: lambda n: [
+                ActivityLog(center=self.center, actor=self.admin, verb='created', target_type='events.Event',
+                            target_id=i, summary='-')
+                for i in self.next_serial(n)
+            ],
+            Center: self.center_rows,
+            CenterFacility: lambda n: [
+                CenterFacility(center=center, facility_type='gym', capacity=10) for center in self.new_centers(n)
+            ],
+            CoachProfile: lambda n: [CoachProfile(user=user) for user in self.new_users(n)],
+            TrainingSession: lambda n: [
+                TrainingSession(coach=self.coach, center=self.center, title='Drills', description='-',
+                                start_time=now, end_time=now)
+                for _ in range(n)
+            ],
+            CompetitionTeam: lambda n: [
+                CompetitionTeam(coach=self.coach, name=f'Team {i}', category='U-18') for i in self.next_serial(n)
+            ],
+            TeamMember: lambda n: [TeamMember(team=self.team, athlete=athlete) for athlete in self.new_athletes(n)],
+            SessionAttendance: lambda n: [
+                SessionAttendance(session=self.session, athlete=athlete) for athlete in self.new_athletes(n)
+            ],
+            Parent: lambda n: [Parent(user=user) for user in self.new_users(n)],
+            ParentChildRelation: lambda n: [
+                ParentChildRelation(parent=self.parent, child=athlete) for athlete in self.new_athletes(n)
+            ],
+            AthletePerson: self.athlete_rows,
+            AthleteScore: lambda n: [
+                AthleteScore(athlete=athlete, event=self.event, score=1) for athlete in self.new_athletes(n)
+            ],
+            AthleteRanking: lambda n: [
+                AthleteRanking(athlete=athlete, category='U-18') for athlete in self.new_athletes(n)
+            ],
+            EvaluationCertificate: lambda n: [
+                EvaluationCertificate(athlete=self.athlete, issued_by=self.admin, title='Award', description='-',
+                                      certificate_number=f'CERT-{i}')
+                for i in self.next_serial(n)
+            ],
+            Equipment: lambda n: [
+                Equipment(center=self.center, equipment_type='hurdle', name='Hurdle', equipment_code=f'EQ-{i}',
+                          purchase_date='2024-01-01', purchase_cost=10)
+                for i in self.next_serial(n)
+            ],
+            EquipmentRequest: lambda n: [
+                EquipmentRequest(equipment=self.equipment, requested_by=self.admin, start_date=now,
+                                 end_date=now, purpose='-')
+                for _ in range(n)
+            ],
+            FinancialTransaction: lambda n: [
+                FinancialTransaction(transaction_id=f'TX-{i}', center=self.center, transaction_type='event_fee',
+                                     amount=10, description='-', transaction_date=now)
+                for i in self.next_serial(n)
+            ],
+            EventRevenue: lambda n: [EventRevenue(event=event) for event in self.new_events(n)],
+            Event: self.event_rows,
+            EventRegistration: lambda n: [
+                EventRegistration(event=self.event, participant=user) for user in self.new_users(n)
+            ],
+            EventWaitlistEntry: lambda n: [
+                EventWaitlistEntry(event=self.event, participant=user) for user in self.new_users(n)
+            ],
+            VolunteeringOpportunity: lambda n: [
+                VolunteeringOpportunity(title='Marshal', description='-', center=self.center,
+                                        start_date=now, end_date=now)
+                for _ in range(n)
+            ],
+            VolunteerApplication: lambda n: [
+                VolunteerApplication(opportunity=self.opportunity, volunteer=user) for user in self.new_users(n)
+            ],
+        }
+
+    def changelist_queries(self, model):
+        url = reverse(f'admin:{model._meta.app_label}_{model._meta.model_name}_changelist')
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def test_changelists_run_constant_queries(self):
+        from django.contrib import admin
+
+        builders = self.row_builders()
+        project_models = [model for model in admin.site._registry if model._meta.app_config.name.startswith('apps.')]
+        # Roles, tags and counters are a handful of fixed rows
+        untested = {Role, RoleTag, KpiCounter}
+        self.assertEqual(set(project_models) - untested, set(builders))
 
-# Create your tests here.
+        for model, build in builders.items():
+            with self.subTest(model=model._meta.label), transaction.atomic():
+                counts = []
+                stored = 0
+                for rows in self.ROW_COUNTS:
+                    model.objects.bulk_create(build(rows - stored), batch_size=500)
+                    stored = rows
+                    counts.append(self.changelist_queries(model))
+                self.assertEqual(counts, [counts[0]] * len(counts))
+                transaction.set_rollback(True)
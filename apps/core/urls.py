@@ -8,4 +8,5 @@ urlpatterns = [
     path('examples/admin-only/', views.admin_only_view, name='admin_only'),
     path('examples/admin-center/', views.admin_center_head_view, name='admin_center_head'),
     path('examples/coach/', views.CoachExampleView.as_view(), name='coach_example'),
+    path('activity/', views.activity_feed, name='activity_feed'),
 ]
@@ -1,8 +1,9 @@
 from django.shortcuts import render
-from django.http import HttpResponse
+from django.http import HttpResponse, JsonResponse
 from django.contrib.auth.decorators import login_required
 from django.views.generic import TemplateView
 
+from apps.core.services import ActivityService
 from apps.core.services.permission_service import PermissionService
 from apps.core.models import Role, RoleTag
 from apps.core.decorators.permissions import (
@@ -45,3 +46,19 @@ def admin_center_head_view(request):
 class CoachExampleView(RoleRequiredMixin, TemplateView):
 	required_roles = [Role.COACH]
 	template_name = 'core/permission_examples.html'
+
+
+@login_required
+def activity_feed(request):
+	"""
+	JSON activity feed for the centers the user may see, newest first.
+
+	Admins see every center; center heads and coaches see their own.
+	Query parameters: limit, and before (the 'next' cursor of the previous page).
+	"""
+	try:
+		limit = int(request.GET.get('limit', ActivityService.PAGE_SIZE))
+	except ValueError:
+		limit = ActivityService.PAGE_SIZE
+	page = ActivityService.feed(request.user, request.GET.get('before') or None, limit)
+	return JsonResponse({'results': page['entries'], 'next': page['next']})
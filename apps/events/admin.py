@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Event, EventRegistration
+from .models import Event, EventBibRange, EventRegistration, EventWaitlistEntry
 
 
 class EventRegistrationInline(admin.TabularInline):
@@ -9,13 +9,26 @@ class EventRegistrationInline(admin.TabularInline):
     fields = ('participant', 'registered_at', 'status', 'payment_status')
 
 
+class EventBibRangeInline(admin.TabularInline):
+    model = EventBibRange
+    extra = 0
+    can_delete = False
+    fields = ('category', 'first_number', 'last_number', 'next_number', 'updated_at')
+    readonly_fields = fields
+
+    def has_add_permission(self, request, obj=None):
+        # Ranges are set up in the admin portal, through BibService
+        return False
+
+
 @admin.register(Event)
 class EventAdmin(admin.ModelAdmin):
     list_display = ('name', 'center', 'start_date', 'status', 'current_participants', 'max_participants')
+    list_select_related = ('center',)
     list_filter = ('status', 'start_date', 'center', 'event_type')
     search_fields = ('name', 'description', 'center__name')
     readonly_fields = ('created_at', 'updated_at', 'current_participants')
-    inlines = [EventRegistrationInline]
+    inlines = [EventBibRangeInline, EventRegistrationInline]
     fieldsets = (
         ('Basic Information', {
             'fields': ('name', 'description', 'center', 'event_type')
@@ -38,7 +51,19 @@ class EventAdmin(admin.ModelAdmin):
 
 @admin.register(EventRegistration)
 class EventRegistrationAdmin(admin.ModelAdmin):
-    list_display = ('participant', 'event', 'registered_at', 'status', 'payment_status')
+    list_display = ('participant', 'event', 'bib_number', 'registered_at', 'status', 'payment_status')
+    list_select_related = ('participant', 'event')
+    show_full_result_count = False
     list_filter = ('status', 'payment_status', 'event')
     search_fields = ('participant__first_name', 'event__name')
     readonly_fields = ('registered_at', 'updated_at')
+
+
+@admin.register(EventWaitlistEntry)
+class EventWaitlistEntryAdmin(admin.ModelAdmin):
+    list_display = ('participant', 'event', 'joined_at', 'status', 'promoted_at')
+    list_select_related = ('participant', 'event')
+    show_full_result_count = False
+    list_filter = ('status', 'event')
+    search_fields = ('participant__email', 'event__name')
+    readonly_fields = ('promoted_at',)
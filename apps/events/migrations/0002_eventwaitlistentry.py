@@ -0,0 +1,74 @@
+# Generated by Django 5.2.11 on 2026-10-19 00:31
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("events", "0001_initial"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="EventWaitlistEntry",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("waiting", "Waiting"),
+                            ("promoted", "Promoted"),
+                            ("left", "Left"),
+                        ],
+                        default="waiting",
+                        max_length=20,
+                    ),
+                ),
+                ("joined_at", models.DateTimeField(default=django.utils.timezone.now)),
+                ("promoted_at", models.DateTimeField(blank=True, null=True)),
+                (
+                    "event",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="waitlist_entries",
+                        to="events.event",
+                    ),
+                ),
+                (
+                    "participant",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="event_waitlist_entries",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Event Waitlist Entry",
+                "verbose_name_plural": "Event Waitlist Entries",
+                "db_table": "event_waitlist_entries",
+                "ordering": ["joined_at", "id"],
+                "indexes": [
+                    models.Index(
+                        fields=["event", "status", "joined_at", "id"],
+                        name="event_waitl_event_i_c0fd5f_idx",
+                    )
+                ],
+                "unique_together": {("event", "participant")},
+            },
+        ),
+    ]
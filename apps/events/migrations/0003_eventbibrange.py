@@ -0,0 +1,69 @@
+# Generated by Django 5.2.11 on 2026-10-19 00:39
+
+import django.core.validators
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("events", "0002_eventwaitlistentry"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="EventBibRange",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "category",
+                    models.CharField(
+                        blank=True,
+                        help_text="Registration category; blank covers categories without their own range",
+                        max_length=100,
+                    ),
+                ),
+                (
+                    "first_number",
+                    models.PositiveIntegerField(
+                        validators=[django.core.validators.MinValueValidator(1)]
+                    ),
+                ),
+                (
+                    "last_number",
+                    models.PositiveIntegerField(
+                        validators=[django.core.validators.MinValueValidator(1)]
+                    ),
+                ),
+                (
+                    "next_number",
+                    models.PositiveIntegerField(help_text="Next bib to hand out"),
+                ),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "event",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="bib_ranges",
+                        to="events.event",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Event Bib Range",
+                "verbose_name_plural": "Event Bib Ranges",
+                "db_table": "event_bib_ranges",
+                "ordering": ["first_number"],
+                "unique_together": {("event", "category")},
+            },
+        ),
+    ]
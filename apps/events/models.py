@@ -173,3 +173,82 @@ class EventRegistration(models.Model):
     
     def __str__(self):
         return f"{self.participant.get_full_name()} - {self.event.name}"
+
+
+class EventWaitlistEntry(models.Model):
+    """
+    A place in an event's waitlist, served first come, first served.
+    """
+    STATUS_CHOICES = [
+        ('waiting', 'Waiting'),
+        ('promoted', 'Promoted'),
+        ('left', 'Left'),
+    ]
+    
+    event = models.ForeignKey(
+        Event,
+        on_delete=models.CASCADE,
+        related_name='waitlist_entries'
+    )
+    participant = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='event_waitlist_entries'
+    )
+    status = models.CharField(
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default='waiting'
+    )
+    
+    joined_at = models.DateTimeField(default=timezone.now)
+    promoted_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        db_table = 'event_waitlist_entries'
+        unique_together = ['event', 'participant']
+        ordering = ['joined_at', 'id']
+        verbose_name = 'Event Waitlist Entry'
+        verbose_name_plural = 'Event Waitlist Entries'
+        indexes = [
+            # Serves the head of an event's queue and queue positions
+            models.Index(fields=['event', 'status', 'joined_at', 'id']),
+        ]
+    
+    def __str__(self):
+        return f"{self.participant.get_full_name()} - {self.event.name} ({self.get_status_display()})"
+
+
+class EventBibRange(models.Model):
+    """
+    A block of bib numbers for one of an event's registration categories.
+    next_number is the event's counter for the block and only moves forward.
+    """
+    event = models.ForeignKey(
+        Event,
+        on_delete=models.CASCADE,
+        related_name='bib_ranges'
+    )
+    category = models.CharField(
+        max_length=100,
+        blank=True,
+        help_text="Registration category; blank covers categories without their own range"
+    )
+    first_number = models.PositiveIntegerField(validators=[MinValueValidator(1)])
+    last_number = models.PositiveIntegerField(validators=[MinValueValidator(1)])
+    next_number = models.PositiveIntegerField(help_text="Next bib to hand out")
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        db_table = 'event_bib_ranges'
+        unique_together = ['event', 'category']
+        ordering = ['first_number']
+        verbose_name = 'Event Bib Range'
+        verbose_name_plural = 'Event Bib Ranges'
+    
+    def __str__(self):
+        return f"{self.event.name} {self.category or 'all categories'}: {self.first_number}-{self.last_number}"
+    
+    @property
+    def remaining(self):
+        return self.last_number - self.next_number + 1
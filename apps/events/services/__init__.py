@@ -0,0 +1,7 @@
+"""Services package for events app."""
+from .bib_service import BibService
+from .discovery_service import EventDiscoveryService
+from .registration_service import RegistrationService
+from .waitlist_service import WaitlistService
+
+__all__ = ['BibService', 'EventDiscoveryService', 'RegistrationService', 'WaitlistService']
@@ -0,0 +1,218 @@
+"""
+Bib number allocation for MFU Web Portal.
+Hands out an event's race numbers from per-category ranges and exports start lists.
+"""
+import csv
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import F
+from django.db.models.functions import Length
+from django.utils import timezone
+
+from apps.events.models import Event, EventBibRange, EventRegistration
+
+
+class _Echo:
+    """File-like object whose write returns the CSV line instead of storing it."""
+
+    def write(self, value):
+        return value
+
+
+class BibService:
+    """
+    Service class for event bib numbers.
+
+    Each category of an event draws from its own EventBibRange, and
+    categories without one draw from the event's blank-category range.
+    A range's next_number is its counter: allocation moves it forward by
+    the number of bibs handed out, in the same transaction that writes them,
+    so numbers are never skipped or handed out twice.
+
+    Every allocation starts by updating the event's range rows, which holds
+    their write locks until commit, so concurrent allocations for an event
+    run one after another on every backend. A whole confirmed list is
+    allocated in one transaction with one bulk write; if any category runs
+    out of numbers nothing is allocated.
+    """
+
+    ALLOCATED_STATUSES = ['confirmed']
+    START_LIST_STATUSES = ['confirmed', 'completed']
+    START_LIST_COLUMNS = ['category', 'bib_number', 'first_name', 'last_name', 'team_name']
+    BATCH_SIZE = 500
+
+    @staticmethod
+    def configure_range(event, first_number, last_number, category=''):
+        """
+        Create or resize the bib range for one of an event's categories.
+
+        Once numbers have been handed out from a range, its first number is
+        fixed and it cannot shrink below the last bib allocated.
+
+        Returns:
+            EventBibRange: The saved range
+
+        Raises:
+            ValidationError: If the range is empty, overlaps another range of
+                the event, or would drop allocated numbers
+        """
+        category = category.strip()
+        if first_number < 1 or last_number < first_number:
+            raise ValidationError("The last bib number must not be below the first.", code='invalid')
+
+        with transaction.atomic():
+            # Take the range locks allocations hold, so next_number is read
+            # current; the rows may not exist yet, so also serialize on the event
+            BibService._lock_ranges(event.id)
+            list(Event.objects.select_for_update().filter(pk=event.id).values_list('pk'))
+            ranges = list(EventBibRange.objects.filter(event=event))
+            existing = next((bib_range for bib_range in ranges if bib_range.category == category), None)
+            for other in ranges:
+                if other is not existing and first_number <= other.last_number and other.first_number <= last_number:
+                    raise ValidationError(
+                        f'Bibs {first_number}-{last_number} overlap the '
+                        f'{other.category or "default"} range {other.first_number}-{other.last_number}.',
+                        code='overlap'
+                    )
+
+            if existing is None:
+                return EventBibRange.objects.create(
+                    event=event, category=category, first_number=first_number,
+                    last_number=last_number, next_number=first_number
+                )
+            update_fields = ['first_number', 'last_number', 'updated_at']
+            if existing.next_number > existing.first_number:
+                # A resize never moves the counter of a range in use
+                if first_number != existing.first_number or last_number < existing.next_number - 1:
+                    raise ValidationError(
+                        f'Bibs up to {existing.next_number - 1} are already allocated from this range.',
+                        code='in_use'
+                    )
+            else:
+                existing.next_number = first_number
+                update_fields.append('next_number')
+            existing.first_number = first_number
+            existing.last_number = last_number
+            existing.save(update_fields=update_fields)
+            return existing
+
+    @staticmethod
+    def allocate(registration):
+        """
+        Give one registration a bib, if it has none.
+
+        Returns:
+            str: The registration's bib number
+
+        Raises:
+            ValidationError: If no range covers its category or the range is used up
+        """
+        BibService._allocate(
+            registration.event_id, EventRegistration.objects.filter(pk=registration.pk)
+        )
+        registration.refresh_from_db(fields=['bib_number', 'updated_at'])
+        return registration.bib_number
+
+    @staticmethod
+    def allocate_event(event, statuses=None):
+        """
+        Give every registration of an event without a bib one, in registration order.
+
+        Args:
+            event: Event to allocate for
+            statuses: Registration statuses to cover, defaults to ALLOCATED_STATUSES
+
+        Returns:
+            dict: {category: number of bibs allocated}
+
+        Raises:
+            ValidationError: If a category has no range or not enough numbers left;
+                nothing is allocated
+        """
+        return BibService._allocate(
+            event.id,
+            EventRegistration.objects.filter(
+                event_id=event.id, status__in=statuses or BibService.ALLOCATED_STATUSES
+            )
+        )
+
+    @staticmethod
+    def start_list_rows(event):
+        """
+        Start list of an event's bibbed participants, by category then bib.
+
+        Yields:
+            list: Values for START_LIST_COLUMNS, header row first
+        """
+        yield BibService.START_LIST_COLUMNS
+        rows = EventRegistration.objects.filter(
+            event=event, status__in=BibService.START_LIST_STATUSES
+        ).exclude(bib_number='').order_by(
+            # Shorter numbers first, so numeric bibs sort numerically
+            'category', Length('bib_number'), 'bib_number'
+        ).values_list(
+            'category', 'bib_number', 'participant__first_name', 'participant__last_name', 'team_name'
+        )
+        for row in rows.iterator(chunk_size=2000):
+            yield list(row)
+
+    @staticmethod
+    def start_list_csv(event):
+        """
+        Start list as CSV, one line at a time, for a StreamingHttpResponse.
+
+        Yields:
+            str: CSV lines
+        """
+        writer = csv.writer(_Echo())
+        for row in BibService.start_list_rows(event):
+            yield writer.writerow(row)
+
+    @staticmethod
+    def _allocate(event_id, registrations):
+        with transaction.atomic():
+            BibService._lock_ranges(event_id)
+            ranges = {
+                bib_range.category: bib_range
+                for bib_range in EventBibRange.objects.filter(event_id=event_id)
+            }
+
+            # Read after taking the locks, so a concurrent allocation's bibs are seen
+            pending = list(
+                registrations.filter(bib_number='').order_by('registered_at', 'id').only('id', 'category')
+            )
+            by_range = {}
+            allocated = {}
+            for registration in pending:
+                bib_range = ranges.get(registration.category) or ranges.get('')
+                if bib_range is None:
+                    raise ValidationError(
+                        f'No bib range covers category "{registration.category}".', code='no_range'
+                    )
+                by_range.setdefault(bib_range.category, []).append(registration)
+                allocated[registration.category] = allocated.get(registration.category, 0) + 1
+
+            now = timezone.now()
+            for category, members in by_range.items():
+                bib_range = ranges[category]
+                if len(members) > bib_range.remaining:
+                    raise ValidationError(
+                        f'The {category or "default"} range has {bib_range.remaining} bib(s) left '
+                        f'but {len(members)} are needed.',
+                        code='exhausted'
+                    )
+                EventBibRange.objects.filter(pk=bib_range.pk).update(next_number=F('next_number') + len(members))
+                for offset, registration in enumerate(members):
+                    registration.bib_number = str(bib_range.next_number + offset)
+                    registration.updated_at = now
+
+            EventRegistration.objects.bulk_update(
+                pending, ['bib_number', 'updated_at'], batch_size=BibService.BATCH_SIZE
+            )
+        return allocated
+
+    @staticmethod
+    def _lock_ranges(event_id):
+        """Take the write locks on an event's range rows until the transaction ends."""
+        EventBibRange.objects.filter(event_id=event_id).update(updated_at=timezone.now())
@@ -0,0 +1,165 @@
+"""
+Public event discovery for MFU Web Portal.
+Filtered, keyset-paginated listing of published events.
+"""
+import hashlib
+import json
+from datetime import datetime, time, timedelta
+
+from django.core.cache import cache
+from django.db.models import BooleanField, Case, F, IntegerField, Q, Value, When
+from django.utils import timezone
+
+from apps.core.services import decode_cursor, encode_cursor
+from apps.events.models import Event
+
+
+class EventDiscoveryService:
+    """
+    Service class for the public event listing.
+
+    Only published events are listed, in start date order. Filtering by
+    status and start date or center keeps the (start_date, status) and
+    (center, status) indexes usable. Whether registration is open and how
+    many spots are left are computed in SQL, and pages continue from a
+    keyset cursor on (start_date, id) rather than an OFFSET.
+
+    Pages are cached for CACHE_TIMEOUT seconds under a key built from the
+    normalized filters, so identical searches share one query.
+    """
+
+    EVENT_TYPES = [choice for choice, _ in Event._meta.get_field('event_type').choices]
+    FEES = ['free', 'paid']
+    PAGE_SIZE = 20
+    MAX_PAGE_SIZE = 100
+    CACHE_TIMEOUT = 30  # seconds
+    DATE_FORMAT = '%Y-%m-%d'
+    FIELDS = [
+        'id', 'name', 'event_type', 'start_date', 'end_date', 'registration_start',
+        'registration_end', 'entry_fee', 'max_participants', 'is_featured', 'center_id',
+        'center__name', 'center__city', 'registration_open', 'spots_left',
+    ]
+
+    @staticmethod
+    def clean_filters(params):
+        """
+        Normalize request parameters into filters, dropping invalid values.
+
+        Args:
+            params: QueryDict or dict of request parameters
+
+        Returns:
+            dict: Any of center, city, event_type, date_from, date_to, open, fee
+        """
+        filters = {}
+        center = (params.get('center') or '').strip()
+        if center.isdigit():
+            filters['center'] = int(center)
+        city = (params.get('city') or '').strip()
+        if city:
+            filters['city'] = city[:100]
+        if params.get('event_type') in EventDiscoveryService.EVENT_TYPES:
+            filters['event_type'] = params['event_type']
+        for name in ('date_from', 'date_to'):
+            try:
+                filters[name] = datetime.strptime(
+                    (params.get(name) or '').strip(), EventDiscoveryService.DATE_FORMAT
+                ).date()
+            except ValueError:
+                pass
+        if params.get('open') in ('1', 'true', 'on'):
+            filters['open'] = True
+        if params.get('fee') in EventDiscoveryService.FEES:
+            filters['fee'] = params['fee']
+        return filters
+
+    @staticmethod
+    def cache_key(filters, cursor, limit):
+        encoded = json.dumps(
+            {'filters': filters, 'cursor': cursor, 'limit': limit}, sort_keys=True, default=str
+        ).encode('utf-8')
+        return f'events:discovery:{hashlib.sha256(encoded).hexdigest()}'
+
+    @staticmethod
+    def search(filters, cursor=None, limit=PAGE_SIZE):
+        """
+        One page of published events matching the filters.
+
+        Args:
+            filters: Dict from clean_filters()
+            cursor: Opaque cursor from a previous page's 'next'
+            limit: Page size, capped at MAX_PAGE_SIZE
+
+        Returns:
+            dict: {'events': list of dicts (see FIELDS), 'next': cursor or None}
+        """
+        limit = max(1, min(limit, EventDiscoveryService.MAX_PAGE_SIZE))
+        key = EventDiscoveryService.cache_key(filters, cursor, limit)
+        page = cache.get(key)
+        if page is None:
+            page = EventDiscoveryService._load_page(filters, cursor, limit)
+            cache.set(key, page, EventDiscoveryService.CACHE_TIMEOUT)
+        return page
+
+    @staticmethod
+    def queryset(filters, now=None):
+        """Published events matching the filters, annotated with registration_open and spots_left."""
+        now = now or timezone.now()
+        registration_open = Q(registration_start__lte=now, registration_end__gte=now)
+        events = Event.objects.filter(status='published').annotate(
+            registration_open=Case(
+                When(registration_open, then=Value(True)),
+                default=Value(False),
+                output_field=BooleanField()
+            ),
+            # Unsigned on MySQL, so never subtract past zero
+            spots_left=Case(
+                When(current_participants__gte=F('max_participants'), then=Value(0)),
+                default=F('max_participants') - F('current_participants'),
+                output_field=IntegerField()
+            ),
+        )
+
+        if 'date_from' in filters:
+            events = events.filter(start_date__gte=EventDiscoveryService._day_start(filters['date_from']))
+        else:
+            # Upcoming events only
+            events = events.filter(start_date__gte=now)
+        if 'date_to' in filters:
+            events = events.filter(start_date__lt=EventDiscoveryService._day_start(filters['date_to'], 1))
+        if 'center' in filters:
+            events = events.filter(center_id=filters['center'])
+        if 'city' in filters:
+            events = events.filter(center__city__iexact=filters['city'])
+        if 'event_type' in filters:
+            events = events.filter(event_type=filters['event_type'])
+        if filters.get('open'):
+            events = events.filter(registration_open, current_participants__lt=F('max_participants'))
+        if filters.get('fee') == 'free':
+            events = events.filter(entry_fee=0)
+        elif filters.get('fee') == 'paid':
+            events = events.filter(entry_fee__gt=0)
+        return events
+
+    @staticmethod
+    def _load_page(filters, cursor, limit):
+        events = EventDiscoveryService.queryset(filters)
+        position = decode_cursor(cursor)
+        if position:
+            start_date, event_id = position
+            events = events.filter(
+                Q(start_date__gt=start_date) | Q(start_date=start_date, id__gt=event_id)
+            )
+        rows = list(
+            events.order_by('start_date', 'id').values(*EventDiscoveryService.FIELDS)[:limit + 1]
+        )
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(rows[-1]['start_date'], rows[-1]['id'])
+        return {'events': rows, 'next': next_cursor}
+
+    @staticmethod
+    def _day_start(day, offset_days=0):
+        return timezone.make_aware(datetime.combine(day + timedelta(days=offset_days), time.min))
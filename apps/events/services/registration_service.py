@@ -0,0 +1,170 @@
+"""
+Event registration for MFU Web Portal.
+Reserves and releases event places without overselling.
+"""
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from apps.events.models import Event, EventRegistration
+
+
+class RegistrationService:
+    """
+    Service class for event registrations.
+
+    Event.current_participants is the source of truth for capacity. A place
+    is reserved with a single conditional UPDATE that only matches while the
+    event is published, inside its registration window and below
+    max_participants, so the database decides who gets the last place and
+    concurrent requests cannot oversell. The registration row is written in
+    the same transaction, so a failed insert gives the place back.
+    Cancelling releases the place with the matching decrement, once.
+    """
+
+    # Registration statuses that hold a place
+    ACTIVE_STATUSES = ['pending', 'confirmed', 'completed']
+
+    @staticmethod
+    def register(event, user, **details):
+        """
+        Register a user for an event.
+
+        A previously cancelled registration is reactivated, since there is
+        one registration row per event and participant.
+
+        Args:
+            event: Event instance
+            user: Participant User
+            **details: Optional EventRegistration fields (team_name, category, notes)
+
+        Returns:
+            EventRegistration: The active registration
+
+        Raises:
+            ValidationError: With code 'registered' if the user is already
+                registered, 'closed' if registration is not open, or 'full'
+        """
+        with transaction.atomic():
+            # Write first: the UPDATE locks the event row, so concurrent
+            # registrations for the event queue behind it instead of deadlocking
+            if not RegistrationService.reserve_places(event.pk):
+                raise RegistrationService._refusal(event.pk, user)
+
+            registration = EventRegistration.objects.filter(event=event, participant=user).first()
+            if registration and registration.status in RegistrationService.ACTIVE_STATUSES:
+                # Raising rolls the reservation back
+                raise ValidationError("You are already registered for this event.", code='registered')
+
+            try:
+                with transaction.atomic():
+                    if registration:
+                        registration.status = 'pending'
+                        registration.payment_status = 'pending'
+                        registration.amount_paid = 0
+                        for field, value in details.items():
+                            setattr(registration, field, value)
+                        registration.save()
+                    else:
+                        registration = EventRegistration.objects.create(
+                            event=event, participant=user, **details
+                        )
+            except IntegrityError:
+                # A concurrent request created the same registration row
+                raise ValidationError("You are already registered for this event.", code='registered')
+
+        return registration
+
+    @staticmethod
+    def cancel(registration, promote=True):
+        """
+        Cancel a registration and release its place.
+
+        Cancelling twice releases the place only once. The freed place goes
+        to the head of the event's waitlist in the same transaction.
+
+        Returns:
+            bool: True if the registration was active and is now cancelled
+        """
+        with transaction.atomic():
+            # Lock the event before the registration, in the same order as register()
+            list(Event.objects.select_for_update().filter(pk=registration.event_id).values_list('pk'))
+            cancelled = EventRegistration.objects.filter(
+                pk=registration.pk, status__in=RegistrationService.ACTIVE_STATUSES
+            ).update(status='cancelled', updated_at=timezone.now())
+            if cancelled:
+                RegistrationService.release_places(registration.event_id)
+                if promote:
+                    from .waitlist_service import WaitlistService
+                    WaitlistService.promote(registration.event_id)
+        if cancelled:
+            registration.status = 'cancelled'
+        return bool(cancelled)
+
+    @staticmethod
+    def reserve_places(event_id, count=1, registration_window=True):
+        """
+        Take `count` places on a published event with one conditional UPDATE.
+
+        Args:
+            event_id: Event id
+            count: Number of places
+            registration_window: Only reserve while registration is open
+                (waitlist promotions may fill places after it closes)
+
+        Returns:
+            bool: True if the places were reserved
+        """
+        events = Event.objects.filter(
+            pk=event_id,
+            status='published',
+            current_participants__lte=F('max_participants') - count,
+        )
+        if registration_window:
+            now = timezone.now()
+            events = events.filter(registration_start__lte=now, registration_end__gte=now)
+        return bool(events.update(current_participants=F('current_participants') + count))
+
+    @staticmethod
+    def release_places(event_id, count=1):
+        """Give back `count` places, never going below zero."""
+        return bool(Event.objects.filter(
+            pk=event_id, current_participants__gte=count
+        ).update(current_participants=F('current_participants') - count))
+
+    @staticmethod
+    def recount(events=None):
+        """
+        Reset current_participants from the active registrations.
+
+        Repairs counters after registrations were edited outside this service
+        (e.g. in the Django admin).
+
+        Args:
+            events: Optional Event queryset, defaults to every event
+
+        Returns:
+            int: Number of events updated
+        """
+        active_count = EventRegistration.objects.filter(
+            event=OuterRef('pk'), status__in=RegistrationService.ACTIVE_STATUSES
+        ).values('event').annotate(total=Count('id')).values('total')
+        events = Event.objects.all() if events is None else events
+        return events.exclude(
+            current_participants=Coalesce(Subquery(active_count), Value(0))
+        ).update(current_participants=Coalesce(Subquery(active_count), Value(0)))
+
+    @staticmethod
+    def _refusal(event_id, user):
+        if EventRegistration.objects.filter(
+            event_id=event_id, participant=user, status__in=RegistrationService.ACTIVE_STATUSES
+        ).exists():
+            return ValidationError("You are already registered for this event.", code='registered')
+        event = Event.objects.filter(pk=event_id).only(
+            'status', 'registration_start', 'registration_end', 'current_participants', 'max_participants'
+        ).first()
+        if event is None or event.status != 'published' or not event.is_registration_open():
+            return ValidationError("Registration for this event is not open.", code='closed')
+        return ValidationError("This event is full.", code='full')
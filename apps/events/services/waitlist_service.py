@@ -0,0 +1,167 @@
+"""
+Event waitlists for MFU Web Portal.
+Queues participants for full events and promotes them as places free up.
+"""
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.mail import EmailMessage, get_connection
+from django.db import connection, transaction
+from django.db.models import Exists, OuterRef
+from django.template.loader import render_to_string
+from django.utils import timezone
+
+from apps.core.services import ActivityService
+from apps.events.models import Event, EventRegistration, EventWaitlistEntry
+from .registration_service import RegistrationService
+
+
+class WaitlistService:
+    """
+    Service class for event waitlists.
+
+    Each event's queue is ordered by joined_at and read through the
+    (event, status, joined_at, id) index, so promotion only touches the
+    head of the queue: it reads as many waiting entries as there are free
+    places, no matter how long the queue is. Promoted entries take their
+    places with one conditional UPDATE, get their registrations in one
+    bulk write, and are emailed together after the transaction commits.
+
+    On backends with SELECT ... FOR UPDATE SKIP LOCKED (MySQL 8, PostgreSQL)
+    concurrent promotions skip each other's entries instead of waiting. SQLite
+    has no row locks; there, the place reservation serializes promotions.
+    """
+
+    @staticmethod
+    def join(event, user):
+        """
+        Add a user to the end of an event's waitlist.
+
+        Returns:
+            EventWaitlistEntry: The waiting entry
+
+        Raises:
+            ValidationError: If the user is already registered or waiting
+        """
+        if EventRegistration.objects.filter(
+            event=event, participant=user, status__in=RegistrationService.ACTIVE_STATUSES
+        ).exists():
+            raise ValidationError("You are already registered for this event.")
+
+        entry, created = EventWaitlistEntry.objects.get_or_create(event=event, participant=user)
+        if not created:
+            if entry.status == 'waiting':
+                raise ValidationError("You are already on the waitlist for this event.")
+            # Rejoining goes to the back of the queue
+            entry.status = 'waiting'
+            entry.joined_at = timezone.now()
+            entry.promoted_at = None
+            entry.save(update_fields=['status', 'joined_at', 'promoted_at'])
+        return entry
+
+    @staticmethod
+    def leave(entry):
+        """Take a waiting entry off the waitlist."""
+        return bool(EventWaitlistEntry.objects.filter(pk=entry.pk, status='waiting').update(status='left'))
+
+    @staticmethod
+    def position(entry):
+        """1-based place in the queue, or None if the entry is not waiting."""
+        if entry.status != 'waiting':
+            return None
+        return EventWaitlistEntry.objects.filter(
+            event_id=entry.event_id, status='waiting', joined_at__lt=entry.joined_at
+        ).count() + EventWaitlistEntry.objects.filter(
+            event_id=entry.event_id, status='waiting', joined_at=entry.joined_at, id__lte=entry.id
+        ).count()
+
+    @staticmethod
+    def promote(event_id, notify=True):
+        """
+        Register waiting participants for every free place, first come first served.
+
+        Args:
+            event_id: Event id
+            notify: Email promoted participants
+
+        Returns:
+            list: Promoted EventWaitlistEntry instances
+        """
+        with transaction.atomic():
+            event = Event.objects.filter(pk=event_id, status='published').only(
+                'name', 'center', 'max_participants', 'current_participants'
+            ).first()
+            if event is None:
+                return []
+            free = event.max_participants - event.current_participants
+            if free <= 0:
+                return []
+
+            already_registered = EventRegistration.objects.filter(
+                event_id=event_id,
+                participant_id=OuterRef('participant_id'),
+                status__in=RegistrationService.ACTIVE_STATUSES
+            )
+            head = EventWaitlistEntry.objects.filter(
+                event_id=event_id, status='waiting'
+            ).exclude(Exists(already_registered)).select_related('participant').order_by('joined_at', 'id')
+            if connection.features.has_select_for_update_skip_locked:
+                head = head.select_for_update(skip_locked=True, of=('self',))
+            entries = list(head[:free])
+
+            # Places may have been taken since they were counted; promote fewer
+            while entries and not RegistrationService.reserve_places(
+                event_id, len(entries), registration_window=False
+            ):
+                entries.pop()
+            if not entries:
+                return []
+
+            now = timezone.now()
+            EventWaitlistEntry.objects.filter(pk__in=[entry.pk for entry in entries]).update(
+                status='promoted', promoted_at=now
+            )
+            user_ids = [entry.participant_id for entry in entries]
+            reactivated = set(EventRegistration.objects.filter(
+                event_id=event_id, participant_id__in=user_ids
+            ).values_list('participant_id', flat=True))
+            if reactivated:
+                EventRegistration.objects.filter(
+                    event_id=event_id, participant_id__in=reactivated
+                ).update(status='pending', payment_status='pending', amount_paid=0, updated_at=now)
+            EventRegistration.objects.bulk_create([
+                EventRegistration(event_id=event_id, participant_id=user_id)
+                for user_id in user_ids if user_id not in reactivated
+            ])
+
+            ActivityService.record_batch(event, f'{len(entries)} promoted from the waitlist')
+
+            for entry in entries:
+                entry.status = 'promoted'
+                entry.promoted_at = now
+            if notify:
+                WaitlistService.queue_notifications(event, entries)
+        return entries
+
+    @staticmethod
+    def queue_notifications(event, entries):
+        """
+        Email promoted participants over one connection once the transaction commits.
+
+        The send is robust: a mail server failure is logged and never fails
+        the cancellation or capacity change that promoted them.
+        """
+        messages = [
+            EmailMessage(
+                subject=f'You have a place at {event.name} - MFU Web Portal',
+                body=render_to_string('events/emails/waitlist_promoted.txt', {
+                    'participant': entry.participant,
+                    'event': event,
+                }),
+                from_email=settings.DEFAULT_FROM_EMAIL,
+                to=[entry.participant.email],
+            )
+            for entry in entries if entry.participant.email
+        ]
+        if messages:
+            transaction.on_commit(lambda: get_connection().send_messages(messages), robust=True)
+        return len(messages)
@@ -1,3 +1,377 @@
-from django.test import TestCase
+import threading
+from datetime import timedelta
 
-# Create your tests here.
+from django.core import mail
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.mail.backends.base import BaseEmailBackend
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from apps.centers.models import Center
+from apps.core.models import Role, User, UserRole
+from apps.events.models import Event, EventBibRange, EventRegistration, EventWaitlistEntry
+from apps.events.services import BibService, EventDiscoveryService, RegistrationService, WaitlistService
+
+
+def create_event(max_participants=2, **fields):
+    center = Center.objects.create(
+        name='Test Center', address='1 Track Rd', city='Pune', phone='123', email='center@test.com'
+    )
+    now = timezone.now()
+    return Event.objects.create(
+        name='City Meet', description='-', center=center, status='published',
+        start_date=now + timedelta(days=7), end_date=now + timedelta(days=8),
+        registration_start=now - timedelta(days=1), registration_end=now + timedelta(days=1),
+        max_participants=max_participants, **fields
+    )
+
+
+class RegistrationServiceTest(TestCase):
+    def setUp(self):
+        self.event = create_event()
+        self.users = [User.objects.create_user(email=f'u{i}@test.com', password='password') for i in range(3)]
+
+    def test_register_until_full(self):
+        RegistrationService.register(self.event, self.users[0])
+        RegistrationService.register(self.event, self.users[1])
+        with self.assertRaisesMessage(ValidationError, 'full'):
+            RegistrationService.register(self.event, self.users[2])
+
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.current_participants, 2)
+        self.assertEqual(EventRegistration.objects.count(), 2)
+
+    def test_duplicate_and_closed_registrations_are_refused(self):
+        RegistrationService.register(self.event, self.users[0])
+        with self.assertRaisesMessage(ValidationError, 'already registered'):
+            RegistrationService.register(self.event, self.users[0])
+
+        Event.objects.filter(pk=self.event.pk).update(registration_end=timezone.now() - timedelta(hours=1))
+        with self.assertRaisesMessage(ValidationError, 'not open'):
+            RegistrationService.register(self.event, self.users[1])
+
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.current_participants, 1)
+
+    def test_cancel_releases_place_once(self):
+        registration = RegistrationService.register(self.event, self.users[0])
+        self.assertTrue(RegistrationService.cancel(registration))
+        self.assertFalse(RegistrationService.cancel(registration))
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.current_participants, 0)
+
+        # Re-registering reuses the cancelled row
+        again = RegistrationService.register(self.event, self.users[0])
+        self.assertEqual((again.pk, again.status), (registration.pk, 'pending'))
+
+    def test_recount_repairs_counter(self):
+        RegistrationService.register(self.event, self.users[0])
+        Event.objects.filter(pk=self.event.pk).update(current_participants=5)
+        self.assertEqual(RegistrationService.recount(), 1)
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.current_participants, 1)
+
+
+class FailingEmailBackend(BaseEmailBackend):
+    def send_messages(self, email_messages):
+        raise ConnectionRefusedError('Mail server unavailable')
+
+
+class WaitlistServiceTest(TestCase):
+    def setUp(self):
+        self.event = create_event(max_participants=2)
+        self.users = [
+            User.objects.create_user(email=f'w{i}@test.com', password='password', is_active=True)
+            for i in range(6)
+        ]
+        self.registrations = [RegistrationService.register(self.event, user) for user in self.users[:2]]
+        self.entries = [WaitlistService.join(self.event, user) for user in self.users[2:5]]
+
+    def test_cancellation_promotes_head_of_queue(self):
+        self.assertEqual([WaitlistService.position(entry) for entry in self.entries], [1, 2, 3])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            RegistrationService.cancel(self.registrations[0])
+
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.current_participants, 2)
+        self.assertTrue(EventRegistration.objects.filter(
+            event=self.event, participant=self.users[2], status='pending'
+        ).exists())
+        self.assertEqual(
+            list(EventWaitlistEntry.objects.filter(status='waiting').values_list('participant', flat=True)),
+            [self.users[3].id, self.users[4].id]
+        )
+        self.assertEqual([message.to for message in mail.outbox], [['w2@test.com']])
+
+    @override_settings(EMAIL_BACKEND='apps.events.tests.FailingEmailBackend')
+    def test_mail_failure_does_not_fail_cancellation(self):
+        with self.assertLogs(level='ERROR'), self.captureOnCommitCallbacks(execute=True):
+            RegistrationService.cancel(self.registrations[0])
+        self.assertTrue(EventRegistration.objects.filter(
+            event=self.event, participant=self.users[2], status='pending'
+        ).exists())
+
+    def test_capacity_increase_promotes_several_in_one_batch(self):
+        Event.objects.filter(pk=self.event.pk).update(max_participants=4)
+        with self.captureOnCommitCallbacks(execute=True):
+            promoted = WaitlistService.promote(self.event.pk)
+        self.assertEqual([entry.participant_id for entry in promoted], [self.users[2].id, self.users[3].id])
+        self.assertEqual(len(mail.outbox), 2)
+
+        # A cancelled registration is reactivated for its participant
+        registration = EventRegistration.objects.get(participant=self.users[2])
+        RegistrationService.cancel(registration, promote=False)
+        entry = WaitlistService.join(self.event, self.users[2])
+        self.assertEqual(WaitlistService.position(entry), 2)
+        WaitlistService.promote(self.event.pk, notify=False)
+        self.assertEqual(EventRegistration.objects.filter(event=self.event, status='pending').count(), 4)
+
+    def test_promotion_reads_only_the_head(self):
+        WaitlistService.leave(self.entries[0])
+        EventWaitlistEntry.objects.bulk_create([
+            EventWaitlistEntry(event=self.event, participant=User.objects.create(email=f'q{i}@test.com'))
+            for i in range(200)
+        ])
+        with CaptureQueriesContext(connection) as queries:
+            RegistrationService.cancel(self.registrations[1])
+        self.assertLess(len(queries), 15)
+        self.assertEqual(EventWaitlistEntry.objects.filter(status='promoted').get().participant, self.users[3])
+
+    def test_full_event_puts_athlete_on_waitlist(self):
+        role = Role.objects.create(code=Role.ATHLETE, name='Athlete', dashboard_url='athlete_portal:dashboard')
+        UserRole.objects.create(user=self.users[5], role=role)
+        self.client.force_login(self.users[5])
+
+        response = self.client.post(
+            reverse('athlete_portal:event_register', args=[self.event.id]), follow=True
+        )
+        self.assertContains(response, 'number 4 on the waitlist')
+        self.assertEqual(response.context['waitlist_entries'][0].position, 4)
+
+        entry = response.context['waitlist_entries'][0]
+        self.client.post(reverse('athlete_portal:event_waitlist_leave', args=[entry.id]))
+        self.assertEqual(EventWaitlistEntry.objects.get(pk=entry.pk).status, 'left')
+
+
+class EventDiscoveryTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.event = create_event(max_participants=1, entry_fee=0)
+        self.center = self.event.center
+        now = timezone.now()
+        other = Center.objects.create(
+            name='Hill Center', address='2 Hill Rd', city='Nashik', phone='456', email='hill@test.com'
+        )
+        self.later = [
+            Event.objects.create(
+                name=f'Tournament {i}', description='-', center=other, status='published',
+                event_type='tournament', start_date=now + timedelta(days=10 + i),
+                end_date=now + timedelta(days=11 + i), registration_start=now + timedelta(days=2),
+                registration_end=now + timedelta(days=5), max_participants=10, entry_fee=250,
+            )
+            for i in range(3)
+        ]
+        Event.objects.create(
+            name='Draft', description='-', center=other, start_date=now + timedelta(days=3),
+            end_date=now + timedelta(days=4), registration_start=now, registration_end=now,
+            max_participants=10,
+        )
+
+    def test_filters(self):
+        def names(**params):
+            filters = EventDiscoveryService.clean_filters(params)
+            return [event['name'] for event in EventDiscoveryService.search(filters)['events']]
+
+        self.assertEqual(names(), ['City Meet', 'Tournament 0', 'Tournament 1', 'Tournament 2'])
+        self.assertEqual(names(city='pune'), ['City Meet'])
+        self.assertEqual(names(center=str(self.center.id), event_type='tournament'), [])
+        self.assertEqual(names(fee='paid', date_to=self.later[1].start_date.strftime('%Y-%m-%d')),
+                         ['Tournament 0', 'Tournament 1'])
+        self.assertEqual(names(open='1'), ['City Meet'])
+
+        RegistrationService.register(self.event, User.objects.create_user(email='d@test.com', password='p'))
+        cache.clear()
+        self.assertEqual(names(open='1'), [])
+        event = EventDiscoveryService.search({})['events'][0]
+        self.assertEqual((event['registration_open'], event['spots_left']), (True, 0))
+
+    def test_api_pages_with_cursor(self):
+        url = reverse('events:discover_api')
+        first = self.client.get(url, {'limit': 3}).json()
+        self.assertEqual(len(first['results']), 3)
+        with self.assertNumQueries(1):
+            second = self.client.get(url, {'limit': 3, 'after': first['next']}).json()
+        self.assertEqual([event['name'] for event in second['results']], ['Tournament 2'])
+        self.assertIsNone(second['next'])
+
+        # Repeat searches come from the cache
+        with self.assertNumQueries(0):
+            self.client.get(url, {'limit': 3, 'after': first['next']})
+
+    def test_page_renders_and_caches_results(self):
+        response = self.client.get(reverse('events:discover'), {'event_type': 'tournament'})
+        self.assertContains(response, 'Tournament 2')
+        self.assertNotContains(response, 'City Meet')
+        self.assertContains(response, 'Closed')
+
+        Event.objects.filter(pk=self.later[0].pk).update(name='Renamed')
+        response = self.client.get(reverse('events:discover'), {'event_type': 'tournament'})
+        self.assertContains(response, 'Tournament 0')
+
+
+class BibServiceTest(TestCase):
+    def setUp(self):
+        self.event = create_event(max_participants=10)
+        self.registrations = [
+            EventRegistration.objects.create(
+                event=self.event, status='confirmed', category=category,
+                participant=User.objects.create_user(email=f'b{i}@test.com', password='p', first_name=f'B{i}'),
+            )
+            for i, category in enumerate(['U-14', 'U-16', 'U-14', 'Open', 'U-14'])
+        ]
+        BibService.configure_range(self.event, 9, 11, 'U-14')
+        BibService.configure_range(self.event, 100, 199)
+
+    def test_allocate_event_by_category(self):
+        with self.assertNumQueries(8):
+            allocated = BibService.allocate_event(self.event)
+        self.assertEqual(allocated, {'U-14': 3, 'U-16': 1, 'Open': 1})
+        bibs = dict(EventRegistration.objects.values_list('id', 'bib_number'))
+        self.assertEqual(
+            [bibs[registration.id] for registration in self.registrations], ['9', '100', '10', '101', '11']
+        )
+
+        # Already-bibbed registrations keep their numbers
+        self.assertEqual(BibService.allocate_event(self.event), {})
+        late = EventRegistration.objects.create(
+            event=self.event, participant=User.objects.create(email='late@test.com'), category='U-16'
+        )
+        self.assertEqual(BibService.allocate(late), '102')
+
+        csv_lines = list(BibService.start_list_csv(self.event))
+        self.assertEqual(csv_lines[0], 'category,bib_number,first_name,last_name,team_name\r\n')
+        self.assertEqual([line.split(',')[1] for line in csv_lines[1:]], ['101', '9', '10', '11', '100'])
+
+    def test_exhausted_range_allocates_nothing(self):
+        self.registrations[3].category = 'U-14'
+        self.registrations[3].save()
+        with self.assertRaisesMessage(ValidationError, '3 bib(s) left but 4 are needed'):
+            BibService.allocate_event(self.event)
+        self.assertFalse(EventRegistration.objects.exclude(bib_number='').exists())
+        self.assertEqual(EventBibRange.objects.get(category='U-14').next_number, 9)
+
+    def test_range_rules(self):
+        with self.assertRaisesMessage(ValidationError, 'overlap'):
+            BibService.configure_range(self.event, 150, 250, 'U-16')
+        BibService.allocate_event(self.event)
+        with self.assertRaisesMessage(ValidationError, 'already allocated'):
+            BibService.configure_range(self.event, 9, 10, 'U-14')
+        self.assertEqual(BibService.configure_range(self.event, 9, 20, 'U-14').remaining, 9)
+
+
+class RegistrationConcurrencyTest(TransactionTestCase):
+    REQUESTS = 500
+    PLACES = 50
+
+    def test_simultaneous_registrations_do_not_oversell(self):
+        event = create_event(max_participants=self.PLACES)
+        User.objects.bulk_create([
+            User(email=f'rush{i}@test.com', password='!') for i in range(self.REQUESTS)
+        ])
+        users = list(User.objects.filter(email__startswith='rush'))
+        barrier = threading.Barrier(self.REQUESTS)
+        outcomes = []
+
+        def register(user):
+            barrier.wait()
+            try:
+                RegistrationService.register(event, user)
+                outcomes.append('registered')
+            except ValidationError:
+                outcomes.append('refused')
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=register, args=(user,)) for user in users]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        event.refresh_from_db()
+        self.assertEqual(outcomes.count('registered'), self.PLACES)
+        self.assertEqual(outcomes.count('refused'), self.REQUESTS - self.PLACES)
+        self.assertEqual(event.current_participants, self.PLACES)
+        self.assertEqual(EventRegistration.objects.filter(event=event).count(), self.PLACES)
+
+    def test_simultaneous_bib_allocations_do_not_collide(self):
+        event = create_event(max_participants=self.PLACES)
+        BibService.configure_range(event, 1, self.PLACES)
+        User.objects.bulk_create([User(email=f'bib{i}@test.com', password='!') for i in range(self.PLACES)])
+        EventRegistration.objects.bulk_create([
+            EventRegistration(event=event, participant=user, status='confirmed')
+            for user in User.objects.filter(email__startswith='bib')
+        ])
+        registrations = list(EventRegistration.objects.filter(event=event))
+        barrier = threading.Barrier(len(registrations))
+
+        def allocate(registration):
+            barrier.wait()
+            try:
+                BibService.allocate(registration)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=allocate, args=(registration,)) for registration in registrations]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        bibs = sorted(int(bib) for bib in EventRegistration.objects.filter(event=event).values_list('bib_number', flat=True))
+        self.assertEqual(bibs, list(range(1, self.PLACES + 1)))
+
+    def test_resizing_a_range_during_allocation_keeps_bibs_unique(self):
+        event = create_event(max_participants=self.PLACES)
+        BibService.configure_range(event, 1, self.PLACES)
+        User.objects.bulk_create([User(email=f'bib{i}@test.com', password='!') for i in range(self.PLACES)])
+        EventRegistration.objects.bulk_create([
+            EventRegistration(event=event, participant=user, status='confirmed')
+            for user in User.objects.filter(email__startswith='bib')
+        ])
+        registrations = list(EventRegistration.objects.filter(event=event).order_by('id'))
+        # Numbers are already in use, so resizes must leave next_number alone
+        BibService.allocate(registrations.pop())
+        barrier = threading.Barrier(len(registrations) + 1)
+
+        def allocate(registration):
+            barrier.wait()
+            try:
+                BibService.allocate(registration)
+            finally:
+                connection.close()
+
+        def resize():
+            barrier.wait()
+            try:
+                for last_number in range(self.PLACES + 1, self.PLACES + 11):
+                    BibService.configure_range(event, 1, last_number)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=allocate, args=(registration,)) for registration in registrations]
+        threads.append(threading.Thread(target=resize))
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        bibs = sorted(int(bib) for bib in EventRegistration.objects.filter(event=event).values_list('bib_number', flat=True))
+        self.assertEqual(bibs, list(range(1, self.PLACES + 1)))
+        bib_range = EventBibRange.objects.get(event=event)
+        self.assertEqual((bib_range.next_number, bib_range.last_number), (self.PLACES + 1, self.PLACES + 10))
@@ -0,0 +1,9 @@
+from django.urls import path
+from . import views
+
+app_name = 'events'
+
+urlpatterns = [
+    path('', views.discover, name='discover'),
+    path('api/', views.discover_api, name='discover_api'),
+]
@@ -1,3 +1,51 @@
+from django.http import JsonResponse
 from django.shortcuts import render
+from django.utils.functional import SimpleLazyObject
+from django.views.decorators.http import require_GET
 
-# Create your views here.
+from apps.centers.models import Center
+from .models import Event
+from .services import EventDiscoveryService
+
+
+@require_GET
+def discover(request):
+    """
+    Public listing of published events.
+    Accessible to: everyone.
+    """
+    filters = EventDiscoveryService.clean_filters(request.GET)
+    cursor = request.GET.get('after') or None
+    query = request.GET.copy()
+    query.pop('after', None)
+
+    context = {
+        'filters': filters,
+        # Loaded only when the results fragment is not cached
+        'page': SimpleLazyObject(lambda: EventDiscoveryService.search(filters, cursor)),
+        'fragment_key': EventDiscoveryService.cache_key(filters, cursor, EventDiscoveryService.PAGE_SIZE),
+        'fragment_timeout': EventDiscoveryService.CACHE_TIMEOUT,
+        'query': query.urlencode(),
+        'centers': Center.objects.filter(is_active=True).order_by('name').values('id', 'name'),
+        'event_types': Event._meta.get_field('event_type').choices,
+        'paged': bool(cursor),
+    }
+    return render(request, 'events/discover.html', context)
+
+
+@require_GET
+def discover_api(request):
+    """
+    JSON listing of published events, filtered like the discovery page.
+
+    Query parameters: center, city, event_type, date_from, date_to
+    (YYYY-MM-DD), open (1), fee (free/paid), limit, and after (the 'next'
+    cursor of the previous page).
+    """
+    filters = EventDiscoveryService.clean_filters(request.GET)
+    try:
+        limit = int(request.GET.get('limit', EventDiscoveryService.PAGE_SIZE))
+    except ValueError:
+        limit = EventDiscoveryService.PAGE_SIZE
+    page = EventDiscoveryService.search(filters, request.GET.get('after') or None, limit)
+    return JsonResponse({'results': page['events'], 'next': page['next']})
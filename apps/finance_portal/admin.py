@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Equipment, EquipmentRequest, FinancialTransaction
+from .models import Equipment, EquipmentRequest, EventRevenue, FinancialTransaction
 
 
 class EquipmentRequestInline(admin.TabularInline):
@@ -12,6 +12,7 @@ class EquipmentRequestInline(admin.TabularInline):
 @admin.register(Equipment)
 class EquipmentAdmin(admin.ModelAdmin):
     list_display = ('equipment_code', 'name', 'condition', 'status', 'center')
+    list_select_related = ('center',)
     list_filter = ('condition', 'status', 'center')
     search_fields = ('equipment_code', 'name', 'center__name')
     inlines = [EquipmentRequestInline]
@@ -38,6 +39,7 @@ class EquipmentAdmin(admin.ModelAdmin):
 @admin.register(EquipmentRequest)
 class EquipmentRequestAdmin(admin.ModelAdmin):
     list_display = ('equipment', 'request_date', 'request_type', 'status')
+    list_select_related = ('equipment', 'requested_by')
     list_filter = ('request_type', 'status')
     search_fields = ('equipment__name', 'requested_by__first_name')
     readonly_fields = ('request_date',)
@@ -47,19 +49,32 @@ class EquipmentRequestAdmin(admin.ModelAdmin):
 class FinancialTransactionAdmin(admin.ModelAdmin):
     list_display = ('transaction_id', 'amount', 'transaction_type', 'transaction_date', 'status')
     list_filter = ('transaction_type', 'status', 'transaction_date', 'payment_method')
+    show_full_result_count = False
     search_fields = ('transaction_id', 'description')
-    readonly_fields = ('transaction_id', 'transaction_date')
+    readonly_fields = ('transaction_id', 'transaction_date', 'registration', 'idempotency_key')
     fieldsets = (
         ('Basic Information', {
             'fields': ('transaction_id', 'transaction_type', 'amount', 'transaction_date', 'center')
         }),
         ('Details', {
-            'fields': ('description', 'event', 'payee')
+            'fields': ('description', 'event', 'registration', 'payee')
         }),
         ('Payment Information', {
-            'fields': ('payment_method', 'payer')
+            'fields': ('payment_method', 'payer', 'idempotency_key')
         }),
         ('Status', {
             'fields': ('status', 'recorded_by')
         }),
     )
+
+
+@admin.register(EventRevenue)
+class EventRevenueAdmin(admin.ModelAdmin):
+    list_display = ('event', 'collected', 'refunded', 'payments', 'refunds', 'updated_at')
+    list_select_related = ('event',)
+    search_fields = ('event__name',)
+    readonly_fields = ('event', 'collected', 'refunded', 'payments', 'refunds', 'updated_at')
+
+    def has_add_permission(self, request):
+        # Totals are kept by RegistrationPaymentService
+        return False
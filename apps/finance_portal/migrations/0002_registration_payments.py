@@ -0,0 +1,83 @@
+# Generated by Django 5.2.11 on 2026-10-19 00:41
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("events", "0003_eventbibrange"),
+        ("finance_portal", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="EventRevenue",
+            fields=[
+                (
+                    "event",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="revenue",
+                        serialize=False,
+                        to="events.event",
+                    ),
+                ),
+                (
+                    "collected",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=12),
+                ),
+                (
+                    "refunded",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=12),
+                ),
+                ("payments", models.PositiveIntegerField(default=0)),
+                ("refunds", models.PositiveIntegerField(default=0)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "verbose_name": "Event Revenue",
+                "verbose_name_plural": "Event Revenue",
+                "db_table": "event_revenue",
+            },
+        ),
+        migrations.AddField(
+            model_name="financialtransaction",
+            name="idempotency_key",
+            field=models.CharField(
+                blank=True,
+                help_text="Payment reference that created this transaction; a repeated payment with it is ignored",
+                max_length=100,
+                null=True,
+                unique=True,
+            ),
+        ),
+        migrations.AddField(
+            model_name="financialtransaction",
+            name="registration",
+            field=models.ForeignKey(
+                blank=True,
+                help_text="Event registration this fee was paid for",
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="financial_transactions",
+                to="events.eventregistration",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="financialtransaction",
+            name="status",
+            field=models.CharField(
+                choices=[
+                    ("pending", "Pending"),
+                    ("completed", "Completed"),
+                    ("cancelled", "Cancelled"),
+                    ("refunded", "Refunded"),
+                ],
+                default="pending",
+                max_length=20,
+            ),
+        ),
+    ]
@@ -7,7 +7,7 @@ from django.core.validators import MinValueValidator
 from django.utils import timezone
 from apps.core.models import User
 from apps.centers.models import Center
-from apps.events.models import Event
+from apps.events.models import Event, EventRegistration
 
 
 class Equipment(models.Model):
@@ -193,6 +193,7 @@ class FinancialTransaction(models.Model):
         ('pending', 'Pending'),
         ('completed', 'Completed'),
         ('cancelled', 'Cancelled'),
+        ('refunded', 'Refunded'),
     ]
     
     transaction_id = models.CharField(
@@ -234,6 +235,21 @@ class FinancialTransaction(models.Model):
         blank=True,
         related_name='financial_transactions'
     )
+    registration = models.ForeignKey(
+        EventRegistration,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='financial_transactions',
+        help_text="Event registration this fee was paid for"
+    )
+    idempotency_key = models.CharField(
+        max_length=100,
+        unique=True,
+        null=True,
+        blank=True,
+        help_text="Payment reference that created this transaction; a repeated payment with it is ignored"
+    )
     
     # For expense transactions
     payee = models.CharField(max_length=255, blank=True, help_text="Who/what was paid")
@@ -281,3 +297,33 @@ class FinancialTransaction(models.Model):
     
     def __str__(self):
         return f"{self.transaction_id} - {self.get_transaction_type_display()}: {self.amount}"
+
+
+class EventRevenue(models.Model):
+    """
+    Running totals of an event's registration fees.
+    Kept up to date as payments and refunds are recorded, so reports never sum transactions.
+    """
+    event = models.OneToOneField(
+        Event,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='revenue'
+    )
+    collected = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    refunded = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    payments = models.PositiveIntegerField(default=0)
+    refunds = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        db_table = 'event_revenue'
+        verbose_name = 'Event Revenue'
+        verbose_name_plural = 'Event Revenue'
+    
+    def __str__(self):
+        return f"{self.event.name}: {self.collected} collected, {self.refunded} refunded"
+    
+    @property
+    def net(self):
+        return self.collected - self.refunded
@@ -0,0 +1,4 @@
+"""Services package for finance portal app."""
+from .registration_payment_service import RegistrationPaymentService
+
+__all__ = ['RegistrationPaymentService']
@@ -0,0 +1,212 @@
+"""
+Event registration payments for MFU Web Portal.
+Records registration fees as financial transactions and keeps per-event revenue totals.
+"""
+import uuid
+from decimal import Decimal
+
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Q, Sum
+from django.utils import timezone
+
+from apps.events.models import EventRegistration
+from apps.finance_portal.models import EventRevenue, FinancialTransaction
+
+
+class RegistrationPaymentService:
+    """
+    Service class for registration fee payments.
+
+    Completing a payment updates the registration and creates, or completes
+    the pending, event_fee FinancialTransaction for it in one transaction.
+    Payment references are stored as idempotency keys: a payment repeated
+    with the same key (a retried gateway callback, a double-submitted form)
+    returns the first transaction and changes nothing.
+
+    Each event's EventRevenue row is moved by the amount of every payment and
+    refund, with one UPDATE, so revenue can be shown without summing
+    transactions. Expected revenue is the entry fee times the event's
+    participant counter. recompute() rebuilds the totals from transactions.
+    """
+
+    @staticmethod
+    def complete_payment(registration, amount=None, payment_method='online',
+                         idempotency_key=None, recorded_by=None):
+        """
+        Record a registration's fee as paid.
+
+        A pending registration is confirmed. Completing an already paid
+        registration returns its transaction unchanged.
+
+        Args:
+            registration: EventRegistration being paid for
+            amount: Amount paid, defaults to the event's entry fee
+            payment_method: FinancialTransaction payment method
+            idempotency_key: Payment reference, e.g. the gateway's payment id
+            recorded_by: User recording the payment
+
+        Returns:
+            FinancialTransaction: The completed event_fee transaction
+
+        Raises:
+            ValidationError: If the registration is cancelled, the amount is
+                negative, or the key belongs to another registration's payment
+        """
+        with transaction.atomic():
+            if idempotency_key:
+                existing = RegistrationPaymentService._replayed(registration, idempotency_key)
+                if existing:
+                    return existing
+
+            registration = EventRegistration.objects.select_for_update().select_related('event').get(
+                pk=registration.pk
+            )
+            if registration.payment_status == 'completed':
+                return registration.financial_transactions.filter(status='completed').order_by('-id').first()
+            if registration.status == 'cancelled':
+                raise ValidationError("A cancelled registration cannot be paid for.", code='cancelled')
+
+            event = registration.event
+            amount = event.entry_fee if amount is None else Decimal(amount)
+            if amount < 0:
+                raise ValidationError("The amount paid cannot be negative.", code='invalid')
+
+            now = timezone.now()
+            fee = registration.financial_transactions.filter(status='pending').order_by('-id').first()
+            if fee is None:
+                fee = FinancialTransaction(
+                    transaction_id=f'EVT-{event.id}-{registration.id}-{uuid.uuid4().hex[:8].upper()}',
+                    center_id=event.center_id,
+                    transaction_type='event_fee',
+                    payer_id=registration.participant_id,
+                    event=event,
+                    registration=registration,
+                    description=f'Entry fee for {event.name}',
+                )
+            fee.amount = amount
+            fee.payment_method = payment_method
+            fee.idempotency_key = idempotency_key or None
+            fee.status = 'completed'
+            fee.recorded_by = recorded_by
+            fee.transaction_date = now
+            try:
+                with transaction.atomic():
+                    fee.save()
+            except IntegrityError:
+                # The same payment was recorded concurrently
+                existing = RegistrationPaymentService._replayed(registration, idempotency_key)
+                if existing is None:
+                    raise
+                return existing
+
+            EventRegistration.objects.filter(pk=registration.pk).update(
+                payment_status='completed',
+                amount_paid=amount,
+                status='confirmed' if registration.status == 'pending' else registration.status,
+                updated_at=now,
+            )
+            RegistrationPaymentService._add(event.id, collected=amount, payments=1)
+        return fee
+
+    @staticmethod
+    def refund(registration, recorded_by=None):
+        """
+        Refund a registration's completed payment.
+
+        Refunding an already refunded registration changes nothing.
+
+        Returns:
+            FinancialTransaction: The refunded transaction
+
+        Raises:
+            ValidationError: If the registration has no completed payment
+        """
+        with transaction.atomic():
+            registration = EventRegistration.objects.select_for_update().get(pk=registration.pk)
+            fees = registration.financial_transactions.order_by('-id')
+            if registration.payment_status == 'refunded':
+                return fees.filter(status='refunded').first()
+            fee = fees.filter(status='completed').first()
+            if registration.payment_status != 'completed' or fee is None:
+                raise ValidationError("This registration has no completed payment to refund.", code='not_paid')
+
+            fee.status = 'refunded'
+            if recorded_by:
+                fee.recorded_by = recorded_by
+            fee.save(update_fields=['status', 'recorded_by', 'updated_at'])
+            EventRegistration.objects.filter(pk=registration.pk).update(
+                payment_status='refunded', updated_at=timezone.now()
+            )
+            RegistrationPaymentService._add(registration.event_id, refunded=fee.amount, refunds=1)
+        return fee
+
+    @staticmethod
+    def recompute(events=None):
+        """
+        Rebuild EventRevenue totals from registration fee transactions.
+
+        Args:
+            events: Optional iterable of events or event ids; defaults to all
+
+        Returns:
+            int: Number of events whose totals changed
+        """
+        fees = FinancialTransaction.objects.filter(
+            transaction_type='event_fee', registration__isnull=False, status__in=['completed', 'refunded']
+        )
+        revenue = EventRevenue.objects.all()
+        if events is not None:
+            event_ids = [getattr(event, 'pk', event) for event in events]
+            fees = fees.filter(event_id__in=event_ids)
+            revenue = revenue.filter(event_id__in=event_ids)
+
+        zero = Decimal('0')
+        totals = {
+            row['event_id']: row
+            for row in fees.values('event_id').annotate(
+                collected=Sum('amount'),
+                refunded=Sum('amount', filter=Q(status='refunded')),
+                payments=Count('id'),
+                refunds=Count('id', filter=Q(status='refunded')),
+            )
+        }
+        current = {row.event_id: row for row in revenue}
+
+        changed = 0
+        for event_id in totals.keys() | current.keys():
+            row = totals.get(event_id, {})
+            values = {
+                'collected': row.get('collected') or zero,
+                'refunded': row.get('refunded') or zero,
+                'payments': row.get('payments', 0),
+                'refunds': row.get('refunds', 0),
+            }
+            existing = current.get(event_id)
+            if existing and all(getattr(existing, field) == value for field, value in values.items()):
+                continue
+            EventRevenue.objects.update_or_create(event_id=event_id, defaults=values)
+            changed += 1
+        return changed
+
+    @staticmethod
+    def _replayed(registration, idempotency_key):
+        existing = FinancialTransaction.objects.filter(idempotency_key=idempotency_key).first()
+        if existing and existing.registration_id != registration.pk:
+            raise ValidationError(
+                "This payment reference was already used for another registration.", code='key_reused'
+            )
+        return existing
+
+    @staticmethod
+    def _add(event_id, **amounts):
+        """Move an event's revenue totals by the given amounts."""
+        changes = {field: F(field) + value for field, value in amounts.items()}
+        if EventRevenue.objects.filter(event_id=event_id).update(**changes, updated_at=timezone.now()):
+            return
+        try:
+            with transaction.atomic():
+                EventRevenue.objects.create(event_id=event_id, **amounts)
+        except IntegrityError:
+            # Created concurrently; apply the change to that row
+            EventRevenue.objects.filter(event_id=event_id).update(**changes, updated_at=timezone.now())
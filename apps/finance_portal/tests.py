@@ -1,3 +1,100 @@
+from decimal import Decimal
+
+from django.core.exceptions import ValidationError
 from django.test import TestCase
+from django.urls import reverse
+
+from apps.core.models import Role, User, UserRole
+from apps.events.models import EventRegistration
+from apps.events.services import RegistrationService
+from apps.events.tests import create_event
+from apps.finance_portal.models import EventRevenue, FinancialTransaction
+from apps.finance_portal.services import RegistrationPaymentService
+
+
+class RegistrationPaymentServiceTest(TestCase):
+    def setUp(self):
+        self.event = create_event(max_participants=5, entry_fee=Decimal('40.00'))
+        self.registrations = [
+            RegistrationService.register(
+                self.event, User.objects.create_user(email=f'p{i}@test.com', password='password')
+            )
+            for i in range(3)
+        ]
+
+    def revenue(self):
+        return EventRevenue.objects.get(event=self.event)
+
+    def test_payment_creates_linked_transaction_once(self):
+        fee = RegistrationPaymentService.complete_payment(self.registrations[0], idempotency_key='pay_1')
+        self.assertEqual(
+            (fee.transaction_type, fee.status, fee.amount, fee.event_id, fee.payer_id, fee.center_id),
+            ('event_fee', 'completed', Decimal('40.00'), self.event.id,
+             self.registrations[0].participant_id, self.event.center_id)
+        )
+        registration = EventRegistration.objects.get(pk=self.registrations[0].pk)
+        self.assertEqual(
+            (registration.status, registration.payment_status, registration.amount_paid),
+            ('confirmed', 'completed', Decimal('40.00'))
+        )
+
+        # Replays with the same key, or of a completed payment, change nothing
+        for key in ('pay_1', 'pay_2'):
+            self.assertEqual(
+                RegistrationPaymentService.complete_payment(self.registrations[0], idempotency_key=key), fee
+            )
+        with self.assertRaisesMessage(ValidationError, 'another registration'):
+            RegistrationPaymentService.complete_payment(self.registrations[1], idempotency_key='pay_1')
+
+        self.assertEqual(FinancialTransaction.objects.count(), 1)
+        self.assertEqual((self.revenue().collected, self.revenue().payments), (Decimal('40.00'), 1))
+
+    def test_pending_transaction_is_completed(self):
+        pending = FinancialTransaction.objects.create(
+            transaction_id='CHECKOUT-1', center=self.event.center, transaction_type='event_fee',
+            amount=Decimal('40.00'), event=self.event, registration=self.registrations[0],
+            description='Checkout', transaction_date=self.event.start_date,
+        )
+        fee = RegistrationPaymentService.complete_payment(
+            self.registrations[0], amount='35.50', payment_method='cash'
+        )
+        self.assertEqual(fee.pk, pending.pk)
+        pending.refresh_from_db()
+        self.assertEqual(
+            (pending.status, pending.amount, pending.payment_method), ('completed', Decimal('35.50'), 'cash')
+        )
+
+    def test_refunds_and_recompute(self):
+        for registration in self.registrations[:2]:
+            RegistrationPaymentService.complete_payment(registration)
+        fee = RegistrationPaymentService.refund(self.registrations[1])
+        self.assertEqual(RegistrationPaymentService.refund(self.registrations[1]), fee)
+        with self.assertRaisesMessage(ValidationError, 'no completed payment'):
+            RegistrationPaymentService.refund(self.registrations[2])
+
+        self.assertEqual(fee.status, 'refunded')
+        revenue = self.revenue()
+        self.assertEqual(
+            (revenue.collected, revenue.refunded, revenue.net, revenue.payments, revenue.refunds),
+            (Decimal('80.00'), Decimal('40.00'), Decimal('40.00'), 2, 1)
+        )
+
+        # Totals are already right; a damaged row is rebuilt from transactions
+        self.assertEqual(RegistrationPaymentService.recompute(), 0)
+        EventRevenue.objects.filter(event=self.event).update(collected=0, refunds=5)
+        self.assertEqual(RegistrationPaymentService.recompute([self.event]), 1)
+        self.assertEqual((self.revenue().collected, self.revenue().refunds), (Decimal('80.00'), 1))
+
+    def test_events_dashboard_shows_revenue(self):
+        RegistrationPaymentService.complete_payment(self.registrations[0])
+        admin = User.objects.create_user(email='admin@test.com', password='password', is_active=True)
+        UserRole.objects.create(user=admin, role=Role.objects.create(
+            code=Role.ADMIN, name='Admin', dashboard_url='admin_portal:dashboard'
+        ))
+        self.client.force_login(admin)
 
-# Create your tests here.
+        with self.assertNumQueries(7):
+            response = self.client.get(reverse('admin_portal:events'))
+        event = response.context['events'][0]
+        self.assertEqual((event.expected_revenue, event.revenue.collected), (Decimal('120.00'), Decimal('40.00')))
+        self.assertContains(response, '$120.00')
@@ -1,4 +1,5 @@
 from django.contrib import admin
+from django.db.models import Count
 from .models import Parent, ParentChildRelation
 
 
@@ -11,6 +12,7 @@ class ParentChildRelationInline(admin.TabularInline):
 @admin.register(Parent)
 class ParentAdmin(admin.ModelAdmin):
     list_display = ('get_full_name', 'phone', 'is_primary_contact', 'children_count')
+    list_select_related = ('user',)
     list_filter = ('is_primary_contact', 'user__date_joined')
     search_fields = ('user__first_name', 'user__last_name', 'phone')
     inlines = [ParentChildRelationInline]
@@ -33,14 +35,19 @@ class ParentAdmin(admin.ModelAdmin):
         return obj.user.get_full_name() or obj.user.email
     get_full_name.short_description = 'Parent'
     
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(children_total=Count('children'))
+    
     def children_count(self, obj):
-        return obj.children.count()
+        return obj.children_total
     children_count.short_description = 'Children'
+    children_count.admin_order_field = 'children_total'
 
 
 @admin.register(ParentChildRelation)
 class ParentChildRelationAdmin(admin.ModelAdmin):
     list_display = ('parent_name', 'child_name', 'relationship')
+    list_select_related = ('parent__user', 'child')
     list_filter = ('can_view_scores', 'can_view_rankings', 'relationship')
     search_fields = ('parent__user__first_name', 'child__first_name')
     fieldsets = (
@@ -3,9 +3,10 @@ Parent models for MFU Web Portal.
 Manages parent/guardian relationships and child data access.
 """
 from django.db import models
+from django.db.models import BooleanField, Case, Value, When
 from django.utils import timezone
 from apps.core.models import User
-from apps.athlete_portal.models import AthletePerson
+from apps.athlete_portal.models import AthletePerson, age_expression, birth_date_cutoff
 
 
 class Parent(models.Model):
@@ -43,6 +44,29 @@ class Parent(models.Model):
         return self.children.filter(is_active=True)
 
 
+class ParentChildRelationQuerySet(models.QuerySet):
+    def with_child_age(self, on=None):
+        """
+        Annotate the child's age and whether its rankings are visible, in SQL.
+
+        Annotations:
+            child_age: Child's age in whole years
+            rankings_visible: can_view_rankings and the child is RANKINGS_MIN_AGE or older
+        """
+        return self.annotate(
+            child_age=age_expression('child__date_of_birth', on),
+            rankings_visible=Case(
+                When(
+                    can_view_rankings=True,
+                    child__date_of_birth__lte=birth_date_cutoff(ParentChildRelation.RANKINGS_MIN_AGE, on),
+                    then=Value(True)
+                ),
+                default=Value(False),
+                output_field=BooleanField()
+            )
+        )
+
+
 class ParentChildRelation(models.Model):
     """
     Relationship between a parent and their child (athlete).
@@ -56,6 +80,9 @@ class ParentChildRelation(models.Model):
         ('other', 'Other'),
     ]
     
+    # Parents can only view rankings for children of this age or older
+    RANKINGS_MIN_AGE = 12
+    
     parent = models.ForeignKey(
         Parent,
         on_delete=models.CASCADE,
@@ -100,6 +127,8 @@ class ParentChildRelation(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    objects = ParentChildRelationQuerySet.as_manager()
+    
     class Meta:
         db_table = 'parent_child_relations'
         unique_together = ['parent', 'child']
@@ -112,5 +141,4 @@ class ParentChildRelation(models.Model):
     
     def can_view_child_rankings(self):
         """Check if parent can view child's rankings."""
-        # Parents can only view rankings for children 12+
-        return self.can_view_rankings and self.child.age >= 12
+        return self.can_view_rankings and self.child.age >= self.RANKINGS_MIN_AGE
@@ -1,9 +1,13 @@
 from django.shortcuts import render, get_object_or_404
 from django.contrib.auth.decorators import login_required
+from django.utils import timezone
+from datetime import timedelta
 
 from apps.core.decorators.permissions import require_roles
 from .models import Parent, ParentChildRelation
-from apps.athlete_portal.models import AthletePerson, AthleteRanking, EvaluationCertificate, AthleteScore
+from apps.athlete_portal.models import AthletePerson, AthleteRanking, EvaluationCertificate
+from apps.athlete_portal.services import AthleteProfileLoader
+from apps.coach_portal.services import AttendanceService
 
 
 @login_required
@@ -21,7 +25,7 @@ def parent_dashboard(request):
     # Get parent's children with permissions
     children_relations = ParentChildRelation.objects.filter(
         parent=parent
-    ).select_related('child')
+    ).select_related('child').with_child_age()
     
     children_data = []
     for relation in children_relations:
@@ -29,9 +33,9 @@ def parent_dashboard(request):
         child_info = {
             'relation': relation,
             'child': child,
-            'age': child.age,
+            'age': relation.child_age,
             'can_view_scores': relation.can_view_scores,
-            'can_view_rankings': relation.can_view_rankings and child.age >= 12,
+            'can_view_rankings': relation.rankings_visible,
             'can_view_certificates': relation.can_view_certificates,
         }
         children_data.append(child_info)
@@ -53,30 +57,36 @@ def child_details(request, child_id):
     parent = get_object_or_404(Parent, user=user)
     
     # Verify parent-child relationship
-    relation = get_object_or_404(ParentChildRelation, parent=parent, child_id=child_id)
-    child = relation.child
+    relation = get_object_or_404(
+        ParentChildRelation.objects.with_child_age(), parent=parent, child_id=child_id
+    )
+    child = AthleteProfileLoader.load(relation.child_id)
     
     # Get child's rankings (if parent has permission and child is 12+)
     rankings = None
-    if relation.can_view_rankings and child.age >= 12:
-        rankings = AthleteRanking.objects.filter(
-            athlete=child
-        ).order_by('-total_score')
+    if relation.rankings_visible:
+        rankings = child.rankings
     
     # Get child's certificates (if parent has permission)
     certificates = None
     if relation.can_view_certificates:
-        certificates = EvaluationCertificate.objects.filter(
-            athlete=child,
-            is_viewable_by_parents=True
-        ).order_by('-issued_date')
+        certificates = [
+            certificate for certificate in child.all_certificates
+            if certificate.is_viewable_by_parents
+        ]
     
     # Get child's recent scores (if parent has permission)
     recent_scores = None
     if relation.can_view_scores:
-        recent_scores = AthleteScore.objects.filter(
-            athlete=child
-        ).select_related('event').order_by('-recorded_at')[:10]
+        recent_scores = child.recent_scores
+    
+    # Get child's training attendance over the last 90 days (if parent has permission)
+    attendance = None
+    if relation.can_view_attendance:
+        now = timezone.now()
+        attendance = AttendanceService.athlete_attendance_rates(
+            [child.id], now - timedelta(days=90), now
+        ).get(child.id)
     
     context = {
         'parent': parent,
@@ -85,6 +95,7 @@ def child_details(request, child_id):
         'rankings': rankings,
         'certificates': certificates,
         'recent_scores': recent_scores,
+        'attendance': attendance,
     }
     
     return render(request, 'parent_portal/child_details.html', context)
@@ -97,11 +108,18 @@ def child_rankings(request, child_id):
     user = request.user
     parent = get_object_or_404(Parent, user=user)
     
-    relation = get_object_or_404(ParentChildRelation, parent=parent, child_id=child_id)
+    relation = get_object_or_404(
+        ParentChildRelation.objects.select_related('child').with_child_age(),
+        parent=parent,
+        child_id=child_id
+    )
     
     # Check permissions
-    if not relation.can_view_rankings or relation.child.age < 12:
-        context = {'error': 'You do not have permission to view this child\'s rankings'}
+    if not relation.rankings_visible:
+        context = {
+            'child': relation.child,
+            'error': 'You do not have permission to view this child\'s rankings',
+        }
         return render(request, 'parent_portal/child_rankings.html', context)
     
     child = relation.child
@@ -128,7 +146,10 @@ def child_certificates(request, child_id):
     relation = get_object_or_404(ParentChildRelation, parent=parent, child_id=child_id)
     
     if not relation.can_view_certificates:
-        context = {'error': 'You do not have permission to view this child\'s certificates'}
+        context = {
+            'child': relation.child,
+            'error': 'You do not have permission to view this child\'s certificates',
+        }
         return render(request, 'parent_portal/child_certificates.html', context)
     
     child = relation.child
@@ -1,4 +1,6 @@
 from django.contrib import admin
+from django.db.models import Count, Q
+from apps.core.admin_filters import select_related_filter
 from .models import VolunteeringOpportunity, VolunteerApplication
 
 
@@ -12,6 +14,7 @@ class VolunteerApplicationInline(admin.TabularInline):
 @admin.register(VolunteeringOpportunity)
 class VolunteeringOpportunityAdmin(admin.ModelAdmin):
     list_display = ('title', 'center', 'required_hours', 'status', 'total_volunteers')
+    list_select_related = ('center',)
     list_filter = ('status', 'center')
     search_fields = ('title', 'description', 'center__name')
     inlines = [VolunteerApplicationInline]
@@ -30,15 +33,22 @@ class VolunteeringOpportunityAdmin(admin.ModelAdmin):
         }),
     )
     
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(
+            approved_total=Count('applications', filter=Q(applications__status='approved'))
+        )
+    
     def total_volunteers(self, obj):
-        return obj.applications.filter(status='approved').count()
+        return obj.approved_total
     total_volunteers.short_description = 'Approved Volunteers'
+    total_volunteers.admin_order_field = 'approved_total'
 
 
 @admin.register(VolunteerApplication)
 class VolunteerApplicationAdmin(admin.ModelAdmin):
     list_display = ('volunteer', 'opportunity', 'applied_at', 'status')
-    list_filter = ('status', 'opportunity')
+    list_select_related = ('volunteer', 'opportunity__center')
+    list_filter = ('status', ('opportunity', select_related_filter('center')))
     search_fields = ('volunteer__first_name', 'opportunity__title')
     readonly_fields = ('applied_at',)
     fieldsets = (
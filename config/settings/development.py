@@ -15,6 +15,12 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # A file (not the in-memory default) so threaded tests get SQLite's
+        # real locking, with writers waiting on each other instead of failing
+        'TEST': {'NAME': BASE_DIR / 'test_db.sqlite3'},
+        # Seconds a writer waits for the lock; the 5 second default is too
+        # short for hundreds of threads queued behind one event row
+        'OPTIONS': {'timeout': 30},
     }
 }
 
@@ -29,6 +29,9 @@ urlpatterns = [
     path('athlete-portal/', include('apps.athlete_portal.urls')),
     path('finance-portal/', include('apps.finance_portal.urls')),
 
+    # Public event listing
+    path('events/', include('apps.events.urls')),
+
     # Home page - redirect to login
     path('', include('apps.authentication.urls')),
 ]